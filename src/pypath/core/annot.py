@@ -1550,6 +1550,7 @@ class CustomAnnotation(session_mod.Logger):
 
             network_df = core_common.filter_network_df(
                 df = network_df,
+                df_index = self._get_df_index(network_df, network),
                 **_network_args
             )
             annot_df_source = self.filtered(
@@ -1594,6 +1595,7 @@ class CustomAnnotation(session_mod.Logger):
 
             combined_df = core_common.filter_network_df(
                 df = combined_df,
+                df_index = self._get_df_index(combined_df),
                 **_network_args
             )
             combined_df = self.filtered(
@@ -1675,6 +1677,32 @@ class CustomAnnotation(session_mod.Logger):
     filter_interclass_network = network_df
 
 
+    def _get_df_index(self, df, network = None):
+        """
+        Returns the index for filtering the network data frame ``df``.
+        The index is built at the first call and kept as long as ``df``
+        is the same data frame object. Data frames of ``Network`` objects
+        are indexed by the ``Network`` itself.
+        """
+
+        if hasattr(network, 'get_df_index') and network.get_df() is df:
+
+            return network.get_df_index()
+
+        df_indices = self.__dict__.setdefault('_df_indices', {})
+        key = 'interclass' if df is getattr(
+            self,
+            'interclass_network',
+            None,
+        ) else 'network'
+
+        if key not in df_indices or not df_indices[key].valid_for(df):
+
+            df_indices[key] = core_common.NetworkDfIndex(df)
+
+        return df_indices[key]
+
+
     def set_interclass_network_df(self, **kwargs):
         """
         Creates a data frame of the whole inter-class network and keeps it
@@ -1706,6 +1734,8 @@ class CustomAnnotation(session_mod.Logger):
 
             del self.interclass_network
 
+        self.__dict__.get('_df_indices', {}).pop('interclass', None)
+
 
     #
     # Below only thin wrappers to make the interface more intuitive
@@ -2194,6 +2224,7 @@ class CustomAnnotation(session_mod.Logger):
         """
 
         self.unset_interclass_network_df()
+        self.__dict__.get('_df_indices', {}).pop('network', None)
 
         self.network = self._network_df(network)
 
@@ -2244,7 +2275,7 @@ class CustomAnnotation(session_mod.Logger):
             postfix = postfix,
         )
 
-        args = cls._args_add_postfix(args, postfix)
+        args = cls._args_add_postfix(kwargs, postfix)
 
         query = ' and '.join(query)
 
@@ -30,11 +30,274 @@ from future.utils import iteritems
 
 import re
 
+import numpy as np
 import pandas as pd
 
 import pypath.share.common as common
 
 
+class NetworkDfIndex(object):
+    """
+    Pre-encoded representation of a network data frame for repeated
+    filtering. Each column is encoded once as integer codes and a
+    vocabulary of unique values; a filter on a column is evaluated on the
+    vocabulary and broadcast to the rows by the codes. Undirected edges
+    are represented in both orientations by a doubled orientation index:
+    the original rows followed by the undirected rows with source and
+    target swapped. Filters are composed as numpy boolean masks over this
+    index and the data frame is copied only once, at the final selection.
+
+    :param pandas.DataFrame df:
+        A network data frame as provided by
+        `pypath.core.network.Network.make_df`.
+    """
+
+    _node_cols = (('id_a', 'id_b'), ('type_a', 'type_b'))
+
+    def __init__(self, df):
+
+        self.df = df
+        self.n = len(df)
+        self.columns = tuple(df.columns)
+        self._codes = {}
+        self._pair_of = {
+            col: pair
+            for pair in self._node_cols
+            for col in pair
+            if set(pair) <= set(self.columns)
+        }
+
+        if 'directed' in self.columns:
+
+            self.undirected = np.flatnonzero(
+                ~df['directed'].to_numpy(dtype = bool)
+            )
+
+        else:
+
+            self.undirected = np.array([], dtype = np.int64)
+
+        self.oriented_rows = np.concatenate([
+            np.arange(self.n),
+            self.undirected,
+        ])
+
+
+    def valid_for(self, df):
+        """
+        Tells if this index has been built from the data frame ``df``.
+        Only the identity and the shape of the data frame are checked:
+        after modifying its values in place a new index must be built.
+        """
+
+        return (
+            df is self.df and
+            len(df) == self.n and
+            tuple(df.columns) == self.columns
+        )
+
+
+    @staticmethod
+    def _encode(series):
+        """
+        Integer codes and vocabulary of one column. Missing values are
+        coded by -1. Columns of sets are encoded by their distinct sets.
+        """
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+
+            return (
+                series.cat.codes.to_numpy(),
+                np.asarray(series.cat.categories, dtype = object),
+                False,
+            )
+
+        values = series.to_numpy()
+
+        if (
+            values.dtype == object and
+            any(isinstance(v, common.list_like) for v in values[:100])
+        ):
+
+            vocabulary = {}
+            codes = np.fromiter(
+                (
+                    -1
+                        if v is None or v != v else
+                    vocabulary.setdefault(frozenset(v), len(vocabulary))
+                    for v in values
+                ),
+                dtype = np.int64,
+                count = len(values),
+            )
+            uniques = np.empty(len(vocabulary), dtype = object)
+            uniques[:] = list(vocabulary.keys())
+
+            return codes, uniques, True
+
+        codes, uniques = pd.factorize(values)
+
+        return codes, np.asarray(uniques, dtype = object), False
+
+
+    def _column(self, col):
+
+        if col not in self._codes:
+
+            if col in self._pair_of:
+
+                self._encode_pair(self._pair_of[col])
+
+            else:
+
+                self._codes[col] = self._encode(self.df[col])
+
+        return self._codes[col]
+
+
+    def _encode_pair(self, pair):
+        """
+        Encodes the two columns of a node attribute with a shared
+        vocabulary, so their codes can be compared directly.
+        """
+
+        col_a, col_b = pair
+        codes_a, uniques_a, sets_a = self._encode(self.df[col_a])
+        codes_b, uniques_b, sets_b = self._encode(self.df[col_b])
+        uniques = pd.Index(uniques_a).append(pd.Index(uniques_b)).unique()
+        shared = np.asarray(uniques, dtype = object)
+
+        for col, codes, _uniques, sets in (
+            (col_a, codes_a, uniques_a, sets_a),
+            (col_b, codes_b, uniques_b, sets_b),
+        ):
+
+            remap = np.append(uniques.get_indexer(_uniques), -1)
+            self._codes[col] = (remap[codes], shared, sets)
+
+
+    def _row_mask(self, col, val):
+        """
+        Boolean mask over the rows of the data frame: the column value
+        equals ``val`` or, if ``val`` is a collection, is one of its
+        elements. For columns of sets ``val`` has to be an element of the
+        set or, in case of a collection, intersect with it.
+        """
+
+        codes, uniques, sets = self._column(col)
+        simple = isinstance(val, common.simple_types)
+
+        if sets:
+
+            hit = [
+                val in u if simple else not u.isdisjoint(val)
+                for u in uniques
+            ]
+
+        else:
+
+            hit = pd.Index(uniques).isin([val] if simple else list(val))
+
+        return np.append(np.asarray(hit, dtype = bool), False)[codes]
+
+
+    def mask(self, col, val, oriented = False):
+        """
+        Boolean mask of the rows matching ``val`` in column ``col``,
+        either over the rows of the data frame or over the orientation
+        index.
+        """
+
+        mask = self._row_mask(col, val)
+
+        if not oriented:
+
+            return mask
+
+        if col in self._pair_of:
+
+            pair = self._pair_of[col]
+            other = pair[1 - pair.index(col)]
+            swapped = self._row_mask(other, val)
+
+        else:
+
+            swapped = mask
+
+        return np.concatenate([mask, swapped[self.undirected]])
+
+
+    def loops(self, oriented = False):
+        """
+        Boolean mask of the self loops.
+        """
+
+        codes_a = self._column('id_a')[0]
+        codes_b = self._column('id_b')[0]
+        mask = codes_a == codes_b
+
+        return (
+            np.concatenate([mask, mask[self.undirected]])
+                if oriented else
+            mask
+        )
+
+
+    def select(self, mask = None, oriented = False):
+        """
+        Creates the data frame of the selected rows.
+
+        :param numpy.ndarray mask:
+            Boolean mask over the rows or over the orientation index.
+            If ``None``, all rows are selected.
+        :param bool oriented:
+            Whether ``mask`` refers to the orientation index. In this
+            case the selected undirected rows of the second block are
+            included with source and target swapped and the result is
+            indexed by positions in the orientation index.
+        """
+
+        if not oriented:
+
+            return self.df if mask is None else self.df[mask]
+
+        selected = (
+            np.arange(len(self.oriented_rows))
+                if mask is None else
+            np.flatnonzero(mask)
+        )
+        result = self.df.take(self.oriented_rows[selected])
+        result.index = pd.RangeIndex(len(self.oriented_rows))[selected]
+        swapped = selected >= self.n
+
+        if swapped.any():
+
+            for col_a, col_b in self._node_cols:
+
+                if col_a not in result.columns or col_b not in result.columns:
+
+                    continue
+
+                a = result[col_a]
+                b = result[col_b]
+
+                if (
+                    isinstance(a.dtype, pd.CategoricalDtype) and
+                    isinstance(b.dtype, pd.CategoricalDtype)
+                ):
+
+                    categories = a.cat.categories.append(
+                        b.cat.categories
+                    ).unique()
+                    a = a.cat.set_categories(categories)
+                    b = b.cat.set_categories(categories)
+
+                result[col_a] = a.where(~swapped, b)
+                result[col_b] = b.where(~swapped, a)
+
+        return result
+
+
 def filter_network_df(
         df,
         resource = None,
@@ -52,13 +315,27 @@ def filter_network_df(
         swap_undirected = True,
         remove_loops = True,
         entities_or = False,
+        df_index = None,
         **kwargs
     ):
     """
     Filters a network data frame.
+
+    The data frame is encoded by a `NetworkDfIndex`. The filters are
+    evaluated as boolean masks, undirected interactions are included in
+    both orientations if ``swap_undirected`` is ``True``. In columns of
+    sets (e.g. `sources` if the data frame is not by resource) a simple
+    value selects the rows containing it, a collection selects the rows
+    intersecting with it.
+
+    :param NetworkDfIndex df_index:
+        An index built from ``df``, to be reused by subsequent calls on
+        the same data frame. By default a new index is built at each
+        call. The index is not updated if the data frame is modified.
     """
 
     args = locals().copy()
+    args.pop('df_index')
     args.update(kwargs)
 
     query_elements = {}
@@ -73,24 +350,7 @@ def filter_network_df(
         'entity': 'id',
     }
 
-    if swap_undirected and not only_directed and not only_signed:
-
-        undirected = df.query('not directed', inplace = False)
-
-        with pd.option_context('mode.chained_assignment', None):
-
-            undirected.rename(
-                {
-                    'id_a': 'id_b',
-                    'id_b': 'id_a',
-                    'type_a': 'type_b',
-                    'type_b': 'type_a',
-                },
-                inplace = True,
-                axis = 'columns',
-            )
-
-        df = df.append(undirected, ignore_index = True, sort = False)
+    oriented = swap_undirected and not only_directed and not only_signed
 
     if only_directed:
 
@@ -151,47 +411,42 @@ def filter_network_df(
 
                 query_elements[var_pf] = val
 
-    query = []
-    entity_query = []
+    if df_index is None:
 
-    for var, val in iteritems(query_elements):
-
-        first = var
-        second = '@query_elements["%s"]' % var
+        df_index = NetworkDfIndex(df)
 
-        if df.dtypes[var].name == 'object':
+    elif not df_index.valid_for(df):
 
-            first, second = second, first
-            op = 'in' if isinstance(val, common.simple_types) else '&'
+        raise ValueError('The index has not been built from this data frame.')
 
-        else:
+    index = df_index
+    masks = []
+    entity_masks = []
 
-            op = '==' if isinstance(val, common.simple_types) else 'in'
+    for var, val in iteritems(query_elements):
 
-        q = '%s %s %s' % (first, op, second)
+        mask = index.mask(var, val, oriented = oriented)
 
         if var.startswith('id_'):
 
-            entity_query.append(q)
+            entity_masks.append(mask)
 
         else:
 
-            query.append(q)
+            masks.append(mask)
 
-    if entities_or and len(entity_query) > 1:
+    if entities_or and len(entity_masks) > 1:
 
-        query.append('(%s)' % ' or '.join(entity_query))
+        masks.append(np.logical_or.reduce(entity_masks))
 
     else:
 
-        query.extend(entity_query)
-
-    if remove_loops:
+        masks.extend(entity_masks)
 
-        query.append('id_a.astype("str") != id_b.astype("str")')
+    if remove_loops and {'id_a', 'id_b'} <= set(df.columns):
 
-    query = ' and '.join(query)
+        masks.append(~index.loops(oriented = oriented))
 
-    result = df.query(query) if query else df
+    mask = np.logical_and.reduce(masks) if masks else None
 
-    return result
+    return index.select(mask, oriented = oriented)
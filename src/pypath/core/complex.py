@@ -27,6 +27,8 @@ import sys
 import importlib as imp
 import traceback
 import collections
+import multiprocessing
+import concurrent.futures
 
 try:
     import cPickle as pickle
@@ -535,6 +537,7 @@ class ComplexAggregator(AbstractComplexResource):
             self,
             resources = None,
             pickle_file = None,
+            workers = None,
         ):
         """
         Combines complexes from multiple resources.
@@ -542,10 +545,14 @@ class ComplexAggregator(AbstractComplexResource):
         :arg list resources:
             List of resources. Names of complex resource classes in this
             module or custom
+        :arg int workers:
+            Number of processes loading the resources in parallel, by
+            default the ``complex_workers`` setting.
         """
 
         self.pickle_file = pickle_file
         self.resources = resources or complex_resources
+        self.workers = workers
 
         AbstractComplexResource.__init__(
             self,
@@ -576,51 +583,157 @@ class ComplexAggregator(AbstractComplexResource):
         self.data = {}
         self.summaries = {}
 
-        for res in self.resources:
+        workers = min(
+            self.workers or settings.get('complex_workers') or 1,
+            len(self.resources),
+        )
+
+        # the results arrive in the order of the resources, hence the
+        # result of merging does not depend on the number of workers
+        for loaded in self._load_resources(workers):
+
+            if loaded is None:
+
+                continue
+
+            name, summary, complexes = loaded
+
+            if summary is not None:
+
+                self.summaries[name] = summary
+
+            self._merge(complexes)
+            # the complexes from the resource are not referenced any more,
+            # except those which became part of the combined data
+            loaded = complexes = None
+
+        resource.AbstractResource.load(self)
+        self.update_index()
+        self.update_summaries()
+
+
+    def _merge(self, complexes):
+        """
+        Adds complexes to the combined data. Complexes with the same set of
+        components are merged, the key is the string representation of
+        the complex. Stoichiometry is not part of the key: it is reconciled
+        by ``intera.Complex.merge``.
+        """
+
+        for cplex in complexes.values():
+
+            key = cplex.__str__()
+
+            if key in self.data:
+
+                self.data[key] += cplex
+
+            else:
+
+                self.data[key] = cplex
+
+
+    def _load_resources(self, workers):
+        """
+        Loads the resources, optionally in parallel processes. Yields
+        tuples of resource name, summary and complexes, in the order of
+        the resources, or ``None`` for the resources failed to load.
+        """
 
-            self._log('Loading resource `%s`.' % str(res))
+        if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+
+            self._log(
+                'Loading %u complex resources in %u processes.' % (
+                    len(self.resources),
+                    workers,
+                )
+            )
+            # the workers inherit this object by forking
+            globals()['_aggregator'] = self
 
             try:
 
-                if not callable(res):
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers = workers,
+                    mp_context = multiprocessing.get_context('fork'),
+                ) as executor:
 
-                    if res in globals():
+                    futures = [
+                        executor.submit(_load_resource, i)
+                        for i in range(len(self.resources))
+                    ]
 
-                        res = globals()[res]
+                    for i in range(len(futures)):
 
-                if callable(res):
+                        # dropping the future releases its result
+                        # as soon as it has been merged
+                        future, futures[i] = futures[i], None
 
-                    processor = res()
+                        try:
 
-                elif hasattr(res, 'complexes'):
+                            yield future.result()
 
-                    processor = res
+                        except Exception:
 
-                if hasattr(processor, 'summary'):
+                            self._log(
+                                'Failed to load resource `%s` in a worker '
+                                'process, loading it in the main process: '
+                                '%s' % (
+                                    str(self.resources[i]),
+                                    traceback.format_exception(
+                                        *sys.exc_info()
+                                    ),
+                                )
+                            )
 
-                    self.summaries[processor.name] = processor.summary
+                            yield self._load_resource(i)
 
-                for key, cplex in iteritems(processor.complexes):
+            finally:
 
-                    if key in self.data:
+                globals()['_aggregator'] = None
 
-                        self.data[key] += cplex
+        else:
 
-                    else:
+            for i in range(len(self.resources)):
 
-                        self.data[key] = cplex
+                yield self._load_resource(i)
 
-            except Exception:
 
-                self._log(
-                    'Failed to load resource `%s`: %s' % (
-                        str(res),
-                        traceback.format_exception(*sys.exc_info()),
-                    ))
+    def _load_resource(self, i):
 
-        resource.AbstractResource.load(self)
-        self.update_index()
-        self.update_summaries()
+        res = self.resources[i]
+
+        self._log('Loading resource `%s`.' % str(res))
+
+        try:
+
+            if not callable(res):
+
+                if res in globals():
+
+                    res = globals()[res]
+
+            if callable(res):
+
+                processor = res()
+
+            elif hasattr(res, 'complexes'):
+
+                processor = res
+
+            return (
+                getattr(processor, 'name', str(res)),
+                processor.summary if hasattr(processor, 'summary') else None,
+                processor.complexes,
+            )
+
+        except Exception:
+
+            self._log(
+                'Failed to load resource `%s`: %s' % (
+                    str(res),
+                    traceback.format_exception(*sys.exc_info()),
+                ))
 
 
     def load_from_pickle(self, pickle_file):
@@ -728,6 +841,14 @@ class ComplexAggregator(AbstractComplexResource):
         self._log('Saved to pickle `%s`.' % pickle_file)
 
 
+def _load_resource(i):
+    """
+    Loads one resource of the aggregator in a worker process.
+    """
+
+    return globals()['_aggregator']._load_resource(i)
+
+
 def init_db(**kwargs):
     """
     Initializes or reloads the complex database.
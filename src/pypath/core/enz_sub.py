@@ -23,11 +23,17 @@ from future.utils import iteritems
 from past.builtins import xrange, range
 
 import sys
+import copy
 import importlib as imp
 import itertools
 import collections
+import collections.abc
 import pickle
+import time
+import multiprocessing
+import concurrent.futures
 
+import numpy as np
 import pandas as pd
 
 import pypath.inputs.main as dataio
@@ -38,6 +44,7 @@ import pypath.inputs.uniprot as uniprot_input
 import pypath.internals.intera as intera
 import pypath.share.progress as progress
 import pypath.share.session as session_mod
+import pypath.share.settings as settings
 import pypath.utils.taxonomy as taxonomy
 import pypath.inputs as inputs
 import pypath.core.evidence as evidence
@@ -640,7 +647,24 @@ class EnzymeSubstrateHomologyProcessor(
                 )
             )
 
-            for es in EnzymeSubstrateProcessor.__iter__(self):
+            records = list(EnzymeSubstrateProcessor.__iter__(self))
+            # translating all sites at once, later the translation
+            # of each record uses the memoized results
+            self.translate_sites(
+                [
+                    (
+                        es.ptm.protein,
+                        es.ptm.residue.name,
+                        es.ptm.residue.number,
+                        es.ptm.residue.isoform,
+                        es.ptm.typ,
+                    )
+                    for es in records
+                ],
+                source_taxon = source_taxon,
+            )
+
+            for es in records:
 
                 for target_es in self.translate(es):
 
@@ -672,9 +696,18 @@ class EnzymeSubstrateAggregator(session_mod.Logger):
             nonhuman_direct_lookup = True,
             inputargs = None,
             pickle_file = None,
+            workers = None,
+            columnar = None,
         ):
         """
         Docs not written yet.
+
+        :param int workers:
+            Number of processes loading the resources in parallel, by
+            default the ``enz_sub_workers`` setting.
+        :param bool columnar:
+            Store the records in an ``EnzymeSubstrateTable`` after
+            building, by default the ``enz_sub_columnar`` setting.
         """
 
         session_mod.Logger.__init__(self, name = 'enz_sub')
@@ -682,6 +715,8 @@ class EnzymeSubstrateAggregator(session_mod.Logger):
         for k, v in iteritems(locals()):
             setattr(self, k, v)
 
+        self.table = None
+
         self.main()
 
 
@@ -713,7 +748,13 @@ class EnzymeSubstrateAggregator(session_mod.Logger):
 
             self.enz_sub, self.references = pickle.load(fp)
 
-        self.update_ptm_lookup_dict()
+        if isinstance(self.enz_sub, EnzymeSubstratePairs):
+
+            self.table = self.enz_sub.table
+
+        else:
+
+            self.update_ptm_lookup_dict()
 
 
     def save_to_pickle(self, pickle_file):
@@ -751,17 +792,87 @@ class EnzymeSubstrateAggregator(session_mod.Logger):
         self.build_list()
         self.unique()
 
+        if (
+            settings.get('enz_sub_columnar')
+                if self.columnar is None else
+            self.columnar
+        ):
+
+            self.make_table()
+
+
+    def make_table(self):
+        """
+        Moves the records into an ``EnzymeSubstrateTable``. Afterwards
+        ``enz_sub`` is a read only view of the table and the
+        ``pypath.internals.intera.DomainMotif`` objects are created only
+        when accessed.
+        """
+
+        self._log('Creating columnar enzyme-substrate table.')
+
+        self.table = EnzymeSubstrateTable.from_records(self)
+        self.enz_sub = EnzymeSubstratePairs(self.table)
+
+        # these would keep all the objects alive,
+        # we create them again only if necessary
+        for attr in ('ptm_to_enzyme', 'ptms'):
+
+            self.__dict__.pop(attr, None)
+
+        self._log(
+            'Created enzyme-substrate table: %u records, '
+            '%u proteins, %u references.' % (
+                len(self.table),
+                len(self.table.proteins),
+                len(self.table.references),
+            )
+        )
+
+
+    def __getattr__(self, attr):
+
+        # the PTM lookup dicts are created on demand
+        # if the records are stored in a table
+        if (
+            attr in ('ptm_to_enzyme', 'ptms') and
+            self.__dict__.get('table') is not None
+        ):
+
+            self.update_ptm_lookup_dict()
+
+            return self.__dict__[attr]
+
+        raise AttributeError(
+            '`%s` object has no attribute `%s`' % (
+                self.__class__.__name__,
+                attr,
+            )
+        )
+
 
     def __iter__(self):
 
-        for ptm in itertools.chain(*self.enz_sub.values()):
+        if self.table is not None:
 
-            yield ptm
+            for ptm in self.table:
+
+                yield ptm
+
+        else:
+
+            for ptm in itertools.chain(*self.enz_sub.values()):
+
+                yield ptm
 
 
     def __len__(self):
 
-        return sum([len(esub) for esub in self.enz_sub.values()])
+        return (
+            len(self.table)
+                if self.table is not None else
+            sum([len(esub) for esub in self.enz_sub.values()])
+        )
 
 
     def __repr__(self):
@@ -827,9 +938,51 @@ class EnzymeSubstrateAggregator(session_mod.Logger):
                     )
 
         self.enz_sub = {}
+        self.table = None
         self.references = collections.defaultdict(
             lambda: collections.defaultdict(set)
         )
+        self.timing = collections.OrderedDict()
+        self._tables = {}
+
+        self._tasks = self._build_tasks()
+        workers = min(
+            self.workers or settings.get('enz_sub_workers') or 1,
+            len(self._tasks),
+        )
+
+        # the results are merged in the order of the tasks,
+        # independently of the order of their completion
+        for label, (enz_sub, elapsed) in zip(
+            (task[0] for task in self._tasks),
+            self._run_tasks(workers),
+        ):
+
+            self.timing[label] = elapsed
+            extend_lists(enz_sub)
+
+            self._log(
+                'Processed `%s` in %.02f seconds: %u records.' % (
+                    label,
+                    elapsed,
+                    len(enz_sub),
+                )
+            )
+
+        self._tables = {}
+        self.references = dict(self.references)
+        self.update_ptm_lookup_dict()
+
+
+    def _build_tasks(self):
+        """
+        Creates a list of processing tasks: the direct lookup of each
+        resource and their homology translation from each source organism.
+        Each task is a tuple of a label, a processor class and its
+        arguments.
+        """
+
+        tasks = []
 
         for input_param in self.input_param:
 
@@ -845,14 +998,6 @@ class EnzymeSubstrateAggregator(session_mod.Logger):
                 input_param.input_method
             )
 
-            self._log(
-                'Loading enzyme-substrate interactions '
-                'from resource `%s` by method `%s`.' % (
-                    name,
-                    input_method,
-                )
-            )
-
             args = (
                 input_param
                     if isinstance(input_param, dict) else
@@ -866,44 +1011,178 @@ class EnzymeSubstrateAggregator(session_mod.Logger):
                 )
             ):
 
-                self._log(
-                    'Loading enzyme-substrate interactions '
-                    'for taxon `%u`.' % self.ncbi_tax_id
-                )
+                tasks.append((
+                    name,
+                    EnzymeSubstrateProcessor,
+                    dict(
+                        ncbi_tax_id = self.ncbi_tax_id,
+                        trace = self.trace,
+                        **args
+                    ),
+                ))
+
+            for source_taxon in self.map_by_homology_from:
+
+                tasks.append((
+                    '%s (homology from %u)' % (name, source_taxon),
+                    EnzymeSubstrateHomologyProcessor,
+                    dict(
+                        ncbi_tax_id = self.ncbi_tax_id,
+                        map_by_homology_from = {source_taxon},
+                        trace = self.trace,
+                        homology_only_swissprot = (
+                            self.homology_only_swissprot
+                        ),
+                        ptm_homology_strict = self.ptm_homology_strict,
+                        **args
+                    ),
+                ))
 
-                proc = EnzymeSubstrateProcessor(
-                    ncbi_tax_id = self.ncbi_tax_id,
-                    trace = self.trace,
-                    **args,
-                )
+        return tasks
 
-                extend_lists(proc.__iter__())
 
-            if self.map_by_homology_from:
+    def _run_tasks(self, workers):
+        """
+        Runs the processing tasks and returns the list of records and the
+        elapsed time for each, in the order of the tasks.
+        """
 
-                self._log(
-                    'Mapping `%s` by homology from taxons %s to %u.' % (
-                        input_method,
-                        ', '.join(
-                            '%u' % tax for tax in self.map_by_homology_from
-                        ),
-                        self.ncbi_tax_id,
+        if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+
+            self._log(
+                'Processing %u enzyme-substrate tasks '
+                'in %u processes.' % (len(self._tasks), workers)
+            )
+            # the workers inherit these tables by forking
+            self._preload_tables()
+            globals()['_aggregator'] = self
+
+            try:
+
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers = workers,
+                    mp_context = multiprocessing.get_context('fork'),
+                ) as executor:
+
+                    return list(
+                        executor.map(_run_task, range(len(self._tasks)))
                     )
-                )
 
-                proc = EnzymeSubstrateHomologyProcessor(
-                    ncbi_tax_id = self.ncbi_tax_id,
-                    map_by_homology_from = self.map_by_homology_from,
-                    trace = self.trace,
-                    homology_only_swissprot = self.homology_only_swissprot,
-                    ptm_homology_strict = self.ptm_homology_strict,
-                    **args
+            finally:
+
+                globals()['_aggregator'] = None
+
+        return [self._run_task(i) for i in range(len(self._tasks))]
+
+
+    def _run_task(self, i):
+
+        label, proc_cls, args = self._tasks[i]
+
+        t0 = time.time()
+
+        self._log('Loading enzyme-substrate interactions: `%s`.' % label)
+
+        proc = self._new_processor(proc_cls, **args)
+        enz_sub = list(proc)
+
+        return enz_sub, time.time() - t0
+
+
+    def _new_processor(self, proc_cls, **kwargs):
+        """
+        Creates a processor which uses the sequence, proteome and homology
+        tables loaded by the previous ones, instead of loading them again.
+        """
+
+        proc = proc_cls.__new__(proc_cls)
+
+        for attr, table in iteritems(self._tables):
+
+            setattr(proc, attr, table)
+
+        proc_cls.__init__(proc, **kwargs)
+
+        for attr in self._shared_tables:
+
+            if hasattr(proc, attr):
+
+                self._tables[attr] = getattr(proc, attr)
+
+        return proc
+
+
+    _shared_tables = ('seq', '_taxonomy', '_proteomes', 'homo', 'ptmhomo')
+
+
+    def _preload_tables(self):
+        """
+        Loads the sequences, proteomes, homology and ID translation tables
+        needed by the processors, so the worker processes can share them.
+        """
+
+        taxa = {self.ncbi_tax_id}
+
+        if self.map_by_homology_from:
+
+            taxa.update(self.map_by_homology_from)
+            # homology processors allow mixed organisms
+            taxa.update({9606, 10090, 10116})
+
+            ptm_homology = homology.PtmHomology(
+                target = self.ncbi_tax_id,
+                only_swissprot = self.homology_only_swissprot,
+                strict = self.ptm_homology_strict,
+            )
+
+            for source_taxon in self.map_by_homology_from:
+
+                ptm_homology.homologene_uniprot_dict(source_taxon)
+
+            self._tables['homo'] = ptm_homology.homo
+            self._tables['ptmhomo'] = ptm_homology.ptmhomo
+            self._tables['seq'] = ptm_homology.seq
+            self._tables['_taxonomy'] = ptm_homology._taxonomy
+            self._tables['_proteomes'] = ptm_homology._proteomes
+
+        tables = _SharedTables(**self._tables)
+
+        id_types = set()
+
+        for _label, _proc_cls, args in self._tasks:
+
+            param = args.get('input_param', args)
+
+            for attr in ('id_type_enzyme', 'id_type_substrate'):
+
+                id_type = (
+                    param.get(attr)
+                        if isinstance(param, dict) else
+                    getattr(param, attr, None)
                 )
 
-                extend_lists(proc.__iter__())
+                for _id_type in common.to_list(id_type or 'genesymbol'):
 
-        self.references = dict(self.references)
-        self.update_ptm_lookup_dict()
+                    id_types.add(
+                        _id_type[0]
+                            if isinstance(_id_type, (list, tuple)) else
+                        _id_type
+                    )
+
+        mapper = mapping.get_mapper()
+
+        for taxon in sorted(taxa):
+
+            tables.load_seq(taxon)
+            tables.load_proteome(taxon, False)
+
+            for id_type in sorted(id_types - {'uniprot'}):
+
+                mapper.which_table(id_type, 'uniprot', ncbi_tax_id = taxon)
+
+        self._tables['seq'] = tables.seq
+        self._tables['_taxonomy'] = tables._taxonomy
+        self._tables['_proteomes'] = tables._proteomes
 
 
     def update_ptm_lookup_dict(self):
@@ -936,25 +1215,77 @@ class EnzymeSubstrateAggregator(session_mod.Logger):
 
 
     @staticmethod
-    def uniq_enz_sub(enz_sub):
+    def _merge_key(es):
+        """
+        Returns a hashable key for an enzyme-substrate relationship which is
+        the same for all records considered equal (see
+        ``DomainMotif.__eq__``). Returns `None` if equality can not be
+        decided by a key: the residue or the modification type is unknown,
+        or the domain of the enzyme has boundaries.
+        """
+
+        ptm = es.ptm
+
+        if (
+            ptm.residue is None or
+            ptm.typ is None or
+            (es.domain.start and es.domain.end) is not None
+        ):
+
+            return None
+
+        return (
+            ptm.protein,
+            ptm.residue.protein,
+            ptm.residue.number,
+            ptm.residue.name,
+            ptm.typ,
+        )
+
+
+    @classmethod
+    def uniq_enz_sub(cls, enz_sub):
+        """
+        Merges the equal elements of a list of enzyme-substrate
+        relationships. The order of the unique elements follows their
+        first occurrence in the list.
+        """
 
         enz_sub_uniq = []
+        # unique elements by their keys
+        index = {}
+        # unique elements without key, these we need to compare one by one
+        nokey = []
 
         for es in enz_sub:
 
-            merged = False
+            key = cls._merge_key(es)
+
+            if key is None:
 
-            for i, es_u in enumerate(enz_sub_uniq):
+                matches = [es_u for es_u in enz_sub_uniq if es == es_u]
 
-                if es == es_u:
+            else:
+
+                matches = [index[key]] if key in index else []
+                matches.extend(es_u for es_u in nokey if es == es_u)
+
+            for es_u in matches:
 
-                    enz_sub_uniq[i].merge(es)
-                    merged = True
+                es_u.merge(es)
 
-            if not merged:
+            if not matches:
 
                 enz_sub_uniq.append(es)
 
+                if key is None:
+
+                    nokey.append(es)
+
+                else:
+
+                    index[key] = es
+
         return enz_sub_uniq
 
 
@@ -977,12 +1308,20 @@ class EnzymeSubstrateAggregator(session_mod.Logger):
             'curation_effort',
         ]
 
-        self.df = pd.DataFrame(
-            [
-                dm.get_line(resources_only_primary = resources_only_primary)
-                for dm in self
-            ],
-            columns = hdr,
+        self.df = (
+            self.table.make_df(
+                resources_only_primary = resources_only_primary,
+            )
+                if self.table is not None else
+            pd.DataFrame(
+                [
+                    dm.get_line(
+                        resources_only_primary = resources_only_primary,
+                    )
+                    for dm in self
+                ],
+                columns = hdr,
+            )
         ).astype(
             {
                 'enzyme': 'category',
@@ -1242,6 +1581,742 @@ class EnzymeSubstrateAggregator(session_mod.Logger):
 
 
 
+class EnzymeSubstrateTable(object):
+
+
+    def __init__(
+            self,
+            enzyme,
+            substrate,
+            residue_type,
+            residue_offset,
+            modification,
+            isoform,
+            isoforms,
+            mutated,
+            motif_start,
+            motif_end,
+            motif_instance,
+            domain,
+            pnetw_score,
+            ev_indptr,
+            ev_resource,
+            ref_indptr,
+            ref_index,
+            proteins,
+            residue_types,
+            modifications,
+            isoform_sets,
+            instances,
+            domains,
+            resources,
+            references,
+            extras = None,
+        ):
+        """
+        Columnar store of enzyme-substrate relationships. Each record is
+        a row across integer coded arrays: the proteins, residue types,
+        modification types, isoform sets, motif sequences, resources and
+        literature references are stored once in vocabularies and the
+        records refer to them by their indices. The evidences of record
+        ``i`` are ``ev_indptr[i]:ev_indptr[i + 1]``, with resources in
+        ``ev_resource``, the references of evidence ``j`` are
+        ``ref_index[ref_indptr[j]:ref_indptr[j + 1]]``.
+
+        The enzyme domains are stored as tuples of domain name, domain ID
+        type, start, end and isoform. The rarely used attributes, i.e. the
+        PDB structures of the records and the domains and the resource
+        specific extra attributes, are kept in the ``extras`` dict by
+        record index. The residue and the motif of a record are on the
+        same isoform as its PTM.
+
+        Use ``from_records`` to create the table from
+        ``pypath.internals.intera.DomainMotif`` objects. Indexing and
+        iteration materialize such objects on the fly.
+        """
+
+        for k, v in iteritems(locals()):
+
+            if k != 'self':
+
+                setattr(self, k, v)
+
+        self.extras = extras or {}
+
+        self._protein_id = dict(
+            (protein.identifier, i)
+            for i, protein in enumerate(self.proteins)
+        )
+
+
+    _record_arrays = (
+        'enzyme',
+        'substrate',
+        'residue_type',
+        'residue_offset',
+        'modification',
+        'isoform',
+        'isoforms',
+        'mutated',
+        'motif_start',
+        'motif_end',
+        'motif_instance',
+        'domain',
+        'pnetw_score',
+    )
+
+    _vocabularies = (
+        'proteins',
+        'residue_types',
+        'modifications',
+        'isoform_sets',
+        'instances',
+        'domains',
+        'resources',
+        'references',
+    )
+
+    # attributes of ``DomainMotif`` objects stored in the arrays above
+    _record_attrs = {'ptm', 'domain', 'evidences', 'pdbs', 'pnetw_score'}
+
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Creates the table from an iterable of
+        ``pypath.internals.intera.DomainMotif`` objects.
+        """
+
+        codes = dict(
+            (voc, collections.OrderedDict())
+            for voc in cls._vocabularies
+        )
+
+        def code(voc, key, value = None):
+
+            if key not in codes[voc]:
+
+                codes[voc][key] = (
+                    len(codes[voc]),
+                    key if value is None else value,
+                )
+
+            return codes[voc][key][0]
+
+        columns = dict((col, []) for col in cls._record_arrays)
+        ev_indptr = [0]
+        ev_resource = []
+        ref_indptr = [0]
+        ref_index = []
+        extras = {}
+
+        for i, es in enumerate(records):
+
+            ptm = es.ptm
+            motif = ptm.motif
+            domain = es.domain
+
+            columns['enzyme'].append(
+                code('proteins', domain.protein.identifier, domain.protein)
+            )
+            columns['substrate'].append(
+                code('proteins', ptm.protein.identifier, ptm.protein)
+            )
+            columns['residue_type'].append(
+                code('residue_types', ptm.residue.name)
+            )
+            columns['residue_offset'].append(ptm.residue.number)
+            columns['modification'].append(code('modifications', ptm.typ))
+            columns['isoform'].append(ptm.isoform)
+            columns['isoforms'].append(
+                code('isoform_sets', tuple(sorted(ptm.isoforms)))
+            )
+            columns['mutated'].append(ptm.residue.mutated)
+            columns['motif_start'].append(
+                -1 if motif is None or motif.start is None else motif.start
+            )
+            columns['motif_end'].append(
+                -1 if motif is None or motif.end is None else motif.end
+            )
+            columns['motif_instance'].append(
+                -1
+                    if motif is None else
+                code('instances', motif.instance)
+            )
+            columns['domain'].append(
+                code(
+                    'domains',
+                    (
+                        domain.domain,
+                        domain.domain_id_type,
+                        domain.start,
+                        domain.end,
+                        domain.isoform,
+                    ),
+                )
+            )
+            columns['pnetw_score'].append(
+                np.nan if es.pnetw_score is None else es.pnetw_score
+            )
+
+            extra = dict(
+                (attr, value)
+                for attr, value in iteritems(es.__dict__)
+                if attr not in cls._record_attrs
+            )
+
+            if es.pdbs:
+
+                extra['pdbs'] = es.pdbs
+
+            if domain.pdbs:
+
+                extra['domain_pdbs'] = domain.pdbs
+
+            if extra:
+
+                extras[i] = extra
+
+            for ev in es.evidences:
+
+                ev_resource.append(
+                    code('resources', ev.resource.key, ev.resource)
+                )
+                ref_index.extend(
+                    code('references', ref)
+                    for ref in ev.references
+                )
+                ref_indptr.append(len(ref_index))
+
+            ev_indptr.append(len(ev_resource))
+
+        vocabularies = dict(
+            (
+                voc,
+                np.array(
+                    [value for _, value in codes[voc].values()] +
+                    # this way numpy won't create 2 dimensional arrays
+                    # from the tuples of isoforms
+                    [None],
+                    dtype = object,
+                )[:-1],
+            )
+            for voc in cls._vocabularies
+        )
+
+        return cls(
+            enzyme = np.array(columns['enzyme'], dtype = np.int32),
+            substrate = np.array(columns['substrate'], dtype = np.int32),
+            residue_type = np.array(columns['residue_type'], dtype = np.int8),
+            residue_offset = np.array(
+                columns['residue_offset'],
+                dtype = np.int32,
+            ),
+            modification = np.array(
+                columns['modification'],
+                dtype = np.int16,
+            ),
+            isoform = np.array(columns['isoform'], dtype = np.int32),
+            isoforms = np.array(columns['isoforms'], dtype = np.int32),
+            mutated = np.array(columns['mutated'], dtype = bool),
+            motif_start = np.array(columns['motif_start'], dtype = np.int32),
+            motif_end = np.array(columns['motif_end'], dtype = np.int32),
+            motif_instance = np.array(
+                columns['motif_instance'],
+                dtype = np.int32,
+            ),
+            domain = np.array(columns['domain'], dtype = np.int32),
+            pnetw_score = np.array(
+                columns['pnetw_score'],
+                dtype = np.float64,
+            ),
+            ev_indptr = np.array(ev_indptr, dtype = np.int64),
+            ev_resource = np.array(ev_resource, dtype = np.int32),
+            ref_indptr = np.array(ref_indptr, dtype = np.int64),
+            ref_index = np.array(ref_index, dtype = np.int32),
+            extras = extras,
+            **vocabularies
+        )
+
+
+    def __len__(self):
+
+        return len(self.enzyme)
+
+
+    def __repr__(self):
+
+        return '<Enzyme-substrate table: %u relationships>' % len(self)
+
+
+    def __iter__(self):
+
+        for i in xrange(len(self)):
+
+            yield self.record(i)
+
+
+    def __getitem__(self, i):
+
+        return self.record(i)
+
+
+    def _evidences(self, i):
+
+        return evidence.Evidences(
+            evidence.Evidence(
+                resource = self.resources[self.ev_resource[j]],
+                references = set(
+                    self.references[
+                        self.ref_index[
+                            self.ref_indptr[j]:self.ref_indptr[j + 1]
+                        ]
+                    ]
+                ),
+            )
+            for j in xrange(self.ev_indptr[i], self.ev_indptr[i + 1])
+        )
+
+
+    def record(self, i):
+        """
+        Creates a ``pypath.internals.intera.DomainMotif`` object from one
+        record of the table.
+        """
+
+        enzyme = self.proteins[self.enzyme[i]]
+        substrate = self.proteins[self.substrate[i]]
+        isoforms = set(self.isoform_sets[self.isoforms[i]])
+        isoform = int(self.isoform[i])
+        evidences = self._evidences(i)
+        extra = copy.deepcopy(self.extras.get(i, {}))
+        domain, domain_id_type, start, end, domain_isoform = (
+            self.domains[self.domain[i]]
+        )
+
+        motif = (
+            None
+                if self.motif_instance[i] == -1 else
+            intera.Motif(
+                substrate,
+                (
+                    None
+                        if self.motif_start[i] == -1 else
+                    int(self.motif_start[i])
+                ),
+                (
+                    None
+                        if self.motif_end[i] == -1 else
+                    int(self.motif_end[i])
+                ),
+                instance = self.instances[self.motif_instance[i]],
+                isoform = isoform,
+            )
+        )
+        residue = intera.Residue(
+            int(self.residue_offset[i]),
+            self.residue_types[self.residue_type[i]],
+            substrate,
+            isoform = isoform,
+            mutated = bool(self.mutated[i]),
+        )
+        ptm = intera.Ptm(
+            substrate,
+            motif = motif,
+            residue = residue,
+            typ = self.modifications[self.modification[i]],
+            evidences = evidences,
+            isoform = isoform,
+        )
+        ptm.add_isoform(isoforms)
+        domain = intera.Domain(
+            protein = enzyme,
+            domain = domain,
+            domain_id_type = domain_id_type,
+            start = start,
+            end = end,
+            isoform = domain_isoform,
+        )
+        domain.pdbs = extra.pop('domain_pdbs', {})
+        dommot = intera.DomainMotif(
+            domain = domain,
+            ptm = ptm,
+            evidences = evidences,
+        )
+        dommot.pdbs = extra.pop('pdbs', set())
+        dommot.pnetw_score = (
+            None
+                if np.isnan(self.pnetw_score[i]) else
+            float(self.pnetw_score[i])
+        )
+
+        for attr, value in iteritems(extra):
+
+            setattr(dommot, attr, value)
+
+        return dommot
+
+
+    def subset(self, idx):
+        """
+        Returns a new table with the selected records; the vocabularies
+        are shared with this table.
+
+        :param numpy.ndarray idx:
+            Boolean mask or integer indices of records.
+        """
+
+        idx = np.asarray(idx)
+        idx = np.flatnonzero(idx) if idx.dtype == bool else idx
+
+        ev_idx = self._ranges(self.ev_indptr, idx)
+        ref_idx = self._ranges(self.ref_indptr, ev_idx)
+
+        return EnzymeSubstrateTable(
+            ev_indptr = self._indptr(self.ev_indptr, idx),
+            ev_resource = self.ev_resource[ev_idx],
+            ref_indptr = self._indptr(self.ref_indptr, ev_idx),
+            ref_index = self.ref_index[ref_idx],
+            extras = dict(
+                (j, self.extras[i])
+                for j, i in enumerate(idx)
+                if i in self.extras
+            ),
+            **dict(
+                [
+                    (col, getattr(self, col)[idx])
+                    for col in self._record_arrays
+                ] +
+                [
+                    (voc, getattr(self, voc))
+                    for voc in self._vocabularies
+                ]
+            )
+        )
+
+
+    @staticmethod
+    def _ranges(indptr, idx):
+        """
+        Concatenates the ranges ``indptr[i]:indptr[i + 1]`` for each ``i``
+        in ``idx``.
+        """
+
+        starts = indptr[idx]
+        lengths = indptr[idx + 1] - starts
+
+        return (
+            np.repeat(starts - np.cumsum(lengths) + lengths, lengths) +
+            np.arange(lengths.sum())
+        )
+
+
+    @staticmethod
+    def _indptr(indptr, idx):
+
+        return np.concatenate((
+            [0],
+            np.cumsum(indptr[idx + 1] - indptr[idx]),
+        )).astype(np.int64)
+
+
+    def _protein_mask(self, column, proteins):
+
+        codes = [
+            self._protein_id[
+                protein.identifier
+                    if hasattr(protein, 'identifier') else
+                protein
+            ]
+            for protein in common.to_list(proteins)
+            if (
+                getattr(protein, 'identifier', protein) in self._protein_id
+            )
+        ]
+
+        return np.isin(getattr(self, column), codes)
+
+
+    def by_enzyme(self, enzymes):
+        """
+        Selects the records of one or more enzymes.
+        """
+
+        return self.subset(self._protein_mask('enzyme', enzymes))
+
+
+    def by_substrate(self, substrates):
+        """
+        Selects the records of one or more substrates.
+        """
+
+        return self.subset(self._protein_mask('substrate', substrates))
+
+
+    def by_pair(self, enzyme, substrate):
+        """
+        Selects the records of one enzyme-substrate pair.
+        """
+
+        return self.subset(
+            self._protein_mask('enzyme', enzyme) &
+            self._protein_mask('substrate', substrate)
+        )
+
+
+    def by_residue(self, substrate, offset, residue_type = None):
+        """
+        Selects the records of one residue of a substrate.
+
+        :param str residue_type:
+            One letter code of the amino acid, by default any.
+        """
+
+        mask = (
+            self._protein_mask('substrate', substrate) &
+            (self.residue_offset == offset)
+        )
+
+        if residue_type is not None:
+
+            mask &= np.isin(
+                self.residue_type,
+                np.flatnonzero(self.residue_types == residue_type),
+            )
+
+        return self.subset(mask)
+
+
+    def by_modification(self, modification):
+        """
+        Selects the records of one modification type.
+        """
+
+        return self.subset(
+            np.isin(
+                self.modification,
+                np.flatnonzero(self.modifications == modification),
+            )
+        )
+
+
+    def by_resource(self, resource, only_primary = False):
+        """
+        Selects the records supported by a resource.
+
+        :param str resource:
+            Name of the resource.
+        :param bool only_primary:
+            Consider only the records directly from the resource, not
+            the ones obtained from it via another resource.
+        """
+
+        resources = np.array([
+            res.name == resource and not (only_primary and res.via)
+            for res in self.resources
+        ], dtype = bool)
+
+        ev_mask = resources[self.ev_resource] if len(resources) else (
+            np.zeros(len(self.ev_resource), dtype = bool)
+        )
+        ev_record = np.repeat(
+            np.arange(len(self)),
+            np.diff(self.ev_indptr),
+        )
+
+        return self.subset(np.unique(ev_record[ev_mask]))
+
+
+    def pairs(self):
+        """
+        Returns a dict with enzyme-substrate pairs of entities as keys and
+        arrays of the indices of their records as values.
+        """
+
+        order = np.lexsort((self.substrate, self.enzyme))
+        keys = np.column_stack((self.enzyme[order], self.substrate[order]))
+        bounds = np.flatnonzero(np.any(np.diff(keys, axis = 0), axis = 1)) + 1
+        groups = np.split(order, bounds) if len(order) else []
+
+        return collections.OrderedDict(
+            (
+                (
+                    self.proteins[self.enzyme[group[0]]],
+                    self.proteins[self.substrate[group[0]]],
+                ),
+                np.sort(group),
+            )
+            for group in groups
+        )
+
+
+    def make_df(self, resources_only_primary = False):
+        """
+        Creates a data frame with the same content as
+        ``EnzymeSubstrateAggregator.make_df``, directly from the arrays.
+        """
+
+        resource_labels = np.array(
+            [
+                '%s%s' % (res.name, '_%s' % res.via if res.via else '')
+                for res in self.resources
+            ] + [None],
+            dtype = object,
+        )[:-1]
+        primary = np.array(
+            [not res.via for res in self.resources],
+            dtype = bool,
+        )
+        ev_primary = (
+            primary[self.ev_resource]
+                if len(primary) else
+            np.zeros(0, dtype = bool)
+        )
+        n_refs = np.diff(self.ref_indptr)
+
+        sources = []
+        references = []
+        curation_effort = []
+
+        for i in xrange(len(self)):
+
+            ev = np.arange(self.ev_indptr[i], self.ev_indptr[i + 1])
+            res = self.ev_resource[ev]
+            prim = ev_primary[ev]
+
+            sources.append(';'.join(sorted(set(
+                resource_labels[
+                    res if not resources_only_primary else res[prim]
+                ]
+            ))))
+            references.append(';'.join(sorted(
+                '%s:%s' % (resource_labels[r], ref.pmid)
+                for j, r in zip(ev[prim], res[prim])
+                for ref in self.references[
+                    self.ref_index[self.ref_indptr[j]:self.ref_indptr[j + 1]]
+                ]
+            )))
+            curation_effort.append(int(n_refs[ev[prim]].sum()))
+
+        enzymes = self.proteins[self.enzyme]
+        substrates = self.proteins[self.substrate]
+
+        df = pd.DataFrame(
+            collections.OrderedDict((
+                ('enzyme', [p.identifier for p in enzymes]),
+                ('enzyme_genesymbol', [p.label for p in enzymes]),
+                ('substrate', [p.identifier for p in substrates]),
+                ('substrate_genesymbol', [p.label for p in substrates]),
+                (
+                    'isoforms',
+                    np.array(
+                        [
+                            ';'.join('%u' % iso for iso in isoforms)
+                            for isoforms in self.isoform_sets
+                        ] + [None],
+                        dtype = object,
+                    )[:-1][self.isoforms],
+                ),
+                (
+                    'residue_type',
+                    self.residue_types[self.residue_type],
+                ),
+                ('residue_offset', self.residue_offset),
+                (
+                    'modification',
+                    self.modifications[self.modification],
+                ),
+                ('sources', sources),
+                ('references', references),
+                ('curation_effort', curation_effort),
+            ))
+        )
+
+        return df
+
+
+class EnzymeSubstratePairs(collections.abc.Mapping):
+    """
+    Read only view of an enzyme-substrate table as a dict of lists of
+    ``pypath.internals.intera.DomainMotif`` objects by pairs of enzyme and
+    substrate entities. The objects are created at each access.
+    """
+
+    def __init__(self, table):
+
+        self.table = table
+        self._pairs = table.pairs()
+        self._keys = dict(
+            (
+                (enzyme.identifier, substrate.identifier),
+                (enzyme, substrate),
+            )
+            for enzyme, substrate in self._pairs.keys()
+        )
+
+
+    def _key(self, key):
+
+        return self._keys.get(
+            tuple(getattr(e, 'identifier', e) for e in key)
+        )
+
+
+    def __getitem__(self, key):
+
+        _key = self._key(key)
+
+        if _key is None:
+
+            raise KeyError(key)
+
+        return [self.table.record(i) for i in self._pairs[_key]]
+
+
+    def __contains__(self, key):
+
+        return self._key(key) is not None
+
+
+    def __iter__(self):
+
+        return iter(self._pairs.keys())
+
+
+    def __len__(self):
+
+        return len(self._pairs)
+
+
+class _SharedTables(homology.Proteomes, homology.SequenceContainer):
+    """
+    Sequences and proteomes to be shared by enzyme-substrate processors.
+    """
+
+    def __init__(
+            self,
+            seq = None,
+            _taxonomy = None,
+            _proteomes = None,
+            **kwargs
+        ):
+
+        self.seq = seq or {}
+        self._taxonomy = _taxonomy or {}
+        self._proteomes = _proteomes or {}
+
+        homology.SequenceContainer.__init__(self)
+        homology.Proteomes.__init__(self)
+
+
+def _run_task(i):
+    """
+    Runs one processing task of the aggregator in a worker process.
+    """
+
+    return globals()['_aggregator']._run_task(i)
+
+
 def init_db(**kwargs):
 
     globals()['db'] = EnzymeSubstrateAggregator(**kwargs)
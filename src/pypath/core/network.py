@@ -30,6 +30,8 @@ import itertools
 import functools
 import copy as copy_mod
 import pickle
+import csv
+import gzip
 
 import numpy as np
 import pandas as pd
@@ -865,14 +867,15 @@ class Network(session_mod.Logger):
                 # if no method available it gonna be None
                 input_func = inputs.get_method(networkinput.input)
 
-                # reading from remote or local file, or executing import
-                # function:
-                if (
+                remote = (
                     isinstance(networkinput.input, common.basestring) and (
                         networkinput.input.startswith('http') or
                         networkinput.input.startswith('ftp')
                     )
-                ):
+                )
+                c = None
+
+                if remote:
 
                     curl_use_cache = not redownload
                     c = curl.Curl(
@@ -881,6 +884,24 @@ class Network(session_mod.Logger):
                         large=True,
                         cache=curl_use_cache
                     )
+
+                # simple delimited files are read into a data frame
+                # and processed column by column
+                table = self._read_table(networkinput, c)
+
+                if table is not None:
+
+                    infile = table
+
+                # reading from remote or local file, or executing import
+                # function:
+                elif remote:
+
+                    if hasattr(c.fileobj, 'seek'):
+
+                        # the columnar reader might have read it already
+                        c.fileobj.seek(0)
+
                     infile = c.fileobj.read()
 
                     if type(infile) is bytes:
@@ -1037,6 +1058,29 @@ class Network(session_mod.Logger):
             lnum = 0 # we need to define it here to avoid errors if the
                      # loop below runs zero cycles
 
+            if isinstance(infile, pd.DataFrame):
+
+                # simple delimited files are processed column by column,
+                # the row by row reader below runs zero cycles
+                (
+                    lnum,
+                    edge_list,
+                    input_filtered,
+                    ref_filtered,
+                    taxon_filtered,
+                ) = self._read_table_columns(
+                    table = infile,
+                    networkinput = networkinput,
+                    resource = _resource,
+                    dir_col = dir_col,
+                    dir_val = dir_val,
+                    dir_sep = dir_sep,
+                    ref_col = ref_col,
+                    ref_sep = ref_sep,
+                    must_have_references = must_have_references,
+                )
+                infile = ()
+
             prg = progress.Progress(
                 iterable = infile,
                 name = 'Reading network data - %s' % networkinput.name,
@@ -1365,6 +1409,527 @@ class Network(session_mod.Logger):
         return infile, edge_list_mapped
 
 
+    def _read_table(self, networkinput, c = None):
+        """
+        Reads a delimited text file, local or remote, into a data frame
+        by the C engine of ``pandas.read_csv``, for processing it column by
+        column. All values are read as strings, as the row by row reader
+        does.
+
+        :arg pypath.input_formats.NetworkInput networkinput:
+            The definition of the input.
+        :arg pypath.share.curl.Curl c:
+            The already opened download of a remote input, which is
+            passed on to the row by row reader if the table can not be
+            read here. Remote inputs are not read without it.
+
+        :return:
+            (*pandas.DataFrame*) -- The table without the blank lines
+            and the lines skipped as header, the number of the last line
+            is stored in the ``lnum`` item of the ``attrs`` of the data
+            frame. ``None`` if the input is not a simple delimited file
+            or could not be read this way; in this case the input has to
+            be read by the row by row reader.
+        """
+
+        inp = networkinput.input
+        sep = networkinput.separator
+
+        if (
+            not settings.get('network_columnar_reader') or
+            not isinstance(inp, common.basestring) or
+            not isinstance(sep, common.basestring) or
+            len(sep) != 1
+        ):
+
+            return None
+
+        remote = inp.startswith('http') or inp.startswith('ftp')
+
+        if remote:
+
+            if (
+                c is None or
+                c.type != 'plain' or
+                not hasattr(c.fileobj, 'seek')
+            ):
+
+                return None
+
+            source = c.fileobj
+            # the row by row reader falls back to latin-1
+            encodings = ('utf-8', 'iso-8859-1')
+
+        elif (
+            os.path.isfile(inp) and
+            not inp.lower().endswith(('zip', 'tar', 'tgz', 'tar.gz'))
+        ):
+
+            source = inp
+            encodings = ('utf-8',)
+
+        else:
+
+            return None
+
+        table = None
+
+        for encoding in encodings:
+
+            try:
+
+                if hasattr(source, 'seek'):
+
+                    source.seek(0)
+
+                table = pd.read_csv(
+                    source,
+                    sep = sep,
+                    header = None,
+                    dtype = str,
+                    na_filter = False,
+                    quoting = csv.QUOTE_NONE,
+                    skip_blank_lines = False,
+                    engine = 'c',
+                    encoding = encoding,
+                )
+                break
+
+            except UnicodeDecodeError:
+
+                continue
+
+            except (ValueError, OSError) as e:
+
+                self._log(
+                    'Could not read `%s` as a table, falling back to '
+                    'reading it line by line: %s' % (inp, str(e))
+                )
+
+                return None
+
+        if table is None:
+
+            return None
+
+        values = [table[col].to_numpy() for col in table.columns]
+        # rows of the lines without separator
+        empty = np.ones(len(table), dtype = bool)
+
+        for col in values[1:]:
+
+            empty &= col == ''
+
+        lengths = np.fromiter(
+            (len(v) for v in values[0]),
+            dtype = np.int64,
+            count = len(table),
+        )
+        blank = empty & (lengths == 0)
+
+        # the lines skipped by the row by row reader, i.e. the ones
+        # shorter than 2 characters
+        if remote:
+
+            # remote files are split into lines without line breaks
+            skip = empty & (lengths <= 1)
+
+        else:
+
+            # the lines of local files include the line break
+            skip = blank.copy()
+
+            if (
+                len(table) and
+                empty[-1] and
+                lengths[-1] == 1 and
+                not self._ends_with_newline(inp)
+            ):
+
+                skip[-1] = True
+
+        # the line numbers as in the row by row reader: remote files are
+        # split into lines with the blank lines removed
+        lnums = (
+            np.cumsum(~blank) - 1
+                if remote else
+            np.arange(len(table))
+        )
+        keep = ~skip
+
+        if networkinput.header:
+
+            keep &= lnums != 1
+
+        table = table[keep]
+        table.attrs['lnum'] = int(lnums[-1]) if len(lnums) else 0
+
+        self._log(
+            'Read %u rows from `%s` by the columnar reader.' % (
+                len(table),
+                inp,
+            )
+        )
+
+        return table
+
+
+    @staticmethod
+    def _ends_with_newline(path):
+        """
+        Tells if the last character of a plain or gzipped file is a line
+        break.
+        """
+
+        gz = path.lower().endswith('gz')
+        last = b''
+
+        with (gzip.open if gz else open)(path, 'rb') as fp:
+
+            if not gz:
+
+                fp.seek(max(os.path.getsize(path) - 1, 0))
+
+            for chunk in iter(functools.partial(fp.read, 1 << 20), b''):
+
+                last = chunk[-1:]
+
+        return last in (b'\n', b'\r')
+
+
+    @staticmethod
+    def _by_value(values, method):
+        """
+        Calls ``method`` once for each distinct value in ``values``.
+
+        :return:
+            (*list*) -- The result for each element of ``values``.
+        """
+
+        codes, uniques = pd.factorize(values)
+        results = [method(value) for value in uniques]
+
+        return [results[code] for code in codes]
+
+
+    def _read_table_columns(
+            self,
+            table,
+            networkinput,
+            resource,
+            dir_col,
+            dir_val,
+            dir_sep,
+            ref_col,
+            ref_sep,
+            must_have_references,
+        ):
+        """
+        Creates the edge list from a table read by ``_read_table``. The
+        filters, directions, references, taxa, signs and resources are
+        processed once for each distinct value of the columns they
+        depend on, and then assigned to the rows. Each step processes
+        only the rows which passed the previous steps, hence the results
+        and the numbers of filtered rows are identical to those of the
+        row by row reader.
+
+        :return:
+            (*tuple*) -- The number of the last line, the edge list, and
+            the numbers of rows removed by the filters, for the lack of
+            references and by the taxon filters.
+        """
+
+        columns = dict(
+            (col, table[col].to_numpy(dtype = object))
+            for col in table.columns
+        )
+        rows = np.arange(len(table))
+
+        def column(col):
+
+            return columns[col][rows]
+
+        # applying filters:
+        keep = np.ones(len(rows), dtype = bool)
+
+        for filters, negative in (
+            (networkinput.negative_filters, True),
+            (networkinput.positive_filters, False),
+        ):
+
+            for filtr in filters or ():
+
+                filtr_val = common.to_set(filtr[1])
+                sep = filtr[2] if len(filtr) > 2 else None
+
+                match = np.array(
+                    self._by_value(
+                        column(filtr[0]),
+                        lambda value: bool(
+                            (set(value.split(sep)) if sep else {value}) &
+                            filtr_val
+                        ),
+                    ),
+                    dtype = bool,
+                )
+                keep &= ~match if negative else match
+
+        input_filtered = int((~keep).sum())
+        rows = rows[keep]
+
+        # references:
+        if ref_col is not None:
+
+            refs = self._by_value(
+                column(ref_col),
+                lambda value: pubmed_input.only_pmids([
+                    str(r).strip()
+                    for r in common.del_empty(list(set(value.split(ref_sep))))
+                ]),
+            )
+
+        else:
+
+            refs = [pubmed_input.only_pmids([])] * len(rows)
+
+        ref_filtered = 0
+
+        if must_have_references:
+
+            keep = np.array([bool(r) for r in refs], dtype = bool)
+            ref_filtered = int((~keep).sum())
+            rows = rows[keep]
+            refs = [r for r, k in zip(refs, keep) if k]
+
+        # taxa:
+        tax = networkinput.ncbi_tax_id
+
+        if isinstance(tax, int):
+
+            taxa_a = taxa_b = [tax] * len(rows)
+            keep = np.ones(len(rows), dtype = bool)
+
+        elif isinstance(tax, dict):
+
+            tax_a = tax['A'] if 'A' in tax and 'B' in tax else tax
+            tax_b = tax['B'] if 'A' in tax and 'B' in tax else tax
+            # the same as in the row by row reader
+            check_a = tax['A'] if 'A' in tax else tax
+            check_b = tax['B'] if 'B' in tax else tax
+
+            def taxon(tax_dict, check):
+
+                def _taxon(value):
+
+                    tx = self._process_taxon(
+                        tax_dict,
+                        {tax_dict['col']: value},
+                    )
+
+                    if (
+                        ('include' in check and tx not in check['include']) or
+                        ('exclude' in check and tx in check['exclude'])
+                    ):
+
+                        return False, tx
+
+                    return True, tx
+
+                return self._by_value(column(tax_dict['col']), _taxon)
+
+            taxa_a = taxon(tax_a, check_a)
+            taxa_b = taxon(tax_b, check_b)
+            keep = np.array(
+                [a[0] and b[0] for a, b in zip(taxa_a, taxa_b)],
+                dtype = bool,
+            )
+            taxa_a = [a[1] for a in taxa_a]
+            taxa_b = [b[1] for b in taxa_b]
+
+        else:
+
+            taxa_a = taxa_b = [self.ncbi_tax_id] * len(rows)
+            keep = np.ones(len(rows), dtype = bool)
+
+        keep &= np.array(
+            [a is not None and b is not None for a, b in zip(taxa_a, taxa_b)],
+            dtype = bool,
+        )
+        taxon_filtered = int((~keep).sum())
+        rows = rows[keep]
+        refs, taxa_a, taxa_b = (
+            [x for x, k in zip(lst, keep) if k]
+            for lst in (refs, taxa_a, taxa_b)
+        )
+
+        # directions and signs:
+        is_directed = networkinput.is_directed
+        sign = networkinput.sign
+
+        if is_directed and not isinstance(is_directed, tuple):
+
+            directions = [True] * len(rows)
+
+        elif dir_col is None:
+
+            directions = [
+                self._process_direction(None, dir_col, dir_val, dir_sep)
+            ] * len(rows)
+
+        else:
+
+            directions = self._by_value(
+                column(dir_col),
+                lambda value: self._process_direction(
+                    {dir_col: value},
+                    dir_col,
+                    dir_val,
+                    dir_sep,
+                ),
+            )
+
+        signs = (
+            self._by_value(
+                column(sign[0]),
+                lambda value: self._process_sign(value, sign),
+            )
+                if isinstance(sign, tuple) else
+            [(False, False)] * len(rows)
+        )
+
+        # resources:
+        res_def = networkinput.resource
+
+        if isinstance(res_def, (int, tuple)):
+
+            resources = self._by_value(
+                column(res_def if isinstance(res_def, int) else res_def[0]),
+                lambda value: common.to_set(
+                    value
+                        if isinstance(res_def, int) else
+                    value.split(res_def[1])
+                ),
+            )
+
+        else:
+
+            resources = [None] * len(rows)
+
+        secondary = {}
+
+        def resources_secondary(res):
+
+            key = tuple(res)
+
+            if key not in secondary:
+
+                secondary[key] = tuple(
+                    network_resources.resource.NetworkResource(
+                        name = sec_res,
+                        interaction_type = resource.interaction_type,
+                        data_model = resource.data_model,
+                        via = resource.name,
+                    )
+                    for sec_res in res
+                    if sec_res != resource.name
+                )
+
+            return secondary[key]
+
+        ids_a = column(networkinput.id_col_a)
+        ids_b = column(networkinput.id_col_b)
+        attr_specs = (
+            networkinput.extra_edge_attrs,
+            networkinput.extra_node_attrs_a,
+            networkinput.extra_node_attrs_b,
+        )
+        attr_cols = sorted({
+            spec[0] if isinstance(spec, tuple) else spec
+            for specs in attr_specs
+            for spec in specs.values()
+        } & set(columns.keys()))
+        attr_values = [column(col) for col in attr_cols]
+
+        edge_list = []
+
+        for i in range(len(rows)):
+
+            this_edge_dir = directions[i]
+            positive, negative = signs[i]
+            _refs = list(refs[i])
+            res = (
+                set(resources[i])
+                    if resources[i] is not None else
+                common.to_set(res_def)
+            )
+            _resources_secondary = resources_secondary(res)
+            res.add(networkinput.name)
+            id_a = ids_a[i]
+            id_b = ids_b[i]
+
+            evidences = evidence.Evidences(
+                evidences = (
+                    evidence.Evidence(
+                        resource = _res,
+                        references = _refs,
+                    )
+                    for _res in
+                    _resources_secondary + (resource,)
+                )
+            )
+
+            new_edge = {
+                'id_a': id_a.strip(),
+                'id_b': id_b.strip(),
+                'id_type_a': networkinput.id_type_a,
+                'id_type_b': networkinput.id_type_b,
+                'entity_type_a': networkinput.entity_type_a,
+                'entity_type_b': networkinput.entity_type_b,
+                'source': res,
+                'is_directed': this_edge_dir,
+                'references': _refs,
+                'positive': positive,
+                'negative': negative,
+                'taxon_a': taxa_a[i],
+                'taxon_b': taxa_b[i],
+                'interaction_type': networkinput.interaction_type,
+                'evidences': evidences,
+            }
+
+            line = dict(
+                (col, values[i])
+                for col, values in zip(attr_cols, attr_values)
+            )
+            attrs_edge, attrs_node_a, attrs_node_b = (
+                self._process_attrs(line, spec, rows[i])
+                for spec in attr_specs
+            )
+
+            if networkinput.mark_source:
+
+                attrs_node_a[networkinput.mark_source] = this_edge_dir
+
+            if networkinput.mark_target:
+
+                attrs_node_b[networkinput.mark_target] = this_edge_dir
+
+            new_edge.update({
+                'attrs_node_a': attrs_node_a,
+                'attrs_node_b': attrs_node_b,
+                'attrs_edge': attrs_edge,
+            })
+
+            edge_list.append(new_edge)
+
+        return (
+            table.attrs.get('lnum', 0),
+            edge_list,
+            input_filtered,
+            ref_filtered,
+            taxon_filtered,
+        )
+
+
     def _filters(
             self,
             line,
@@ -1542,10 +2107,14 @@ class Network(session_mod.Logger):
 
         else:
 
+            # each distinct identifier is translated only once
+            mapped_ids = {}
+
             for edge in lst:
                 list_mapped += self._map_edge(
                     edge,
                     expand_complexes = expand_complexes,
+                    mapped_ids = mapped_ids,
                 )
 
         return list_mapped
@@ -1583,7 +2152,7 @@ class Network(session_mod.Logger):
         return default_id
 
 
-    def _map_edge(self, edge, expand_complexes = True):
+    def _map_edge(self, edge, expand_complexes = True, mapped_ids = None):
         """
         Translates the identifiers in *edge* representing an edge. Default
         name types are defined in
@@ -1596,6 +2165,9 @@ class Network(session_mod.Logger):
         :arg bool expand_complexes:
             Expand complexes, i.e. create links between each member of
             the complex and the interacting partner.
+        :arg dict mapped_ids:
+            Optional, a dict to store the translated identifiers, in
+            order to reuse them for further edges.
 
         :return:
             (*list*) -- Contains the edge(s) [dict] with default mapped
@@ -1603,22 +2175,48 @@ class Network(session_mod.Logger):
         """
 
         edge_stack = []
+        mapped_ids = {} if mapped_ids is None else mapped_ids
+        default_ids = []
 
-        default_id_a = mapping.map_name(
-            edge['id_a'],
-            edge['id_type_a'],
-            self.default_name_types[edge['entity_type_a']],
-            ncbi_tax_id = edge['taxon_a'],
-            expand_complexes = expand_complexes,
-        )
+        for side in ('a', 'b'):
 
-        default_id_b = mapping.map_name(
-            edge['id_b'],
-            edge['id_type_b'],
-            self.default_name_types[edge['entity_type_b']],
-            ncbi_tax_id = edge['taxon_b'],
-            expand_complexes = expand_complexes,
-        )
+            key = (
+                edge['id_%s' % side],
+                edge['id_type_%s' % side],
+                edge['entity_type_%s' % side],
+                edge['taxon_%s' % side],
+            )
+
+            try:
+
+                known = key in mapped_ids
+
+            except TypeError:
+
+                # unhashable identifier
+                known = None
+
+            if not known:
+
+                ids = mapping.map_name(
+                    key[0],
+                    key[1],
+                    self.default_name_types[key[2]],
+                    ncbi_tax_id = key[3],
+                    expand_complexes = expand_complexes,
+                )
+
+                if known is False:
+
+                    mapped_ids[key] = ids
+
+            else:
+
+                ids = mapped_ids[key]
+
+            default_ids.append(ids)
+
+        default_id_a, default_id_b = default_ids
 
         # this is needed because the possibility ambigous mapping
         # and expansion of complexes
@@ -2101,6 +2699,7 @@ class Network(session_mod.Logger):
             records,
             columns = columns,
         )
+        self._df_index = None
 
         ### why?
         if dtype:
@@ -2122,6 +2721,25 @@ class Network(session_mod.Logger):
         return self.df
 
 
+    def get_df_index(self):
+        """
+        Returns the index used for filtering the interaction data frame,
+        built at the first call. If the data frame has been modified in
+        place, call ``make_df`` to create it again.
+        """
+
+        df = self.get_df()
+
+        if (
+            getattr(self, '_df_index', None) is None or
+            not self._df_index.valid_for(df)
+        ):
+
+            self._df_index = core_common.NetworkDfIndex(df)
+
+        return self._df_index
+
+
     def filtered(
             self,
             resource = None,
@@ -2142,6 +2760,7 @@ class Network(session_mod.Logger):
 
         return self.filter_df(
             df = self.get_df(),
+            df_index = self.get_df_index(),
             resource = resource,
             entity_type = entity_type,
             data_model = data_model,
@@ -0,0 +1,540 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+#  This file is part of the `pypath` python module
+#
+#  Copyright
+#  2014-2020
+#  EMBL, EMBL-EBI, Uniklinik RWTH Aachen, Heidelberg University
+#
+#  File author(s): Dénes Türei (turei.denes@gmail.com)
+#                  Nicolàs Palacio
+#                  Olga Ivanova
+#
+#  Distributed under the GPLv3 License.
+#  See accompanying file LICENSE.txt or copy at
+#      http://www.gnu.org/licenses/gpl-3.0.html
+#
+#  Website: http://pypath.omnipathdb.org/
+#
+
+"""
+Streaming reader for the PSI-MI tabular (MITAB 2.5, 2.6 and 2.7) format.
+"""
+
+import sys
+import importlib as imp
+import collections
+import functools
+import operator
+import itertools
+import traceback
+import multiprocessing
+import concurrent.futures
+
+import pypath.share.session as session
+import pypath.share.settings as settings
+import pypath.share.curl as curl
+import pypath.share.progress as progress
+
+
+# the columns of MITAB 2.7; the first 15 are the columns of MITAB 2.5,
+# MITAB 2.6 has the first 36
+COLUMNS = (
+    'id_a',
+    'id_b',
+    'alt_ids_a',
+    'alt_ids_b',
+    'aliases_a',
+    'aliases_b',
+    'detection_methods',
+    'first_author',
+    'publications',
+    'taxid_a',
+    'taxid_b',
+    'interaction_types',
+    'source_databases',
+    'interaction_ids',
+    'confidence',
+    'expansion',
+    'bio_role_a',
+    'bio_role_b',
+    'exp_role_a',
+    'exp_role_b',
+    'type_a',
+    'type_b',
+    'xrefs_a',
+    'xrefs_b',
+    'xrefs_interaction',
+    'annotations_a',
+    'annotations_b',
+    'annotations_interaction',
+    'host_organism',
+    'parameters',
+    'creation_date',
+    'update_date',
+    'checksum_a',
+    'checksum_b',
+    'checksum_interaction',
+    'negative',
+    'features_a',
+    'features_b',
+    'stoichiometry_a',
+    'stoichiometry_b',
+    'identification_method_a',
+    'identification_method_b',
+)
+
+_column_index = dict((name, i) for i, name in enumerate(COLUMNS))
+
+# columns with many repeated values, the parsed values of these are cached
+CACHED_COLUMNS = {
+    'id_a',
+    'id_b',
+    'publications',
+    'detection_methods',
+    'taxid_a',
+    'taxid_b',
+    'interaction_types',
+    'source_databases',
+    'expansion',
+    'bio_role_a',
+    'bio_role_b',
+    'exp_role_a',
+    'exp_role_b',
+    'type_a',
+    'type_b',
+    'host_organism',
+    'negative',
+    'identification_method_a',
+    'identification_method_b',
+}
+_cached_indices = {_column_index[name] for name in CACHED_COLUMNS}
+
+
+MitabToken = collections.namedtuple(
+    'MitabToken',
+    [
+        'db',
+        'value',
+        'text',
+    ],
+)
+MitabToken.__doc__ = """
+One item of a MITAB field, e.g. ``psi-mi:"MI:0018"(two hybrid)`` is
+``MitabToken(db = 'psi-mi', value = 'MI:0018', text = 'two hybrid')``.
+"""
+
+# creating the tuples without the keyword argument processing
+# of the namedtuple constructor
+_token = functools.partial(tuple.__new__, MitabToken)
+
+
+def _split_field(field):
+    """
+    Splits a field at the ``|`` characters which are not within quotes.
+    """
+
+    if '"' not in field:
+
+        return field.split('|')
+
+    items = []
+    start = 0
+    quoted = False
+
+    for i, char in enumerate(field):
+
+        if char == '"':
+
+            quoted = not quoted
+
+        elif char == '|' and not quoted:
+
+            items.append(field[start:i])
+            start = i + 1
+
+    items.append(field[start:])
+
+    return items
+
+
+def _parse_token(token):
+
+    db, sep, rest = token.partition(':')
+
+    if not sep:
+
+        return _token((None, token, None))
+
+    if rest[:1] == '"':
+
+        end = rest.find('"', 1)
+        value, tail = (
+            (rest[1:end], rest[end + 1:])
+                if end > 0 else
+            (rest.strip('"'), '')
+        )
+        text = (
+            tail[1:-1]
+                if tail[:1] == '(' and tail[-1:] == ')' and len(tail) > 1 else
+            None
+        )
+
+    else:
+
+        value, paren, text = rest.partition('(')
+        text = text[:-1] if paren and text[-1:] == ')' else None
+
+    return _token((db, value, text))
+
+
+def _parse_field(field):
+
+    if field == '-' or not field:
+
+        return ()
+
+    return tuple(map(_parse_token, _split_field(field)))
+
+
+@functools.lru_cache(maxsize = 65536)
+def parse_field(field):
+    """
+    Parses one MITAB field into a tuple of ``MitabToken`` objects. The
+    results are cached, hence it should be used for the fields with many
+    repeated values (e.g. identifiers, methods, organisms, interaction
+    types).
+    """
+
+    return _parse_field(field)
+
+
+@functools.lru_cache(maxsize = 65536)
+def _first_value(field):
+
+    tokens = parse_field(field)
+
+    return tokens[0].value if tokens else None
+
+
+def _column_indices(columns):
+
+    return tuple(
+        col if isinstance(col, int) else _column_index[col]
+        for col in columns
+    )
+
+
+def _parse_lines(lines, indices, taxid_cols, organism, methods):
+    """
+    Parses the requested columns of the MITAB lines which pass the
+    organism and detection method filters.
+
+    :return:
+        Generator of tuples of tuples of ``MitabToken`` objects.
+    """
+
+    maxcol = max(indices + taxid_cols + ((6,) if methods is not None else ()))
+    getter = (
+        operator.itemgetter(*indices)
+            if len(indices) > 1 else
+        lambda fields: (fields[indices[0]],)
+    )
+    parsers = tuple(
+        parse_field if i in _cached_indices else _parse_field
+        for i in indices
+    )
+    taxid_a, taxid_b = taxid_cols or (None, None)
+
+    for line in lines:
+
+        if hasattr(line, 'decode'):
+
+            line = line.decode('utf-8')
+
+        line = line.strip('\n\r ')
+
+        if not line:
+
+            continue
+
+        # the columns after the last one we need remain unsplit
+        fields = line.split('\t', maxcol + 1)
+
+        if len(fields) <= maxcol:
+
+            fields.extend(['-'] * (maxcol + 1 - len(fields)))
+
+        if organism is not None and (
+            _first_value(fields[taxid_a]) not in organism or
+            _first_value(fields[taxid_b]) not in organism
+        ):
+
+            continue
+
+        if methods is not None and not any(
+            token.value in methods or token.text in methods
+            for token in parse_field(fields[6])
+        ):
+
+            continue
+
+        yield tuple([
+            parser(field)
+            for parser, field in zip(parsers, getter(fields))
+        ])
+
+
+def _parse_chunk(lines):
+
+    return list(_parse_lines(lines, *_reader_args))
+
+
+_reader_args = None
+
+
+class MitabReader(session.Logger):
+    """
+    Reads a MITAB file line by line. Only the requested columns are split
+    and parsed, and the records can be filtered by organism and detection
+    method before parsing any other column.
+
+    Iterating the reader yields named tuples with the requested columns as
+    attributes, each a tuple of ``MitabToken`` objects, empty tuple for
+    the missing (``-``) values.
+
+    :param str,iterable source:
+        Path or URL of a MITAB file, or an iterable of its lines.
+    :param list columns:
+        Names (see ``COLUMNS``) or indices of the columns to parse. By
+        default the 15 columns of MITAB 2.5.
+    :param int,str,set organism:
+        Keep only the interactions where both partners belong to this
+        organism (NCBI Taxonomy IDs).
+    :param set methods:
+        Keep only the interactions detected by any of these methods, MI
+        term IDs or names.
+    :param bool header:
+        The first line is a header.
+    :param str member:
+        Name of the file if the source is an archive.
+    :param int size:
+        Size of the data in bytes, if provided the progress is shown.
+    :param int workers:
+        Parse the lines in this many processes, by default the
+        ``mitab_workers`` setting.
+    :param int chunk_size:
+        Number of lines processed at once by the worker processes.
+    :param str name:
+        Name of the data shown in the log and the progress bar.
+    """
+
+    def __init__(
+            self,
+            source,
+            columns = None,
+            organism = None,
+            methods = None,
+            header = True,
+            member = None,
+            size = None,
+            workers = None,
+            chunk_size = 100000,
+            name = None,
+        ):
+
+        session.Logger.__init__(self, name = 'mitab')
+
+        self.source = source
+        self.columns = tuple(columns or COLUMNS[:15])
+        self.indices = _column_indices(self.columns)
+        self.names = tuple(
+            COLUMNS[col] if isinstance(col, int) else col
+            for col in self.columns
+        )
+        self.record = collections.namedtuple('MitabRecord', self.names)
+        self.organism = (
+            None
+                if organism is None else
+            {
+                str(o)
+                for o in (
+                    organism
+                        if isinstance(organism, (set, list, tuple)) else
+                    (organism,)
+                )
+            }
+        )
+        self.methods = set(methods) if methods is not None else None
+        self.header = header
+        self.member = member
+        self.size = size
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.name = name or (
+            source if isinstance(source, str) else 'MITAB data'
+        )
+
+
+    def reload(self):
+
+        modname = self.__class__.__module__
+        mod = __import__(modname, fromlist = [modname.split('.')[0]])
+        imp.reload(mod)
+        new = getattr(mod, self.__class__.__name__)
+        setattr(self, '__class__', new)
+
+
+    def _lines(self):
+
+        lines = self.source
+
+        if isinstance(lines, str):
+
+            c = curl.Curl(
+                lines,
+                silent = False,
+                large = True,
+                files_needed = [self.member] if self.member else None,
+            )
+            lines = c.result
+
+            if isinstance(lines, dict):
+
+                lines = (
+                    lines[self.member]
+                        if self.member else
+                    next(iter(lines.values()))
+                )
+
+        if self.size:
+
+            prg = progress.Progress(
+                self.size,
+                'Reading %s' % self.name,
+                99,
+            )
+
+            def stepped(lines):
+
+                for line in lines:
+
+                    prg.step(len(line))
+
+                    yield line
+
+                prg.terminate()
+
+            lines = stepped(lines)
+
+        lines = iter(lines)
+
+        if self.header:
+
+            _ = next(lines, None)
+
+        return lines
+
+
+    def __iter__(self):
+
+        args = (
+            self.indices,
+            (
+                (_column_index['taxid_a'], _column_index['taxid_b'])
+                    if self.organism is not None else
+                ()
+            ),
+            self.organism,
+            self.methods,
+        )
+        workers = self.workers or settings.get('mitab_workers') or 1
+        make = self.record._make
+        lines = self._lines()
+
+        if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+
+            for records in self._parse_parallel(lines, args, workers):
+
+                for record in records:
+
+                    yield make(record)
+
+        else:
+
+            # in one process the records are created one by one,
+            # hence the consumer can discard them right away
+            for record in _parse_lines(lines, *args):
+
+                yield make(record)
+
+
+    def _parse_parallel(self, lines, args, workers):
+        """
+        Parses chunks of lines in worker processes. Yields lists of parsed
+        records, chunk by chunk, in the order of the lines.
+        """
+
+        chunks = iter(
+            lambda: list(itertools.islice(lines, self.chunk_size)),
+            [],
+        )
+
+        self._log(
+            'Parsing `%s` in %u processes.' % (self.name, workers)
+        )
+        # the workers inherit the arguments by forking
+        globals()['_reader_args'] = args
+
+        try:
+
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers = workers,
+                mp_context = multiprocessing.get_context('fork'),
+            ) as executor:
+
+                pending = collections.deque()
+
+                for chunk in itertools.chain(chunks, (None,)):
+
+                    if chunk is not None:
+
+                        pending.append(
+                            (chunk, executor.submit(_parse_chunk, chunk))
+                        )
+
+                    # keeping a limited number of chunks in flight
+                    while pending and (
+                        chunk is None or
+                        len(pending) > workers * 2
+                    ):
+
+                        _chunk, future = pending.popleft()
+
+                        try:
+
+                            yield future.result()
+
+                        except Exception:
+
+                            self._log(
+                                'Failed to parse a chunk of `%s` in a '
+                                'worker process, parsing it in the main '
+                                'process: %s' % (
+                                    self.name,
+                                    traceback.format_exception(
+                                        *sys.exc_info()
+                                    ),
+                                )
+                            )
+
+                            yield list(_parse_lines(_chunk, *args))
+
+                        _chunk = future = None
+
+        finally:
+
+            globals()['_reader_args'] = None
+
@@ -19,14 +19,45 @@
 #  Website: http://pypath.omnipathdb.org/
 #
 
+import os
 import re
 import importlib as imp
 import collections
-import itertools
+import sys
+import gc
+import contextlib
+import hashlib
+import marshal
 
 import pypath.share.session as session
+import pypath.share.settings as settings
 import pypath.share.curl as curl
 
+# version of the format of the parsed ontology cache files, increment it
+# whenever the records or the parsing change; the files are written by
+# `marshal`, hence they are specific also to the Python version
+CACHE_VERSION = 1
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """
+    Disables the garbage collector while creating large numbers of
+    objects which do not form reference cycles.
+    """
+    
+    enabled = gc.isenabled()
+    gc.disable()
+    
+    try:
+        
+        yield
+    
+    finally:
+        
+        if enabled:
+            
+            gc.enable()
 
 
 class OboValue(
@@ -53,11 +84,22 @@ class Obo(session.Logger):
     See more details at
     https://owlcollab.github.io/oboformat/doc/GO.format.obo-1_4.html#S.1
     
+    The parsed records are saved into a cache file, which is keyed by the
+    checksum of the source file, hence later iterations over the same file
+    load the records from the cache without parsing.
+    
     :param str obofile:
         Path or URL to an OBO file.
     :param list single_tags:
         A list of tag names which have a single occurence in each stanza and
         ideally should present in all stanzas.
+    :param set tags:
+        Names of the tags to be included in the `attrs` of the records.
+        Values of other tags are not parsed at all. By default all tags
+        are included.
+    :param bool cache:
+        Load the parsed records from the cache and save them after parsing.
+        By default the `obo_cache` setting is used.
     """
     
     _single_tags = [
@@ -77,6 +119,8 @@ class Obo(session.Logger):
             r'([^!]+[^\s])' # comment
         r'?)\s*'
     )
+    # the part of `retag` after the tag
+    revalue = re.compile(r'\s?' + retag.pattern.split(r':\s?', 1)[1])
     _disallowed_keys = {
         'def': 'definition',
     }
@@ -86,6 +130,8 @@ class Obo(session.Logger):
             obofile,
             single_tags = None,
             name = None,
+            tags = None,
+            cache = None,
         ):
         
         session.Logger.__init__(self, name = 'obo')
@@ -93,7 +139,9 @@ class Obo(session.Logger):
         self.obofile = obofile
         self.single_tags = single_tags or self._single_tags
         self._single_tags_set = set(self.single_tags)
+        self.tags = None if tags is None else set(tags)
         self.name = name or 'OBO'
+        self.cache = settings.get('obo_cache') if cache is None else cache
         self._set_record()
         self.open()
     
@@ -113,7 +161,6 @@ class Obo(session.Logger):
     def open(self):
         
         self.reader = curl.Curl(self.obofile, silent = True, large = True)
-        self._in_stanza = False
         
         self._log('OBO reader created, opened `%s`.' % self.obofile)
     
@@ -131,64 +178,242 @@ class Obo(session.Logger):
     
     def __iter__(self):
         
+        records = self._load_cache()
+        
+        if records is not None:
+            
+            yield from records
+            
+            return
+        
+        if not self.cache:
+            
+            yield from self._parse()
+            
+            return
+        
+        with _gc_paused():
+            
+            records = list(self._parse())
+            self._save_cache([self._to_plain(rec) for rec in records])
+        
+        yield from records
+    
+    
+    def _parse(self):
+        """
+        Parses the file in one pass. Stanzas are recognized by their first
+        character, tags by splitting the lines at the first colon, and the
+        values are parsed by the `revalue` regex only for the single tags
+        and the requested tags.
+        """
+        
         if hasattr(self.reader.result, 'seek'):
             
             self.reader.result.seek(0)
         
-        self._reset_record()
+        elif getattr(self, '_consumed', False):
         
-        iterlines0, iterlines1 = itertools.tee(self.reader.result)
+            self.open()
         
-        for line, next_line in itertools.zip_longest(
-            iterlines0,
-            itertools.islice(iterlines1, 1, None),
-        ):
+        self._consumed = True
+        single_tags = self._single_tags_set
+        tags = self.tags
+        disallowed_keys = self._disallowed_keys
+        revalue = self.revalue.match
+        current = None
+            
+        for line in self.reader.result:
+                
+            if line[:1] == '[':
+                    
+                if current is not None:
+                    
+                    yield self._create_record(current)
+                
+                current = {
+                    'stanza': self.restanza.match(line).groups()[0],
+                    'attrs': collections.defaultdict(set),
+                }
             
-            if self._in_stanza:
+            elif current is not None:
+                
+                tag, colon, rest = line.partition(':')
                 
-                if not next_line or next_line[0] == '[':
+                if not colon or not tag.replace('_', 'a').isalnum():
                     
-                    yield self._create_record()
-                    self._reset_record()
-                    self._in_stanza = False
+                    continue
+                
+                tag = disallowed_keys.get(tag, tag)
+                single = tag in single_tags
+                
+                if not single and tags is not None and tag not in tags:
+                    
+                    continue
+                
+                m = revalue(rest)
+                
+                if not m:
+                    
+                    continue
+                
+                value = OboValue(*m.groups())
+                
+                if single:
+                    
+                    current[tag] = value
                     
                 else:
                     
-                    m = self.retag.match(line)
+                    current['attrs'][tag].add(value)
                     
-                    if m:
-                        
-                        tag, *value = m.groups()
-                        tag = self._disallowed_keys.get(tag) or tag
-                        value = OboValue(*value)
+        if current is not None:
                         
-                        if tag in self._single_tags_set:
-                            
-                            self._current_record[tag] = value
-                            
-                        else:
-                            
-                            self._current_record['attrs'][tag].add(value)
-                
-            elif line[0] == '[':
+            yield self._create_record(current)
+    
+    
+    def _create_record(self, current):
+        
+        current['attrs'] = dict(current['attrs'])
+        
+        return self.record(**current)
+    
+    
+    @staticmethod
+    def _to_plain(rec):
+        """
+        Converts a record to a tuple of built in types for the cache.
+        """
+        
+        return (
+            tuple(
+                tuple(value) if isinstance(value, OboValue) else value
+                for value in rec[:-1]
+            ),
+            {
+                tag: tuple(tuple(value) for value in values)
+                for tag, values in rec.attrs.items()
+            },
+        )
+    
+    
+    def _from_plain(self, rec):
+        
+        make = OboValue._make
+        single, attrs = rec
+        
+        return self.record(
+            *(
+                make(value) if isinstance(value, tuple) else value
+                for value in single
+            ),
+            attrs = {
+                tag: {make(value) for value in values}
+                for tag, values in attrs.items()
+            },
+        )
+    
+    
+    def _cache_path(self):
+        """
+        Path of the cache file of this ontology, it depends on the checksum
+        of the source file, the format version and the parsing options.
+        None if the source file is not available locally.
+        """
+        
+        source = getattr(self.reader, 'cache_file_name', None)
+        
+        if not source or not os.path.exists(source):
+            
+            return None
+        
+        md5 = hashlib.md5()
+        
+        with open(source, 'rb') as fp:
+            
+            for chunk in iter(lambda: fp.read(1 << 20), b''):
                 
-                m = self.restanza.match(line)
-                self._current_record['stanza'] = m.groups()[0]
-                self._in_stanza = True
+                md5.update(chunk)
+        
+        options = hashlib.md5(repr((
+            CACHE_VERSION,
+            marshal.version,
+            sys.version_info[:2],
+            self.single_tags,
+            sorted(self.tags) if self.tags is not None else None,
+        )).encode()).hexdigest()
+        
+        return os.path.join(
+            settings.get('obo_cache_dir'),
+            '%s-%s.obocache' % (md5.hexdigest(), options[:12]),
+        )
     
     
-    def _create_record(self):
+    def _load_cache(self):
+        
+        if not self.cache:
+            
+            return None
+        
+        self._cache_file = self._cache_path()
+        
+        if not self._cache_file or not os.path.exists(self._cache_file):
+            
+            return None
         
-        self._current_record['attrs'] = dict(self._current_record['attrs'])
+        try:
+            
+            with open(self._cache_file, 'rb') as fp, _gc_paused():
+                
+                version, records = marshal.loads(fp.read())
+                
+                if version != CACHE_VERSION:
+                    
+                    return None
+                
+                records = [self._from_plain(rec) for rec in records]
         
-        return self.record(**self._current_record)
+        except (OSError, EOFError, ValueError, TypeError):
+            
+            self._log(
+                'Failed to read OBO cache file `%s`.' % self._cache_file
+            )
+            
+            return None
+        
+        self._log(
+            'Loaded %u records of `%s` from cache file `%s`.' % (
+                len(records),
+                self.obofile,
+                self._cache_file,
+            )
+        )
+        
+        return records
     
     
-    def _reset_record(self):
+    def _save_cache(self, records):
+        
+        if not getattr(self, '_cache_file', None):
+            
+            return
         
-        self._current_record = {
-            'attrs': collections.defaultdict(set)
-        }
+        os.makedirs(os.path.dirname(self._cache_file), exist_ok = True)
+        tmp_file = '%s.%u.tmp' % (self._cache_file, os.getpid())
+        
+        with open(tmp_file, 'wb') as fp:
+            
+            fp.write(marshal.dumps((CACHE_VERSION, records)))
+        
+        os.replace(tmp_file, self._cache_file)
+        
+        self._log(
+            'Saved %u records of `%s` to cache file `%s`.' % (
+                len(records),
+                self.obofile,
+                self._cache_file,
+            )
+        )
     
     
     def __repr__(self):
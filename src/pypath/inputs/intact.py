@@ -23,7 +23,7 @@ import collections
 
 import pypath.resources.urls as urls
 import pypath.share.curl as curl
-import pypath.share.progress as progress
+import pypath.formats.mitab as mitab
 
 
 def intact_interactions(
@@ -64,43 +64,29 @@ def intact_interactions(
 
     def get_id_type(field):
 
-        id_type = None if field == '-' else field.split(':')[0]
+        id_type = field[0].db if field else None
 
         return id_types[id_type] if id_type in id_types else id_type
 
 
     def get_id(field):
 
-        if field == '-':
+        if not field:
 
             return None, None
 
         else:
 
-            uniprot, isoform = _try_isoform(
-                field.split(':')[1].replace('"', '')
-            )
+            uniprot, isoform = _try_isoform(field[0].value)
 
             uniprot = uniprot.split('-')[0]
 
             return uniprot, isoform
 
 
-    def get_taxon(field):
-
-        return (
-            0
-                if field == '-' else
-            field.split('|')[0].split(':')[1].split('(')[0]
-        )
-
-
     results = []
     url = urls.urls['intact']['mitab']
 
-    if type(organism) is int:
-        organism = '%u' % organism
-
     c = curl.Curl(
         url,
         silent = False,
@@ -108,96 +94,82 @@ def intact_interactions(
         files_needed = ['intact.txt'],
     )
 
-    data = c.result['intact.txt']
-    size = c.sizes['intact.txt']
-    prg = progress.Progress(size, 'Reading IntAct MI-tab file', 99)
-
-    for lnum, l in enumerate(data):
-
-        prg.step(len(l))
-
-        if lnum == 0:
-
-            continue
-
-        l = l.strip('\n\r ').split('\t')
+    reader = mitab.MitabReader(
+        c.result['intact.txt'],
+        columns = (
+            'id_a',
+            'id_b',
+            'detection_methods',
+            'publications',
+            'confidence',
+            'expansion',
+        ),
+        organism = organism,
+        size = c.sizes['intact.txt'],
+        name = 'IntAct MI-tab file',
+    )
 
-        taxon_a = get_taxon(l[9])
-        taxon_b = get_taxon(l[10])
+    for rec in reader:
 
         if (
-            (
-                organism is None or (
-                    taxon_a == organism and
-                    taxon_b == organism
-                )
-            ) and (
-                complex_expansion or
-                'expansion' not in l[15]
+            not complex_expansion and
+            any(
+                'expansion' in (token.text or token.value)
+                for token in rec.expansion
             )
         ):
 
-            # finding mi-score and author
-            sc = '0'
-            au = '0'
-
-            for s in l[14].split('|'):
+            continue
 
-                if s.startswith('intact-miscore'):
-                    sc = s.split(':')[1]
+        # finding mi-score
+        sc = '0'
 
-                if s.startswith('author'):
-                    au = len(s.split(':')[1])
+        for token in rec.confidence:
 
-            # filtering for mi-score
-            if float(sc) < miscore:
+            if token.db == 'intact-miscore':
 
-                continue
+                sc = token.value
 
-            id_type_a = get_id_type(l[0])
-            id_type_b = get_id_type(l[0])
+        # filtering for mi-score
+        if float(sc) < miscore:
 
-            if (
-                only_proteins and not (
-                    id_type_a == 'uniprot' and
-                    id_type_b == 'uniprot'
-                )
-            ):
+            continue
 
-                continue
+        id_type_a = get_id_type(rec.id_a)
+        id_type_b = get_id_type(rec.id_b)
 
-            id_a, isoform_a = get_id(l[0])
-            id_b, isoform_b = get_id(l[1])
+        if (
+            only_proteins and not (
+                id_type_a == 'uniprot' and
+                id_type_b == 'uniprot'
+            )
+        ):
 
-            key = tuple(sorted((id_a, id_b)))
+            continue
 
-            pubmeds = set(
-                ref[1] for ref in (
-                    ref.split(':')
-                    for ref in l[8].split('|')
-                )
-                if ref[0] == 'pubmed'
-            )
-            methods = set(
-                met.split('(')[1].strip(')"')
-                for met in  l[6].split('|')
-            )
+        id_a, isoform_a = get_id(rec.id_a)
+        id_b, isoform_b = get_id(rec.id_b)
 
-            results.append(
-                IntactInteraction(
-                    id_a = id_a,
-                    id_b = id_b,
-                    id_type_a = id_type_a,
-                    id_type_b = id_type_b,
-                    pubmeds = pubmeds,
-                    methods = methods,
-                    mi_score = sc,
-                    isoform_a = isoform_a,
-                    isoform_b = isoform_b,
-                )
+        pubmeds = set(
+            ref.value
+            for ref in rec.publications
+            if ref.db == 'pubmed'
+        )
+        methods = set(met.text for met in rec.detection_methods)
+
+        results.append(
+            IntactInteraction(
+                id_a = id_a,
+                id_b = id_b,
+                id_type_a = id_type_a,
+                id_type_b = id_type_b,
+                pubmeds = pubmeds,
+                methods = methods,
+                mi_score = sc,
+                isoform_a = isoform_a,
+                isoform_b = isoform_b,
             )
-
-    prg.terminate()
+        )
 
     return results
 
@@ -492,83 +492,198 @@ _uniprot_fields = {
 }
 
 
+# the fields used by the annotation resources in `pypath.core.annot`,
+# these are retrieved together by one query
+_uniprot_annot_fields = (
+    'subcellular_location',
+    'family',
+    'tissue_specificity',
+    'keywords',
+    'transmembrane',
+    'intramembrane',
+    'signal_peptide',
+    'topological_domain',
+)
+
+# the fields retrieved so far, by organism and reviewed status
+_uniprot_tables = {}
+
+_relabel = re.compile(r'[A-Z\s]+:\s')
+_reisoform = re.compile(r'\[[-\w\s]+\]:?\s?')
+_retermsep = re.compile(r'\s?[\.,]\s?')
+_reref = re.compile(r'\{[-\w :\|,\.]*\}')
+
+
+def _reviewed_query(reviewed):
+
+    return (
+        ' AND reviewed: yes'
+            if reviewed == True or reviewed == 'yes' else
+        ' AND reviewed: no'
+        if reviewed == False or reviewed == 'no' else
+        ''
+    )
+
+
 def uniprot_data(field, organism = 9606, reviewed = True):
     """
     Retrieves a field from UniProt for all proteins of one organism, by
     default only the reviewed (SwissProt) proteins.
     For the available fields refer to the ``_uniprot_fields`` attribute of
     this module or the UniProt website.
+
+    :param str,list field:
+        One field or a list of fields.
+
+    :return:
+        For one field a dict of UniProt IDs and values, for a list of
+        fields a dict of such dicts by field.
     """
 
-    rev = (
-        ' AND reviewed: yes'
-            if reviewed == True or reviewed == 'yes' else
-        ' AND reviewed: no'
-        if reviewed == False or reviewed == 'no' else
-        ''
+    fields = (field,) if isinstance(field, common.basestring) else field
+    table = uniprot_table(
+        fields = fields,
+        organism = organism,
+        reviewed = reviewed,
+    )
+
+    return (
+        dict(table[field])
+            if isinstance(field, common.basestring) else
+        dict((_field, dict(values)) for _field, values in iteritems(table))
     )
-    _field = _uniprot_fields[field] if field in _uniprot_fields else field
+
+
+def uniprot_table(fields, organism = 9606, reviewed = True):
+    """
+    Retrieves one or more fields from UniProt for all proteins of one
+    organism. The fields are stored by column and shared by all later
+    calls in the session, the missing fields are retrieved by one query.
+    If any of the fields used by the annotation resources is missing,
+    all of these are retrieved together.
+
+    :param list fields:
+        Names of UniProt fields, as in ``_uniprot_fields`` or as they are
+        called in the UniProt API.
+
+    :return:
+        A dict with field names as keys and dicts of UniProt IDs and
+        values as values. The dicts of the values are shared, hence
+        should not be modified.
+    """
+
+    key = (organism, _reviewed_query(reviewed))
+    store = _uniprot_tables.setdefault(key, {})
+    missing = [field for field in fields if field not in store]
+
+    if (
+        settings.get('uniprot_annot_fields_together') and
+        any(field in _uniprot_annot_fields for field in missing)
+    ):
+
+        missing.extend(
+            field
+            for field in _uniprot_annot_fields
+            if field not in store and field not in missing
+        )
+
+    if missing:
+
+        store.update(
+            _uniprot_query(
+                fields = missing,
+                organism = organism,
+                reviewed = reviewed,
+            )
+        )
+
+    return dict((field, store[field]) for field in fields)
+
+
+def _uniprot_query(fields, organism = 9606, reviewed = True):
+    """
+    Retrieves the fields by one query and splits the table into columns.
+    """
+
+    _fields = [
+        _uniprot_fields[field] if field in _uniprot_fields else field
+        for field in fields
+    ]
     url = urls.urls['uniprot_basic']['url']
     get = {
-        'query': 'organism:%s%s' % (str(organism), rev),
+        'query': 'organism:%s%s' % (str(organism), _reviewed_query(reviewed)),
         'format': 'tab',
-        'columns': 'id,%s' % _field,
+        'columns': 'id,%s' % ','.join(_fields),
         'compress': 'yes',
     }
 
     c = curl.Curl(url, get = get, silent = False, large = True, compr = 'gz')
     _ = next(c.result)
 
-    return dict(
-        id_value
-        for id_value in
-        (
-            line.strip('\n\r').split('\t')
-            for line in c.result if line.strip('\n\r')
-        )
-        if id_value[1]
-    )
+    columns = [{} for _ in fields]
+
+    for line in c.result:
 
+        line = line.strip('\n\r')
 
-def uniprot_preprocess(field, organism = 9606, reviewed = True):
+        if not line:
 
-    relabel = re.compile(r'[A-Z\s]+:\s')
-    reisoform = re.compile(r'\[[-\w\s]+\]:?\s?')
-    retermsep = re.compile(r'\s?[\.,]\s?')
-    reref = re.compile(r'\{[-\w :\|,\.]*\}')
+            continue
+
+        line = line.split('\t')
+        uniprot = line[0]
+
+        for column, value in zip(columns, line[1:]):
+
+            if value:
+
+                column[uniprot] = value
+
+    return dict(zip(fields, columns))
+
+
+def uniprot_preprocess(field, organism = 9606, reviewed = True):
 
     result = collections.defaultdict(set)
+    elements_cache = {}
 
-    data = uniprot_data(
-        field = field,
+    data = uniprot_table(
+        fields = (field,),
         organism = organism,
         reviewed = reviewed,
-    )
+    )[field]
 
     for uniprot, raw in iteritems(data):
 
         raw = raw.split('Note=')[0]
-        raw = relabel.sub('', raw)
-        raw = reref.sub('', raw)
-        raw = reisoform.sub('', raw)
-        raw = retermsep.split(raw)
+
+        # each pattern is applied only if the character
+        # it necessarily contains is present
+        if ':' in raw:
+
+            raw = _relabel.sub('', raw)
+
+        if '{' in raw:
+
+            raw = _reref.sub('', raw)
+
+        if '[' in raw:
+
+            raw = _reisoform.sub('', raw)
+
+        raw = (
+            _retermsep.split(raw)
+                if '.' in raw or ',' in raw else
+            (raw,)
+        )
 
         for item in raw:
 
-            if item.startswith('Note'):
+            if item not in elements_cache:
 
-                continue
+                elements_cache[item] = _uniprot_preprocess_item(item)
 
-            item = item.split('{')[0]
-            elements = tuple(
-                it0
-                for it0 in
-                (
-                    common.upper0(it.strip(' .;,'))
-                    for it in item.split(';')
-                )
-                if it0
-            )
+            elements = elements_cache[item]
 
             if elements:
 
@@ -577,6 +692,25 @@ def uniprot_preprocess(field, organism = 9606, reviewed = True):
     return result
 
 
+def _uniprot_preprocess_item(item):
+
+    if item.startswith('Note'):
+
+        return None
+
+    item = item.split('{')[0]
+
+    return tuple(
+        it0
+        for it0 in
+        (
+            common.upper0(it.strip(' .;,'))
+            for it in item.split(';')
+        )
+        if it0
+    )
+
+
 def uniprot_locations(organism = 9606, reviewed = True):
 
 
@@ -700,29 +834,20 @@ def uniprot_topology(organism = 9606, reviewed = True):
 
     result = collections.defaultdict(set)
 
-    transmem = uniprot_data(
-        field = 'transmembrane',
-        organism = organism,
-        reviewed = reviewed,
-    )
-
-    intramem = uniprot_data(
-        field = 'intramembrane',
-        organism = organism,
-        reviewed = reviewed,
-    )
-
-    signal = uniprot_data(
-        field = 'signal_peptide',
-        organism = organism,
-        reviewed = reviewed,
-    )
-
-    data = uniprot_data(
-        field = 'topological_domain',
+    table = uniprot_table(
+        fields = (
+            'transmembrane',
+            'intramembrane',
+            'signal_peptide',
+            'topological_domain',
+        ),
         organism = organism,
         reviewed = reviewed,
     )
+    transmem = table['transmembrane']
+    intramem = table['intramembrane']
+    signal = table['signal_peptide']
+    data = table['topological_domain']
 
     for uniprot, topo in iteritems(data):
 
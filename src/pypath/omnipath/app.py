@@ -20,6 +20,7 @@
 #
 #  Website: http://pypath.omnipathdb.org/
 
+from future.utils import iteritems
 
 import os
 import sys
@@ -30,6 +31,7 @@ import pprint
 import copy
 import collections
 import itertools
+import concurrent.futures
 
 import pypath.resources.network as netres
 from pypath.core import annot
@@ -37,6 +39,7 @@ from pypath.core import intercell
 from pypath.core import complex
 from pypath.core import enz_sub
 from pypath.core import network
+from pypath.omnipath import prefetch
 from pypath.share import session as session_mod
 
 import pypath.share.settings as settings
@@ -61,6 +64,7 @@ class DatabaseManager(session_mod.Logger):
         self.datasets = self.get_param('datasets')
         self.ensure_dirs()
         self.network_dfs = {}
+        self._built = set()
 
         self._log('The OmniPath database manager has been initialized.')
 
@@ -78,16 +82,422 @@ class DatabaseManager(session_mod.Logger):
         self.foreach_dataset(method = self.reload_module)
 
 
-    def build(self):
+    def build(self, workers = None, max_memory = None):
         """
         Builds all built-in datasets.
+
+        :arg int workers:
+            Number of processes to build datasets in parallel. By default
+            the ``build_workers`` parameter; if it is 1 the datasets are
+            built one by one in this process.
+        :arg float max_memory:
+            Memory budget in GB for parallel builds, see
+            :py:meth:`build_parallel`.
         """
 
         self._log(
             'Building databases. Rebuild forced: %s.' % str(self.rebuild)
         )
 
-        self.foreach_dataset(method = self.ensure_dataset)
+        if self.get_param('build_prefetch'):
+
+            self.prefetch()
+
+        workers = workers or self.get_param('build_workers')
+
+        if workers and workers > 1:
+
+            self.build_parallel(workers = workers, max_memory = max_memory)
+
+        else:
+
+            self.foreach_dataset(method = self.ensure_dataset)
+
+
+    def build_parallel(self, workers = None, max_memory = None):
+        """
+        Builds the datasets in a pool of worker processes, following the
+        dependency graph defined by the ``dependencies`` parameter. A
+        dataset is started as soon as all its dependencies are available
+        as pickle dumps, the workers load the dependencies from these
+        pickles. Among the datasets ready to build, those with the longest
+        chain of dependents come first. The expected memory usage of each
+        dataset (``build_memory`` parameter, GB) is taken into account:
+        a dataset is started only if it fits into the budget together with
+        the ones already running, or if nothing else is running.
+
+        The datasets are not loaded into this object, they are loaded
+        from the pickles when accessed. The timeline of the build is
+        available in :py:attr:`build_timeline` and it can be printed by
+        :py:meth:`build_report`.
+
+        :arg int workers:
+            Number of worker processes. By default the ``build_workers``
+            parameter or the number of CPUs.
+        :arg float max_memory:
+            Memory budget in GB, by default the ``build_max_memory``
+            parameter; None means no limit.
+        """
+
+        workers = workers or self.get_param('build_workers') or os.cpu_count()
+        max_memory = max_memory or self.get_param('build_max_memory')
+        memory = self.get_param('build_memory') or {}
+
+        to_build = self._datasets_to_build()
+
+        self._log(
+            'Building %u datasets in %u parallel processes: %s.' % (
+                len(to_build),
+                workers,
+                ', '.join(sorted(to_build)),
+            )
+        )
+
+        deps = dict(
+            (
+                dataset,
+                set(self.dataset_dependencies(dataset)) & to_build,
+            )
+            for dataset in to_build
+        )
+        dependents = collections.defaultdict(set)
+
+        for dataset, dataset_deps in iteritems(deps):
+
+            for dep in dataset_deps:
+
+                dependents[dep].add(dataset)
+
+        priority = self._dag_depths(to_build, dependents)
+
+        t0 = time.time()
+        self.build_timeline = {}
+        running = {}
+        done = set()
+        failed = set()
+        param = dict(self.param, rebuild = False)
+        settings_snapshot = copy.deepcopy(settings.settings.__dict__)
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers = workers
+        ) as executor:
+
+            while len(done) + len(failed) < len(to_build):
+
+                ready = sorted(
+                    (
+                        dataset
+                        for dataset in to_build - done - failed
+                        if (
+                            dataset not in running.values() and
+                            deps[dataset] <= done
+                        )
+                    ),
+                    key = lambda d: (-priority[d], d),
+                )
+
+                for dataset in ready:
+
+                    if len(running) >= workers:
+
+                        break
+
+                    memory_used = sum(
+                        memory.get(d, 0) for d in running.values()
+                    )
+
+                    if (
+                        running and
+                        max_memory and
+                        memory_used + memory.get(dataset, 0) > max_memory
+                    ):
+
+                        continue
+
+                    self._log('Starting to build dataset `%s`.' % dataset)
+                    future = executor.submit(
+                        _build_dataset_worker,
+                        dataset,
+                        param,
+                        settings_snapshot,
+                        sorted(self._all_dependencies(dataset)),
+                    )
+                    running[future] = dataset
+
+                if not running:
+
+                    # the remaining datasets depend on failed ones
+                    failed.update(to_build - done - failed)
+                    break
+
+                finished, _ = concurrent.futures.wait(
+                    running,
+                    return_when = concurrent.futures.FIRST_COMPLETED,
+                )
+
+                for future in finished:
+
+                    dataset = running.pop(future)
+
+                    try:
+
+                        pid, start, end = future.result()
+                        done.add(dataset)
+                        self._built.add(self._dataset_taxid(dataset))
+                        self.build_timeline[dataset] = {
+                            'start': start - t0,
+                            'end': end - t0,
+                            'pid': pid,
+                            'dependencies': sorted(deps[dataset]),
+                        }
+                        self._log(
+                            'Finished building dataset `%s` '
+                            'in %.01f seconds.' % (dataset, end - start)
+                        )
+
+                    except Exception:
+
+                        failed.add(dataset)
+                        self._log('Failed to build dataset `%s`:' % dataset)
+                        self._log_traceback()
+
+        self._log(
+            'Parallel build finished in %.01f seconds. '
+            'Built: %s; failed: %s.' % (
+                time.time() - t0,
+                ', '.join(sorted(done)) or 'none',
+                ', '.join(sorted(failed)) or 'none',
+            )
+        )
+        self._log(self.build_report())
+
+
+    def prefetch(self, workers = None):
+        """
+        Downloads the data of all datasets to be built in advance,
+        concurrently. See
+        :py:class:`pypath.omnipath.prefetch.PrefetchPlanner`.
+
+        :arg int workers:
+            Number of concurrent downloads, by default the
+            ``prefetch_workers`` parameter.
+        """
+
+        datasets = self._datasets_to_build()
+        mods = {self.get_param('%s_mod' % dataset) for dataset in datasets}
+        network_resources = []
+
+        for dataset in sorted(datasets):
+
+            if self.get_param('%s_mod' % dataset) == 'network':
+
+                network_resources.extend(self._network_resources(dataset))
+
+        self._log(
+            'Prefetching the data of datasets: %s.' % ', '.join(
+                sorted(datasets)
+            )
+        )
+
+        return prefetch.prefetch(
+            network = network_resources,
+            annotations = 'annot' in mods,
+            complexes = bool({'complex', 'annot'} & mods),
+            enz_sub = 'enz_sub' in mods,
+            workers = workers or self.get_param('prefetch_workers'),
+        )
+
+
+    def _network_resources(self, dataset):
+        """
+        The network resources loaded while building a network dataset.
+        """
+
+        args = self.get_build_args(dataset)
+
+        if 'resources' in args:
+
+            resources = args['resources']
+
+            return list(
+                resources.values()
+                    if isinstance(resources, dict) else
+                resources
+            )
+
+        if dataset != 'omnipath':
+
+            return []
+
+        extras = {
+            'kinase_substrate_extra': netres.ptm_misc,
+            'ligand_receptor_extra': netres.ligand_receptor,
+            'pathway_extra': netres.pathway_noref,
+        }
+        resources = list(
+            network.Network.omnipath_resources(
+                **dict(
+                    (extra, args.get(extra, False))
+                    for extra in extras.keys()
+                )
+            ).values()
+        )
+
+        for extra, extra_resources in iteritems(extras):
+
+            if args.get(extra):
+
+                resources.extend(extra_resources.values())
+
+        if args.get('extra_directions', True):
+
+            resources.extend(netres.extra_directions.values())
+
+        return resources
+
+
+    def _datasets_to_build(self):
+        """
+        The datasets and all their dependencies which need to be built:
+        the ones without pickle dump or if rebuild is forced.
+        """
+
+        result = set()
+
+        for dataset in self.datasets:
+
+            result.add(dataset)
+            result.update(self._all_dependencies(dataset))
+
+        return {
+            dataset
+            for dataset in result
+            if (
+                self.rebuild or
+                self.get_param('rebuild_%s' % dataset) or
+                not self.pickle_exists(dataset)
+            )
+        }
+
+
+    def _all_dependencies(self, dataset):
+        """
+        All direct and indirect dependencies of a dataset.
+        """
+
+        result = set()
+
+        for dep in self.dataset_dependencies(dataset):
+
+            result.add(dep)
+            result.update(self._all_dependencies(dep))
+
+        return result
+
+
+    @staticmethod
+    def _dag_depths(datasets, dependents):
+        """
+        For each dataset the number of datasets in its longest chain of
+        dependents (including itself).
+        """
+
+        depths = {}
+
+        def depth(dataset):
+
+            if dataset not in depths:
+
+                depths[dataset] = 1 + max(
+                    (depth(d) for d in dependents[dataset] if d in datasets),
+                    default = 0,
+                )
+
+            return depths[dataset]
+
+        for dataset in datasets:
+
+            depth(dataset)
+
+        return depths
+
+
+    def critical_path(self):
+        """
+        Returns the critical path of the last parallel build: the chain of
+        dependencies which finished last. Each dataset in the path started
+        after the previous one finished.
+        """
+
+        timeline = getattr(self, 'build_timeline', {})
+
+        if not timeline:
+
+            return []
+
+        path = [max(timeline, key = lambda d: timeline[d]['end'])]
+
+        while True:
+
+            deps = [
+                d for d in timeline[path[-1]]['dependencies']
+                if d in timeline
+            ]
+
+            if not deps:
+
+                break
+
+            path.append(max(deps, key = lambda d: timeline[d]['end']))
+
+        return list(reversed(path))
+
+
+    def build_report(self):
+        """
+        Returns the timeline of the last parallel build as a string:
+        start and end time, duration and process of each dataset, and
+        the critical path.
+        """
+
+        timeline = getattr(self, 'build_timeline', {})
+        critical = self.critical_path()
+        total = max((t['end'] for t in timeline.values()), default = 0.)
+        width = 40
+
+        lines = [
+            'Build timeline (total: %.01f s):' % total,
+            '%-14s %9s %9s %9s %7s  %s' % (
+                'dataset', 'start', 'end', 'duration', 'pid', '',
+            ),
+        ]
+
+        for dataset, t in sorted(
+            iteritems(timeline),
+            key = lambda i: i[1]['start'],
+        ):
+
+            scale = width / total if total else 0
+            bar_start = int(t['start'] * scale)
+            bar_end = max(int(t['end'] * scale), bar_start + 1)
+
+            lines.append(
+                '%-14s %9.01f %9.01f %9.01f %7u  %s%s%s' % (
+                    dataset,
+                    t['start'],
+                    t['end'],
+                    t['end'] - t['start'],
+                    t['pid'],
+                    ' ' * bar_start,
+                    ('#' if dataset in critical else '=') *
+                    (bar_end - bar_start),
+                    ' *' if dataset in critical else '',
+                )
+            )
+
+        lines.append('Critical path: %s.' % ' -> '.join(critical))
+
+        return '\n'.join(lines)
 
 
     def ensure_dataset(
@@ -126,8 +536,11 @@ class DatabaseManager(session_mod.Logger):
 
             if (
                 force_rebuild or
-                self.rebuild or
-                rebuild_dataset or
+                (
+                    (self.rebuild or rebuild_dataset) and
+                    # built already by a parallel build
+                    _dataset not in self._built
+                ) or
                 not self.pickle_exists(dataset, ncbi_tax_id = ncbi_tax_id)
             ):
 
@@ -228,9 +641,17 @@ class DatabaseManager(session_mod.Logger):
         )
 
 
-    def build_dataset(self, dataset, ncbi_tax_id = 9606):
+    def build_dataset(
+            self,
+            dataset,
+            ncbi_tax_id = 9606,
+            add_network_df = True,
+        ):
         """
         Builds a dataset.
+
+        :arg bool add_network_df:
+            Create the network data frames if the dataset is a network.
         """
 
         self._log('Building dataset `%s`.' % dataset)
@@ -298,7 +719,9 @@ class DatabaseManager(session_mod.Logger):
 
         setattr(self, _dataset, db)
 
-        self._add_network_df(dataset, ncbi_tax_id = ncbi_tax_id)
+        if add_network_df:
+
+            self._add_network_df(dataset, ncbi_tax_id = ncbi_tax_id)
 
 
     def ensure_module(self, dataset, reset = True):
@@ -589,3 +1012,25 @@ class DatabaseManager(session_mod.Logger):
         self.ensure_dataset('intercell')
 
         self.intercell.register_network(network_df)
+
+
+def _build_dataset_worker(dataset, param, settings_snapshot, dependencies):
+    """
+    Builds one dataset in a worker process of a parallel build, the
+    dependencies are loaded from their pickle dumps.
+
+    :return:
+        The process ID, start and end time of the build.
+    """
+
+    start = time.time()
+    settings.setup(**settings_snapshot)
+    manager = DatabaseManager(**param)
+
+    for dep in dependencies:
+
+        manager.load_dataset(dep)
+
+    manager.build_dataset(dataset, add_network_df = False)
+
+    return os.getpid(), start, time.time()
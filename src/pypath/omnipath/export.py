@@ -30,6 +30,7 @@ import copy
 import itertools
 import collections
 
+import numpy as np
 import pandas as pd
 
 import pypath.share.progress as progress
@@ -788,124 +789,356 @@ class Export(session.Logger):
         return ';'.join(result)
 
 
+    webservice_extra_edge_attrs = (
+        'omnipath',
+        'kinaseextra',
+        'ligrecextra',
+        'pathwayextra',
+        'mirnatarget',
+        'dorothea',
+        'tf_target',
+        'lncrna_mrna',
+        'tf_mirna',
+        'dorothea_curated',
+        'dorothea_chipseq',
+        'dorothea_tfbs',
+        'dorothea_coexp',
+        'dorothea_level',
+        'type',
+        'curation_effort',
+    )
+
+    webservice_extra_node_attrs = collections.OrderedDict((
+        ('ncbi_tax_id', 'taxon'),
+        ('entity_type', 'entity_type'),
+    ))
+
+
     def webservice_interactions_df(self):
+        """
+        Creates the data frame of interactions for the web service
+        (``interactions`` query) from a ``core.network.Network`` object.
+
+        Instead of processing each edge and direction by many calls to the
+        methods of ``Interaction``, it collects all evidences in a long
+        format table (one row for each evidence of each row of the result)
+        and the references in another, and computes the columns by grouped
+        aggregations over these tables.
+        """
 
-        sources_omnipath = set(netres.omnipath.values())
-        sources_extra_directions = set(netres.extra_directions.values())
-        sources_kinase_extra = set(netres.ptm_misc.values())
-        sources_ligrec_extra = set(netres.ligand_receptor.values())
-        sources_pathway_extra = set(netres.pathway_noref.values())
-        sources_mirna = set(netres.mirna_target.values())
-        sources_tf_target = set(netres.transcription_onebyone.values())
-        sources_dorothea = {'DoRothEA'}
+        self._log('Creating interaction data frame for the web service.')
+
+        sets = self._webservice_resource_sets()
+
+        # one row for each record of the result
+        rows = []
+        directed_rows = []
+        # long format table of evidences: the record it belongs to,
+        # whether it belongs to the direction of the record (`own`) or
+        # to the other directionality included in the `sources` and
+        # `references` fields; and the resource
+        ev_row = []
+        ev_own = []
+        ev_resource = []
+        resource_codes = {}
+        resources = []
+        # references of the evidences
+        ref_ev = []
+        ref_pmid = []
 
-        self.make_df(
-            unique_pairs = False,
-            extra_node_attrs = {
-                'ncbi_tax_id': 'taxon',
-                'entity_type': 'entity_type',
-            },
-            extra_edge_attrs = {
-                'omnipath': lambda e, d: (
+        for ia in self.network:
+
+            consensus = ia.consensus()
+            dip_urls = self._dip_urls(ia)
+            ia_directed = ia.is_directed()
+
+            for _dir in ('a_b', 'b_a'):
+
+                nodes = getattr(ia, _dir)
+                directed = bool(ia.direction[nodes])
+                directed_rev = bool(ia.direction[tuple(reversed(nodes))])
+
+                if (
                     (
-                        bool(
-                            e.get_resources(direction = d) &
-                            sources_omnipath
-                        ) or
-                        (
-                            bool(
-                                e.get_resources(direction = 'undirected') &
-                                sources_omnipath
-                            ) and
-                            bool(
-                                e.get_resources(direction = d) &
-                                sources_extra_directions
-                            )
-                        )
-                    ) and (
-                        'post_translational' in
-                        e.get_interaction_types(direction = d)
-                    )
-                ),
-                'kinaseextra': lambda e, d: (
-                    bool(
-                        e.get_resources(direction = d) &
-                        sources_kinase_extra
-                    ) and (
-                        'post_translational' in
-                        e.get_interaction_types(direction = d)
-                    )
-                ),
-                'ligrecextra': lambda e, d: (
-                    bool(
-                        e.get_resources(direction = d) &
-                        sources_ligrec_extra
-                    ) and (
-                        'post_translational' in
-                        e.get_interaction_types(direction = d)
-                    )
-                ),
-                'pathwayextra': lambda e, d: (
-                    bool(
-                        e.get_resources(direction = d) &
-                        sources_pathway_extra
-                    ) and (
-                        'post_translational' in
-                        e.get_interaction_types(direction = d)
-                    )
-                ),
-                'mirnatarget': lambda e, d: (
-                    bool(
-                        e.get_resources(direction = d) &
-                        sources_mirna
-                    ) and (
-                        'post_transcriptional' in
-                        e.get_interaction_types(direction = d)
-                    )
-                ),
-                'dorothea': lambda e, d: (
-                    bool(
-                        e.get_resource_names(
-                            direction = d,
-                            interaction_type = 'transcriptional'
-                        ) &
-                        sources_dorothea
-                    )
-                ),
-                'tf_target': lambda e, d: (
-                    bool(
-                        e.get_resources(
-                            direction = d,
-                            interaction_type = 'transcriptional'
-                        ) &
-                        sources_tf_target
-                    )
-                ),
-                'lncrna_mrna': lambda e, d: (
-                    'lncrna_post_transcriptional' in
-                    e.get_interaction_types(direction = d)
-                ),
-                'tf_mirna': lambda e, d: (
-                    'mirna_transcriptional' in
-                    e.get_interaction_types(direction = d)
-                ),
-                'dorothea_curated': 'dorothea_curated',
-                'dorothea_chipseq': 'dorothea_chipseq',
-                'dorothea_tfbs':    'dorothea_tfbs',
-                'dorothea_coexp':   'dorothea_coexp',
-                'dorothea_level':   'dorothea_level',
-                'type': lambda e, d: (
-                    list(e.get_interaction_types(direction = d))[0]
-                ),
-                'curation_effort': lambda e, d: (
-                    e.count_curation_effort(direction = d) + (
-                        e.count_curation_effort(direction = 'undirected')
-                            if isinstance(d, tuple) else
-                        0
+                        not directed and
+                        (_dir == 'b_a' or directed_rev)
+                    ) or (
+                        ia.is_loop() and
+                        _dir == 'b_a'
                     )
-                ),
-            }
+                ):
+
+                    continue
+
+                # the direction the extra fields refer to
+                own, other = (
+                    (nodes, 'undirected')
+                        if ia_directed else
+                    ('undirected', nodes)
+                )
+
+                for is_own, _dir_key in ((True, own), (False, other)):
+
+                    for ev in ia.direction[_dir_key]:
+
+                        key = ev.resource.key
+
+                        if key not in resource_codes:
+
+                            resource_codes[key] = len(resources)
+                            resources.append(ev.resource)
+
+                        for ref in ev.references:
+
+                            ref_ev.append(len(ev_row))
+                            ref_pmid.append(ref.pmid)
+
+                        ev_row.append(len(rows))
+                        ev_own.append(is_own)
+                        ev_resource.append(resource_codes[key])
+
+                directed_rows.append(ia_directed)
+                rows.append(
+                    [
+                        nodes[0].identifier,
+                        nodes[1].identifier,
+                        nodes[0].label,
+                        nodes[1].label,
+                        int(directed),
+                        int(getattr(ia, 'positive_%s' % _dir)()),
+                        int(getattr(ia, 'negative_%s' % _dir)()),
+                        self.match_consensus(consensus, nodes),
+                        self.match_consensus(consensus, nodes, 'positive'),
+                        self.match_consensus(consensus, nodes, 'negative'),
+                        dip_urls,
+                    ] +
+                    [
+                        self.default_edge_attr_processor(
+                            ia.attrs[attr] if attr in ia.attrs else None
+                        )
+                        for attr in (
+                            'dorothea_curated',
+                            'dorothea_chipseq',
+                            'dorothea_tfbs',
+                            'dorothea_coexp',
+                            'dorothea_level',
+                        )
+                    ] +
+                    [
+                        self.default_vertex_attr_processor(
+                            getattr(node, attr)
+                        )
+                        for node in nodes
+                        for attr in self.webservice_extra_node_attrs.values()
+                    ]
+                )
+
+        n_rows = len(rows)
+        ev_row = np.array(ev_row, dtype = np.int64)
+        ev_own = np.array(ev_own, dtype = bool)
+        ev_resource = np.array(ev_resource, dtype = np.int64)
+        directed_rows = np.array(directed_rows, dtype = bool)
+
+        # features of the resources
+        res_name = np.array([res.name for res in resources], dtype = object)
+        res_label = np.array(
+            [
+                '%s%s' % (res.name, ('_%s' % res.via) if res.via else '')
+                for res in resources
+            ],
+            dtype = object,
+        )
+        res_primary = np.array([not res.via for res in resources], dtype = bool)
+        res_itype = np.array(
+            [res.interaction_type for res in resources],
+            dtype = object,
+        )
+        res_in = dict(
+            (
+                label,
+                np.array([res in _set for res in resources], dtype = bool),
+            )
+            for label, _set in iteritems(sets)
+        )
+
+        # evidences by their role in the fields
+        primary = res_primary[ev_resource]
+        own_primary = ev_own & primary
+        # the undirected evidences: for undirected records these
+        # are the own evidences, for directed ones the other
+        undirected_primary = (ev_own != directed_rows[ev_row]) & primary
+        itype = res_itype[ev_resource]
+
+        def _any(mask):
+
+            return np.bincount(ev_row[mask], minlength = n_rows) > 0
+
+        def _own_in(label, interaction_type = None):
+
+            return _any(
+                own_primary &
+                res_in[label][ev_resource] &
+                (
+                    True
+                        if interaction_type is None else
+                    itype == interaction_type
+                )
+            )
+
+        post_translational = _any(
+            own_primary & (itype == 'post_translational')
+        )
+
+        columns = collections.OrderedDict()
+
+        columns['omnipath'] = (
+            (
+                _own_in('omnipath') |
+                (
+                    _any(
+                        undirected_primary &
+                        res_in['omnipath'][ev_resource]
+                    ) &
+                    _own_in('extra_directions')
+                )
+            ) &
+            post_translational
+        )
+        columns['kinaseextra'] = _own_in('kinase_extra') & post_translational
+        columns['ligrecextra'] = _own_in('ligrec_extra') & post_translational
+        columns['pathwayextra'] = (
+            _own_in('pathway_extra') & post_translational
+        )
+        columns['mirnatarget'] = (
+            _own_in('mirna') &
+            _any(own_primary & (itype == 'post_transcriptional'))
+        )
+        columns['dorothea'] = _any(
+            own_primary &
+            (itype == 'transcriptional') &
+            (res_name[ev_resource] == 'DoRothEA')
         )
+        columns['tf_target'] = _own_in('tf_target', 'transcriptional')
+        columns['lncrna_mrna'] = _any(
+            own_primary & (itype == 'lncrna_post_transcriptional')
+        )
+        columns['tf_mirna'] = _any(
+            own_primary & (itype == 'mirna_transcriptional')
+        )
+
+        refs = pd.DataFrame({
+            'row': ev_row[ref_ev],
+            'own': ev_own[ref_ev],
+            'primary': primary[ref_ev],
+            'undirected': undirected_primary[ref_ev],
+            'name': res_name[ev_resource[ref_ev]],
+            'pmid': np.array(ref_pmid, dtype = object),
+        })
+
+        def _join(row, values):
+            """
+            Sorted unique values by record, joined by semicolon.
+            """
+
+            df = pd.DataFrame({'row': row, 'value': values})
+            df = df.drop_duplicates().sort_values(['row', 'value'])
+            values = df.value.tolist()
+            bounds = np.searchsorted(df.row.values, np.arange(n_rows + 1))
+
+            return [
+                ';'.join(values[bounds[i]:bounds[i + 1]])
+                for i in xrange(n_rows)
+            ]
+
+        sources = _join(ev_row, res_label[ev_resource])
+        references = _join(
+            refs.row[refs.primary],
+            refs.name[refs.primary] + ':' + refs.pmid[refs.primary],
+        )
+
+        # the first element of the set of interaction types of the record,
+        # exactly as it would be iterated from a set built in the order of
+        # the evidences
+        itypes = collections.defaultdict(list)
+
+        for r, it in zip(ev_row[own_primary], itype[own_primary]):
+
+            itypes[r].append(it)
+
+        columns['type'] = [list(set(itypes[r]))[0] for r in xrange(n_rows)]
+
+        # curation effort: resource-reference pairs by the direction of
+        # the record, for directed records plus the ones of the
+        # undirected evidences
+        effort = refs.loc[
+            refs.primary & (refs.own | refs.undirected),
+            ['row', 'own', 'name', 'pmid'],
+        ].drop_duplicates()
+        columns['curation_effort'] = np.bincount(
+            effort.row.values,
+            minlength = n_rows,
+        )
+
+        header = self.get_webservice_header()
+        base = header[:10]
+        extra_node = header[-2 * len(self.webservice_extra_node_attrs):]
+        dorothea_attrs = [
+            'dorothea_curated',
+            'dorothea_chipseq',
+            'dorothea_tfbs',
+            'dorothea_coexp',
+            'dorothea_level',
+        ]
+
+        data = pd.DataFrame(
+            rows,
+            columns = base + ['dip_url'] + dorothea_attrs + extra_node,
+        )
+        data['sources'] = sources
+        data['references'] = references
+
+        for col, values in iteritems(columns):
+
+            data[col] = (
+                values.tolist()
+                    if isinstance(values, np.ndarray) else
+                values
+            )
+
+        self.df = data.loc[:,header]
+        self.df = self.df.astype(self.default_dtypes_bydirs)
+
+        self._log(
+            'Created interaction data frame for the web service: '
+            '%u records.' % n_rows
+        )
+
+
+    def get_webservice_header(self):
+
+        return (
+            self.default_header_bydirs +
+            list(self.webservice_extra_edge_attrs) +
+            [
+                '%s_%s' % (attr, side)
+                for side in ('source', 'target')
+                for attr in self.webservice_extra_node_attrs.keys()
+            ]
+        )
+
+
+    @staticmethod
+    def _webservice_resource_sets():
+
+        return collections.OrderedDict((
+            ('omnipath', set(netres.omnipath.values())),
+            ('extra_directions', set(netres.extra_directions.values())),
+            ('kinase_extra', set(netres.ptm_misc.values())),
+            ('ligrec_extra', set(netres.ligand_receptor.values())),
+            ('pathway_extra', set(netres.pathway_noref.values())),
+            ('mirna', set(netres.mirna_target.values())),
+            ('tf_target', set(netres.transcription_onebyone.values())),
+        ))
 
 
     def webservice_interactions_df_legacy(self):
@@ -0,0 +1,452 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+#  This file is part of the `pypath` python module
+#  Downloads the data of a build in advance, concurrently.
+#
+#  Copyright
+#  2014-2020
+#  EMBL, EMBL-EBI, Uniklinik RWTH Aachen, Heidelberg University
+#
+#  File author(s): Dénes Türei (turei.denes@gmail.com)
+#                  Nicolàs Palacio
+#                  Olga Ivanova
+#
+#  Distributed under the GPLv3 License.
+#  See accompanying file LICENSE.txt or copy at
+#      http://www.gnu.org/licenses/gpl-3.0.html
+#
+#  Website: http://pypath.omnipathdb.org/
+#
+
+"""
+Finds out the downloads of the resources by calling their input methods
+in ``DRYRUN`` mode and downloads the ones missing from the cache
+concurrently, before the actual build, so processing the data does not
+need to wait for the network.
+"""
+
+from future.utils import iteritems
+
+import os
+import sys
+import importlib as imp
+import time
+import traceback
+import multiprocessing
+import concurrent.futures
+
+import pypath.share.session as session_mod
+import pypath.share.settings as settings
+import pypath.share.curl as curl
+import pypath.share.common as common
+import pypath.inputs as inputs
+
+
+class PrefetchPlanner(session_mod.Logger):
+    """
+    Collects the input methods of network, annotation, complex and
+    enzyme-substrate resources, calls them in ``DRYRUN`` mode to find out
+    the URLs and POST parameters they would request, and downloads the
+    ones not available in the cache in concurrent threads.
+
+    In ``DRYRUN`` mode each download returns ``None``, hence the input
+    methods usually stop at their first request. The downloads which
+    depend on the contents of earlier ones can not be discovered in
+    advance, those still happen during the build as before. The dry runs
+    are carried out in a forked process, so the failures of the input
+    methods have no side effects on the current process, and the
+    downloads start as soon as the first input has been planned. The
+    input methods in ``DRYRUN`` mode might leave behind incomplete data,
+    e.g. empty ID translation tables, hence without the ``fork`` start
+    method nothing is prefetched.
+
+    :param dict,list network:
+        Network resources (``NetworkResource`` or ``NetworkInput``
+        objects).
+    :param bool,set annotations:
+        Names of annotation resource classes in ``pypath.core.annot``;
+        if ``True``, the default protein and complex annotation resources.
+    :param bool,set complexes:
+        Names of complex resource classes in ``pypath.core.complex``;
+        if ``True``, the default complex resources.
+    :param bool,list enz_sub:
+        Enzyme-substrate resources (``EnzymeSubstrateResource`` objects);
+        if ``True``, all resources from the resource controller.
+    :param int workers:
+        Number of concurrent downloads, by default the
+        ``prefetch_workers`` setting.
+    """
+
+    def __init__(
+            self,
+            network = None,
+            annotations = None,
+            complexes = None,
+            enz_sub = None,
+            workers = None,
+        ):
+
+        session_mod.Logger.__init__(self, name = 'prefetch')
+
+        self.network = network
+        self.annotations = annotations
+        self.complexes = complexes
+        self.enz_sub = enz_sub
+        self.workers = workers or settings.get('prefetch_workers') or 1
+        self.inputs = []
+        self.requests = {}
+        self.downloaded = []
+        self.failed = []
+
+
+    def reload(self):
+
+        modname = self.__class__.__module__
+        mod = __import__(modname, fromlist = [modname.split('.')[0]])
+        imp.reload(mod)
+        new = getattr(mod, self.__class__.__name__)
+        setattr(self, '__class__', new)
+
+
+    def main(self):
+        """
+        Collects the inputs, plans and carries out the downloads.
+        """
+
+        self.collect_inputs()
+        self.prefetch()
+
+
+    def collect_inputs(self):
+        """
+        Creates a list of the input methods and their arguments in the
+        :py:attr:`inputs` attribute, as tuples of resource name, method
+        and arguments.
+        """
+
+        self.inputs = []
+        self._collect_network()
+        self._collect_annotations()
+        self._collect_complexes()
+        self._collect_enz_sub()
+
+        self._log('Collected %u inputs to prefetch.' % len(self.inputs))
+
+
+    def _collect_network(self):
+
+        network = self.network or ()
+        network = (
+            network.values()
+                if isinstance(network, dict) else
+            network
+        )
+
+        for resource in network:
+
+            networkinput = getattr(resource, 'networkinput', resource)
+            _input = networkinput.input
+
+            if isinstance(_input, common.basestring) and curl.is_url(_input):
+
+                self.inputs.append(
+                    (networkinput.name, _url_input, {'url': _input})
+                )
+
+            elif (
+                isinstance(_input, common.basestring) and
+                os.path.exists(_input)
+            ):
+
+                continue
+
+            else:
+
+                self.inputs.append((
+                    networkinput.name,
+                    _input,
+                    networkinput.input_args or {},
+                ))
+
+
+    def _collect_annotations(self):
+
+        if not self.annotations:
+
+            return
+
+        import pypath.core.annot as annot
+
+        names = (
+            annot.protein_sources_default | annot.complex_sources_default
+                if self.annotations is True else
+            common.to_set(self.annotations)
+        )
+
+        self._collect_classes(annot, names)
+
+
+    def _collect_complexes(self):
+
+        if not self.complexes:
+
+            return
+
+        import pypath.core.complex as complex
+
+        names = (
+            complex.complex_resources
+                if self.complexes is True else
+            self.complexes
+        )
+
+        self._collect_classes(complex, names)
+
+
+    def _collect_classes(self, mod, names):
+        """
+        Reads the input method and arguments of resource classes, without
+        loading the data.
+        """
+
+        for name in sorted(names):
+
+            try:
+
+                cls = getattr(mod, name)
+                obj = cls.__new__(cls)
+                # the constructors load the data, here we skip this
+                obj.load = lambda *args, **kwargs: None
+                cls.__init__(obj)
+
+                self.inputs.append(
+                    (name, obj._input_method, obj.input_args or {})
+                )
+
+            except Exception:
+
+                self._log(
+                    'Could not read the input method of `%s`: %s' % (
+                        name,
+                        traceback.format_exception(*sys.exc_info()),
+                    )
+                )
+
+
+    def _collect_enz_sub(self):
+
+        if not self.enz_sub:
+
+            return
+
+        import pypath.resources as resources
+
+        enz_sub = (
+            resources.get_controller().collect_enzyme_substrate()
+                if self.enz_sub is True else
+            self.enz_sub
+        )
+
+        for resource in enz_sub:
+
+            self.inputs.append((
+                resource.name,
+                resource.input_method,
+                getattr(resource, 'input_args', None) or {},
+            ))
+
+
+    def prefetch(self):
+        """
+        Plans the requests and downloads the ones missing from the cache.
+        """
+
+        self.requests = {}
+        self.downloaded = []
+        self.failed = []
+        start = time.time()
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+
+            self._log(
+                'Prefetching requires the `fork` start method, '
+                'which is not available on this platform.'
+            )
+            return
+
+        self._log(
+            'Prefetching the data of %u inputs in %u threads.' % (
+                len(self.inputs),
+                self.workers,
+            )
+        )
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers = self.workers,
+        ) as executor:
+
+            futures = []
+
+            for name, requests in self._plan():
+
+                for cache_file, args in requests:
+
+                    if cache_file in self.requests:
+
+                        continue
+
+                    self.requests[cache_file] = args
+                    futures.append(
+                        executor.submit(self._download, cache_file, args)
+                    )
+
+            for future in concurrent.futures.as_completed(futures):
+
+                cache_file, success = future.result()
+                (self.downloaded if success else self.failed).append(
+                    cache_file
+                )
+
+        self._log(
+            'Prefetching finished in %.02f s: %u requests planned, '
+            '%u downloaded, %u failed.' % (
+                time.time() - start,
+                len(self.requests),
+                len(self.downloaded),
+                len(self.failed),
+            )
+        )
+
+
+    def _plan(self):
+        """
+        Calls the input methods in ``DRYRUN`` mode, in a forked process.
+        Yields tuples of resource name and the list of its requests
+        missing from the cache.
+        """
+
+        # the worker inherits the inputs by forking
+        globals()['_planner'] = self
+
+        try:
+
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers = 1,
+                mp_context = multiprocessing.get_context('fork'),
+            ) as executor:
+
+                futures = [
+                    executor.submit(_dryrun, i)
+                    for i in range(len(self.inputs))
+                ]
+
+                for i in range(len(futures)):
+
+                    future, futures[i] = futures[i], None
+
+                    try:
+
+                        yield future.result()
+
+                    except Exception:
+
+                        self._log(
+                            'Failed to plan the downloads of `%s`: %s' % (
+                                self.inputs[i][0],
+                                traceback.format_exception(*sys.exc_info()),
+                            )
+                        )
+
+        finally:
+
+            globals()['_planner'] = None
+
+
+    def _dryrun(self, i):
+
+        name, method, args = self.inputs[i]
+        requests = []
+        curl.DRYRUN_REQUESTS = requests
+
+        with curl.dryrun_on():
+
+            try:
+
+                inputs.get_method(method)(**args)
+
+            except Exception:
+
+                # expected, as each download returns None
+                pass
+
+            finally:
+
+                curl.DRYRUN_REQUESTS = None
+
+        self._log(
+            'Input `%s`: %u requests to prefetch.' % (name, len(requests))
+        )
+
+        return name, requests
+
+
+    def _download(self, cache_file, args):
+
+        if _cache_exists(cache_file):
+
+            return cache_file, True
+
+        args = dict(args)
+        args.update(silent = True, process = False, large = True)
+
+        try:
+
+            c = curl.Curl(**args)
+            success = not c.download_failed and _cache_exists(cache_file)
+
+        except Exception:
+
+            self._log(
+                'Failed to prefetch `%s`: %s' % (
+                    args['url'],
+                    traceback.format_exception(*sys.exc_info()),
+                )
+            )
+            success = False
+
+        return cache_file, success
+
+
+_planner = None
+
+
+def _dryrun(i):
+    """
+    Plans the downloads of one input in a worker process.
+    """
+
+    return globals()['_planner']._dryrun(i)
+
+
+def _url_input(url):
+
+    curl.Curl(url, silent = False, large = True)
+
+
+def _cache_exists(path):
+
+    return os.path.exists(path) and os.stat(path).st_size > 0
+
+
+def prefetch(**kwargs):
+    """
+    Downloads the data of the resources in advance. See
+    :py:class:`PrefetchPlanner` for the arguments.
+    """
+
+    planner = PrefetchPlanner(**kwargs)
+    planner.main()
+
+    return planner
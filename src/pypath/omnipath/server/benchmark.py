@@ -0,0 +1,907 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+#  This file is part of the `pypath` python module
+#  Load testing and latency benchmark for the web service.
+#
+#  Copyright
+#  2014-2020
+#  EMBL, EMBL-EBI, Uniklinik RWTH Aachen, Heidelberg University
+#
+#  File author(s): Dénes Türei (turei.denes@gmail.com)
+#                  Nicolàs Palacio
+#                  Olga Ivanova
+#
+#  Distributed under the GPLv3 License.
+#  See accompanying file LICENSE.txt or copy at
+#      http://www.gnu.org/licenses/gpl-3.0.html
+#
+#  Website: http://pypath.omnipathdb.org/
+#
+
+from future.utils import iteritems
+
+import os
+import time
+import json
+import socket
+import tempfile
+import collections
+import importlib as imp
+import multiprocessing
+import concurrent.futures
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from pypath.share import session as session_mod
+import pypath.resources as resources_mod
+from pypath._version import __version__
+
+_logger = session_mod.Logger(name = 'server_benchmark')
+_log = _logger._log
+
+
+# number of rows in the synthetic tables
+DEFAULT_SIZES = {
+    'interactions': 100000,
+    'enzsub': 50000,
+    'complexes': 10000,
+    'annotations': 500000,
+    'intercell': 100000,
+}
+
+INTERACTION_DATASETS = (
+    'omnipath',
+    'kinaseextra',
+    'ligrecextra',
+    'pathwayextra',
+    'mirnatarget',
+    'dorothea',
+    'tf_target',
+    'lncrna_mrna',
+    'tf_mirna',
+)
+
+INTERACTION_TYPES = (
+    'post_translational',
+    'transcriptional',
+    'post_transcriptional',
+    'mirna_transcriptional',
+    'lncrna_post_transcriptional',
+)
+
+INTERCELL_CATEGORIES = (
+    'ligand',
+    'receptor',
+    'ecm',
+    'adhesion',
+    'secreted_enzyme',
+    'transporter',
+    'ion_channel',
+    'cell_surface_enzyme',
+)
+
+# columns of the tables with protein identifiers, used to collect the
+# identifiers for the queries if the tables are provided by the user
+PROTEIN_COLUMNS = {
+    'interactions': ('source', 'target'),
+    'enzsub': ('enzyme', 'substrate'),
+    'annotations': ('uniprot',),
+    'intercell': ('uniprot',),
+}
+
+# (name, weight, query type, arguments)
+# the arguments are functions of the random generator and the pools
+# of identifiers and resource names (see ``SyntheticTables.pools``)
+DEFAULT_QUERIES = (
+    (
+        'interactions_partners',
+        20,
+        'interactions',
+        lambda rng, pools: {
+            'partners': _sample(rng, pools['proteins'], 5),
+            'genesymbols': 'yes',
+            'fields': 'sources,references',
+        },
+    ),
+    (
+        'interactions_datasets',
+        5,
+        'interactions',
+        lambda rng, pools: {
+            'datasets': _sample(rng, INTERACTION_DATASETS, 2),
+            'fields': 'type,sources',
+        },
+    ),
+    (
+        'interactions_json',
+        10,
+        'interactions',
+        lambda rng, pools: {
+            'partners': _sample(rng, pools['proteins'], 5),
+            'fields': 'sources,references',
+            'format': 'json',
+        },
+    ),
+    (
+        'interactions_licensed',
+        5,
+        'interactions',
+        lambda rng, pools: {
+            'sources': _sample(rng, pools['proteins'], 20),
+            'fields': 'sources,references',
+            'license': 'commercial',
+        },
+    ),
+    (
+        'enzsub_partners',
+        10,
+        'enzsub',
+        lambda rng, pools: {
+            'partners': _sample(rng, pools['proteins'], 5),
+            'genesymbols': 'yes',
+            'fields': 'sources,references',
+        },
+    ),
+    (
+        'annotations_resource',
+        10,
+        'annotations',
+        lambda rng, pools: {
+            'resources': _sample(rng, pools['annotations'], 1),
+        },
+    ),
+    (
+        'annotations_proteins',
+        15,
+        'annotations',
+        lambda rng, pools: {
+            'proteins': _sample(rng, pools['proteins'], 10),
+        },
+    ),
+    (
+        'intercell_categories',
+        10,
+        'intercell',
+        lambda rng, pools: {
+            'categories': _sample(rng, INTERCELL_CATEGORIES, 2),
+            'scope': 'generic',
+        },
+    ),
+    (
+        'intercell_json',
+        5,
+        'intercell',
+        lambda rng, pools: {
+            'proteins': _sample(rng, pools['proteins'], 10),
+            'format': 'json',
+        },
+    ),
+    (
+        'complexes_proteins',
+        10,
+        'complexes',
+        lambda rng, pools: {
+            'proteins': _sample(rng, pools['proteins'], 5),
+        },
+    ),
+)
+
+
+def _sample(rng, pool, n):
+
+    n = min(n, len(pool))
+
+    return ','.join(str(i) for i in rng.choice(pool, n, replace = False))
+
+
+class SyntheticTables(session_mod.Logger):
+    """
+    Generates random tables following the format of the tables served
+    by ``pypath.omnipath.server.run.TableServer``.
+    """
+
+
+    def __init__(
+            self,
+            outdir = None,
+            sizes = None,
+            n_proteins = 20000,
+            n_resources = 40,
+            seed = 0,
+        ):
+        """
+        :param str outdir:
+            Directory to write the tables; a temporary directory by default.
+        :param dict sizes:
+            Number of rows for each table, the missing tables won't be
+            created. By default ``DEFAULT_SIZES``.
+        :param int n_proteins:
+            Number of distinct protein identifiers.
+        :param int n_resources:
+            Maximum number of distinct resource names in each table.
+        :param int seed:
+            Seed for the random generator.
+        """
+
+        session_mod.Logger.__init__(self, name = 'server_benchmark')
+
+        self.outdir = outdir or tempfile.mkdtemp(prefix = 'pypath_srv_bm_')
+        self.sizes = DEFAULT_SIZES if sizes is None else sizes
+        self.n_proteins = n_proteins
+        self.n_resources = n_resources
+        self.rng = np.random.default_rng(seed)
+
+
+    def main(self):
+
+        self.make_pools()
+        self.input_files = {}
+        os.makedirs(self.outdir, exist_ok = True)
+
+        for table, size in iteritems(self.sizes):
+
+            self._log('Generating table `%s` of %u rows.' % (table, size))
+
+            df = getattr(self, table)(size)
+            path = os.path.join(
+                self.outdir,
+                'synthetic_webservice_%s.tsv' % table,
+            )
+            df.to_csv(path, sep = '\t', index = False)
+            self.input_files[table] = path
+
+        return self.input_files
+
+
+    def make_pools(self):
+
+        res_ctrl = resources_mod.get_controller()
+        # only resources with license information, otherwise the
+        # server could not filter them by license
+        names = sorted(
+            name
+            for name, license in iteritems(res_ctrl.licenses)
+            if license is not None and '_' not in name
+        )
+        step = max(len(names) // self.n_resources, 1)
+        resources = names[::step][:self.n_resources]
+
+        self.pools = {
+            'proteins': np.array([
+                'P%05u' % i for i in range(self.n_proteins)
+            ]),
+            'genesymbols': np.array([
+                'GENE%u' % i for i in range(self.n_proteins)
+            ]),
+            'resources': np.array(resources),
+            'annotations': np.array(resources[:len(resources) // 2]),
+        }
+
+
+    def _proteins(self, n):
+
+        idx = self.rng.integers(0, self.n_proteins, n)
+
+        return self.pools['proteins'][idx], self.pools['genesymbols'][idx]
+
+
+    def _resources(self, n, max_per_record = 3):
+
+        counts = self.rng.integers(1, max_per_record + 1, n)
+        pool = self.pools['resources']
+
+        return [
+            ';'.join(sorted(set(self.rng.choice(pool, c))))
+            for c in counts
+        ]
+
+
+    def _references(self, resources):
+
+        return [
+            ';'.join(
+                '%s:%u' % (res, self.rng.integers(1000000, 35000000))
+                for res in ress.split(';')
+            )
+            for ress in resources
+        ]
+
+
+    def _flag(self, n, p = .5):
+
+        return (self.rng.random(n) < p).astype(np.int8)
+
+
+    def _organisms(self, n):
+
+        return self.rng.choice([9606, 10090, 10116], n, p = [.6, .2, .2])
+
+
+    def interactions(self, n):
+
+        source, source_genesymbol = self._proteins(n)
+        target, target_genesymbol = self._proteins(n)
+        sources = self._resources(n)
+        is_directed = self._flag(n, .8)
+        is_stimulation = self._flag(n, .4) * is_directed
+        is_inhibition = self._flag(n, .2) * is_directed
+        types = self.rng.choice(
+            INTERACTION_TYPES,
+            n,
+            p = [.6, .3, .06, .02, .02],
+        )
+        transcriptional = types == 'transcriptional'
+        dorothea = transcriptional & (self.rng.random(n) < .8)
+        organism = self._organisms(n)
+
+        df = pd.DataFrame({
+            'source': source,
+            'target': target,
+            'is_directed': is_directed,
+            'is_stimulation': is_stimulation,
+            'is_inhibition': is_inhibition,
+            'consensus_direction': is_directed,
+            'consensus_stimulation': is_stimulation,
+            'consensus_inhibition': is_inhibition,
+            'dip_url': '',
+            'sources': sources,
+            'references': self._references(sources),
+            'dorothea_curated': np.where(dorothea, self._flag(n), np.nan),
+            'dorothea_chipseq': np.where(dorothea, self._flag(n), np.nan),
+            'dorothea_tfbs': np.where(dorothea, self._flag(n), np.nan),
+            'dorothea_coexp': np.where(dorothea, self._flag(n), np.nan),
+            'dorothea_level': pd.Series(
+                self.rng.choice(list('ABCDE'), n)
+            ).where(dorothea),
+            'type': types,
+            'curation_effort': self.rng.integers(0, 20, n),
+            'ncbi_tax_id_source': organism,
+            'ncbi_tax_id_target': organism,
+            'entity_type_source': 'protein',
+            'entity_type_target': 'protein',
+            'source_genesymbol': source_genesymbol,
+            'target_genesymbol': target_genesymbol,
+        })
+
+        post_translational = types == 'post_translational'
+        df['omnipath'] = post_translational & (self.rng.random(n) < .6)
+        df['kinaseextra'] = post_translational & (self.rng.random(n) < .2)
+        df['ligrecextra'] = post_translational & (self.rng.random(n) < .2)
+        df['pathwayextra'] = post_translational & (self.rng.random(n) < .2)
+        df['mirnatarget'] = types == 'post_transcriptional'
+        df['dorothea'] = dorothea
+        df['tf_target'] = transcriptional & ~dorothea
+        df['lncrna_mrna'] = types == 'lncrna_post_transcriptional'
+        df['tf_mirna'] = types == 'mirna_transcriptional'
+
+        return df
+
+
+    def enzsub(self, n):
+
+        enzyme, enzyme_genesymbol = self._proteins(n)
+        substrate, substrate_genesymbol = self._proteins(n)
+        sources = self._resources(n)
+
+        return pd.DataFrame({
+            'enzyme': enzyme,
+            'enzyme_genesymbol': enzyme_genesymbol,
+            'substrate': substrate,
+            'substrate_genesymbol': substrate_genesymbol,
+            'isoforms': self.rng.integers(1, 4, n),
+            'residue_type': self.rng.choice(list('STY'), n),
+            'residue_offset': self.rng.integers(1, 2000, n),
+            'modification': self.rng.choice(
+                ['phosphorylation', 'dephosphorylation', 'ubiquitination'],
+                n,
+                p = [.8, .15, .05],
+            ),
+            'sources': sources,
+            'references': self._references(sources),
+            'curation_effort': self.rng.integers(0, 20, n),
+            'ncbi_tax_id': self._organisms(n),
+        })
+
+
+    def complexes(self, n):
+
+        sizes = self.rng.integers(2, 6, n)
+        sources = self._resources(n)
+        components = []
+        components_genesymbols = []
+
+        for size in sizes:
+
+            uniprots, genesymbols = self._proteins(size)
+            components.append('_'.join(sorted(uniprots)))
+            components_genesymbols.append('_'.join(sorted(genesymbols)))
+
+        return pd.DataFrame({
+            'name': ['complex_%u' % i for i in range(n)],
+            'components': components,
+            'components_genesymbols': components_genesymbols,
+            'stoichiometry': [':'.join(['1'] * size) for size in sizes],
+            'sources': sources,
+            'references': [
+                ';'.join(str(r.split(':')[1]) for r in refs.split(';'))
+                for refs in self._references(sources)
+            ],
+            'identifiers': [
+                ';'.join('%s:%u' % (res, i) for res in ress.split(';'))
+                for i, ress in enumerate(sources)
+            ],
+        })
+
+
+    def annotations(self, n):
+
+        uniprot, genesymbol = self._proteins(n)
+        # on average 3 label-value pairs make up one record
+        record_id = np.arange(n) // 3
+        labels = np.array(['mainclass', 'subclass', 'score', 'pathway'])
+
+        return pd.DataFrame({
+            'uniprot': uniprot,
+            'genesymbol': genesymbol,
+            'entity_type': 'protein',
+            'source': self.rng.choice(self.pools['annotations'], n),
+            'label': self.rng.choice(labels, n),
+            'value': [
+                '%.03f' % v if v < .3 else 'value_%u' % (v * 100)
+                for v in self.rng.random(n)
+            ],
+            'record_id': record_id,
+        })
+
+
+    def intercell(self, n):
+
+        uniprot, genesymbol = self._proteins(n)
+        category = self.rng.choice(INTERCELL_CATEGORIES, n)
+        scope = self.rng.choice(['generic', 'specific'], n, p = [.3, .7])
+        database = np.where(
+            scope == 'generic',
+            'OmniPath',
+            self.rng.choice(self.pools['resources'], n),
+        )
+        transmitter = self.rng.random(n) < .4
+
+        return pd.DataFrame({
+            'category': category,
+            'parent': category,
+            'database': database,
+            'scope': scope,
+            'aspect': self.rng.choice(
+                ['functional', 'locational'],
+                n,
+                p = [.7, .3],
+            ),
+            'source': np.where(
+                scope == 'generic',
+                'composite',
+                'resource_specific',
+            ),
+            'uniprot': uniprot,
+            'genesymbol': genesymbol,
+            'entity_type': 'protein',
+            'consensus_score': self.rng.integers(0, 30, n),
+            'transmitter': transmitter,
+            'receiver': ~transmitter,
+            'secreted': self.rng.random(n) < .3,
+            'plasma_membrane_transmembrane': self.rng.random(n) < .4,
+            'plasma_membrane_peripheral': self.rng.random(n) < .2,
+        })
+
+
+def _serve(port, input_files):
+    """
+    Runs a ``TableServer`` in the current process, this is the target of
+    the server process started by ``ServerBenchmark``.
+    """
+
+    from pypath.omnipath.server import run
+
+    run.Rest(
+        port,
+        serverclass = run.TableServer,
+        input_files = input_files,
+        only_tables = set(input_files.keys()),
+    )
+
+
+def _pools_from_tables(input_files):
+    """
+    Collects the protein identifiers and annotation resource names from
+    the tables in ``input_files``, to be used in the queries instead of
+    the pools of ``SyntheticTables``. Returns the pools and the number
+    of rows in each table.
+    """
+
+    proteins = set()
+    annotations = set()
+    sizes = {}
+
+    for table, path in iteritems(input_files):
+
+        protein_columns = PROTEIN_COLUMNS.get(table, ())
+        header = pd.read_csv(path, sep = '\t', nrows = 0).columns
+        columns = [
+            col
+            for col in protein_columns + (
+                ('source',) if table == 'annotations' else ()
+            )
+            if col in header
+        ] or [header[0]]
+        df = pd.read_csv(path, sep = '\t', usecols = columns, dtype = str)
+        sizes[table] = len(df)
+
+        for col in protein_columns:
+
+            if col in df.columns:
+
+                proteins.update(
+                    i for i in df[col].dropna()
+                    if not i.startswith('COMPLEX')
+                )
+
+        if table == 'annotations' and 'source' in df.columns:
+
+            annotations.update(df['source'].dropna())
+
+    pools = {
+        'proteins': np.array(sorted(proteins)),
+        'annotations': np.array(sorted(annotations)),
+    }
+
+    return pools, sizes
+
+
+def _proc_memory(pid, key = 'VmHWM'):
+    """
+    Reads the memory usage of a process from the ``/proc`` filesystem,
+    in bytes. ``VmHWM`` is the peak, ``VmRSS`` the current resident set
+    size. Returns None if not available (e.g. not on Linux).
+    """
+
+    try:
+
+        with open('/proc/%u/status' % pid, 'r') as fp:
+
+            for line in fp:
+
+                if line.startswith('%s:' % key):
+
+                    return int(line.split()[1]) * 1024
+
+    except (IOError, OSError, ValueError):
+
+        pass
+
+
+class ServerBenchmark(session_mod.Logger):
+    """
+    Starts a ``TableServer`` on synthetic tables in a separate process,
+    sends a weighted random mix of queries at a certain concurrency and
+    reports throughput, latency percentiles and the memory usage of the
+    server.
+
+    Example:
+
+        bm = ServerBenchmark(concurrency = 8, n_requests = 1000)
+        bm.main()
+        bm.result['latency']['all']['p95']
+    """
+
+
+    def __init__(
+            self,
+            sizes = None,
+            concurrency = 4,
+            n_requests = 500,
+            queries = None,
+            port = None,
+            seed = 0,
+            input_files = None,
+            outfile = None,
+            accept_encoding = None,
+            startup_timeout = 600,
+        ):
+        """
+        :param dict sizes:
+            Number of rows in the synthetic tables, see ``SyntheticTables``.
+        :param int concurrency:
+            Number of requests in flight at the same time.
+        :param int n_requests:
+            Total number of requests to send.
+        :param tuple queries:
+            Query definitions, the default is ``DEFAULT_QUERIES``.
+        :param int port:
+            Port for the server, by default a free port is selected.
+        :param int seed:
+            Seed for the random generator of tables and queries.
+        :param dict input_files:
+            Use these tables instead of generating synthetic ones.
+        :param str outfile:
+            Write the results in JSON format into this file.
+        :param str accept_encoding:
+            Value of the ``Accept-Encoding`` header of the requests.
+        :param int startup_timeout:
+            Seconds to wait for the server to start up.
+        """
+
+        session_mod.Logger.__init__(self, name = 'server_benchmark')
+
+        self.sizes = sizes
+        self.concurrency = concurrency
+        self.n_requests = n_requests
+        self.queries = queries or DEFAULT_QUERIES
+        self.port = port or self._free_port()
+        self.seed = seed
+        self.input_files = input_files
+        self.tables = None
+        self.outfile = outfile
+        self.accept_encoding = accept_encoding
+        self.startup_timeout = startup_timeout
+        self.rng = np.random.default_rng(seed)
+
+
+    def reload(self):
+
+        modname = self.__class__.__module__
+        mod = __import__(modname, fromlist = [modname.split('.')[0]])
+        imp.reload(mod)
+        new = getattr(mod, self.__class__.__name__)
+        setattr(self, '__class__', new)
+
+
+    def main(self):
+
+        self.make_tables()
+        self.generate_targets()
+        self.start_server()
+
+        try:
+
+            self.run()
+
+        finally:
+
+            self.stop_server()
+
+        self.summarize()
+
+        if self.outfile:
+
+            self.export()
+
+        return self.result
+
+
+    def make_tables(self):
+        """
+        Generates the synthetic tables, or if ``input_files`` are
+        provided, reads the identifiers for the queries from them.
+        """
+
+        if self.input_files:
+
+            self.pools, self.table_sizes = _pools_from_tables(
+                self.input_files
+            )
+
+        else:
+
+            self.tables = SyntheticTables(
+                sizes = self.sizes,
+                seed = self.seed,
+            )
+            self.input_files = self.tables.main()
+            self.pools = self.tables.pools
+            self.table_sizes = self.tables.sizes
+
+
+    def generate_targets(self):
+        """
+        Samples the queries to be sent according to their weights.
+        """
+
+        weights = np.array([q[1] for q in self.queries], dtype = float)
+        # queries for tables which are not loaded would fail
+        weights *= [q[2] in self.input_files for q in self.queries]
+        weights /= weights.sum()
+
+        self.targets = []
+
+        for i in self.rng.choice(
+            len(self.queries),
+            self.n_requests,
+            p = weights,
+        ):
+
+            name, _, query_type, args = self.queries[i]
+            args = args(self.rng, self.pools)
+
+            self.targets.append((
+                name,
+                '%s?%s' % (query_type, urllib.parse.urlencode(args)),
+            ))
+
+
+    @staticmethod
+    def _free_port():
+
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+
+            s.bind(('127.0.0.1', 0))
+
+            return s.getsockname()[1]
+
+
+    @property
+    def url(self):
+
+        return 'http://127.0.0.1:%u/' % self.port
+
+
+    def start_server(self):
+
+        self._log('Starting server on port %u.' % self.port)
+
+        ctx = multiprocessing.get_context('spawn')
+        self.server_process = ctx.Process(
+            target = _serve,
+            args = (self.port, self.input_files),
+            daemon = True,
+        )
+        t0 = time.time()
+        self.server_process.start()
+
+        while True:
+
+            try:
+
+                urllib.request.urlopen('%sabout' % self.url).read()
+                break
+
+            except (urllib.error.URLError, ConnectionError):
+
+                if not self.server_process.is_alive():
+
+                    raise RuntimeError('The server process has terminated.')
+
+                if time.time() - t0 > self.startup_timeout:
+
+                    self.stop_server()
+                    raise RuntimeError('Timeout while starting the server.')
+
+                time.sleep(.2)
+
+        self.startup_time = time.time() - t0
+        self.startup_memory = _proc_memory(self.server_process.pid, 'VmRSS')
+        self._log('Server ready in %.02f seconds.' % self.startup_time)
+
+
+    def stop_server(self):
+
+        if getattr(self, 'server_process', None) is not None:
+
+            self.server_process.terminate()
+            self.server_process.join()
+            self.server_process = None
+
+
+    def request(self, target):
+
+        name, path = target
+        req = urllib.request.Request('%s%s' % (self.url, path))
+
+        if self.accept_encoding:
+
+            req.add_header('Accept-Encoding', self.accept_encoding)
+
+        t0 = time.perf_counter()
+
+        try:
+
+            con = urllib.request.urlopen(req)
+            content = con.read()
+            size = len(content)
+            error = (
+                con.getcode() != 200 or
+                content.startswith(b'Something is not')
+            )
+
+        except (urllib.error.URLError, ConnectionError):
+
+            size = 0
+            error = True
+
+        return name, time.perf_counter() - t0, size, error
+
+
+    def run(self):
+
+        self._log(
+            'Sending %u requests at concurrency %u.' % (
+                len(self.targets),
+                self.concurrency,
+            )
+        )
+
+        t0 = time.perf_counter()
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers = self.concurrency
+        ) as executor:
+
+            self.records = list(executor.map(self.request, self.targets))
+
+        self.elapsed = time.perf_counter() - t0
+        self.peak_memory = _proc_memory(self.server_process.pid, 'VmHWM')
+
+        self._log('Finished in %.02f seconds.' % self.elapsed)
+
+
+    @staticmethod
+    def _latency_stats(latencies):
+
+        latencies = np.array(latencies) * 1000
+
+        return {
+            'n': len(latencies),
+            'mean_ms': float(latencies.mean()),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'max_ms': float(latencies.max()),
+        }
+
+
+    def summarize(self):
+
+        by_query = collections.defaultdict(list)
+
+        for name, latency, size, error in self.records:
+
+            by_query[name].append(latency)
+
+        self.result = {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'pypath_version': __version__,
+            'sizes': self.table_sizes,
+            'concurrency': self.concurrency,
+            'n_requests': len(self.records),
+            'errors': sum(r[3] for r in self.records),
+            'elapsed_s': self.elapsed,
+            'throughput_rps': len(self.records) / self.elapsed,
+            'bytes_received': sum(r[2] for r in self.records),
+            'startup_s': self.startup_time,
+            'memory': {
+                'startup_rss_bytes': self.startup_memory,
+                'peak_rss_bytes': self.peak_memory,
+            },
+            'latency': dict(
+                (name, self._latency_stats(latencies))
+                for name, latencies in iteritems(by_query)
+            ),
+        }
+        self.result['latency']['all'] = self._latency_stats(
+            [r[1] for r in self.records]
+        )
+
+
+    def export(self, outfile = None):
+
+        outfile = outfile or self.outfile
+
+        with open(outfile, 'w') as fp:
+
+            json.dump(self.result, fp, indent = 2)
+
+        self._log('Benchmark results written to `%s`.' % outfile)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+#  This file is part of the `pypath` python module
+#  Request level timing and resource metrics for the web service.
+#
+#  Copyright
+#  2014-2020
+#  EMBL, EMBL-EBI, Uniklinik RWTH Aachen, Heidelberg University
+#
+#  File author(s): Dénes Türei (turei.denes@gmail.com)
+#                  Nicolàs Palacio
+#                  Olga Ivanova
+#
+#  Distributed under the GPLv3 License.
+#  See accompanying file LICENSE.txt or copy at
+#      http://www.gnu.org/licenses/gpl-3.0.html
+#
+#  Website: http://pypath.omnipathdb.org/
+#
+
+from future.utils import iteritems
+
+import time
+import bisect
+import collections
+import contextlib
+
+
+# upper bounds of the histogram buckets in seconds
+DURATION_BUCKETS = (
+    .001, .0025, .005, .01, .025, .05, .1,
+    .25, .5, 1., 2.5, 5., 10., 30., 60.,
+)
+
+PREFIX = 'pypath_server'
+
+
+class Histogram(object):
+    """
+    Cumulative histogram in the sense of Prometheus: counts of observations
+    less than or equal to each bucket bound, their sum and total count.
+    """
+
+    def __init__(self, buckets = DURATION_BUCKETS):
+
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.
+        self.count = 0
+
+
+    def observe(self, value):
+
+        i = bisect.bisect_left(self.buckets, value)
+
+        if i < len(self.counts):
+
+            self.counts[i] += 1
+
+        self.sum += value
+        self.count += 1
+
+
+    def cumulative(self):
+
+        total = 0
+
+        for bound, count in zip(self.buckets, self.counts):
+
+            total += count
+
+            yield bound, total
+
+        yield float('inf'), self.count
+
+
+class RequestMetrics(object):
+    """
+    Collects the stage timings and counts of a single request.
+    """
+
+    def __init__(self, query_type):
+
+        self.query_type = query_type
+        self.t0 = time.perf_counter()
+        self.stages = collections.OrderedDict()
+        self.rows_scanned = 0
+        self.rows_returned = 0
+        self.bytes_written = 0
+        self.encoding = None
+        self.error = False
+        self.duration = None
+
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Measures the time spent within the context, the durations of
+        stages entered more than once are summed up.
+        """
+
+        t0 = time.perf_counter()
+
+        try:
+
+            yield
+
+        finally:
+
+            self.stages[name] = (
+                self.stages.get(name, 0.) +
+                time.perf_counter() - t0
+            )
+
+
+    def finish(self):
+
+        self.duration = time.perf_counter() - self.t0
+
+
+    def record(self):
+        """
+        Returns the metrics of this request as a dict, e.g. for
+        structured logging.
+        """
+
+        return {
+            'query_type': self.query_type,
+            'duration': self.duration,
+            'stages': dict(self.stages),
+            'rows_scanned': self.rows_scanned,
+            'rows_returned': self.rows_returned,
+            'bytes_written': self.bytes_written,
+            'encoding': self.encoding,
+            'error': self.error,
+        }
+
+
+class Metrics(object):
+    """
+    Aggregates the metrics of requests by query type and serves them in
+    the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+
+        self.requests = collections.Counter()
+        self.errors = collections.Counter()
+        self.rows_scanned = collections.Counter()
+        self.rows_returned = collections.Counter()
+        self.bytes_written = collections.Counter()
+        self.durations = collections.defaultdict(Histogram)
+        self.stage_durations = collections.defaultdict(Histogram)
+        self.started = time.time()
+
+
+    def add(self, req_metrics):
+
+        query_type = req_metrics.query_type
+        self.requests[query_type] += 1
+        self.errors[query_type] += req_metrics.error
+        self.rows_scanned[query_type] += req_metrics.rows_scanned
+        self.rows_returned[query_type] += req_metrics.rows_returned
+        self.bytes_written[query_type] += req_metrics.bytes_written
+
+        if req_metrics.duration is not None:
+
+            self.durations[query_type].observe(req_metrics.duration)
+
+        for stage, duration in iteritems(req_metrics.stages):
+
+            self.stage_durations[(query_type, stage)].observe(duration)
+
+
+    @staticmethod
+    def _labels(**labels):
+
+        return '{%s}' % ','.join(
+            '%s="%s"' % (k, v)
+            for k, v in sorted(iteritems(labels))
+        )
+
+
+    def _counter(self, name, help_text, counter):
+
+        name = '%s_%s' % (PREFIX, name)
+
+        yield '# HELP %s %s' % (name, help_text)
+        yield '# TYPE %s counter' % name
+
+        for query_type, value in sorted(iteritems(counter)):
+
+            yield '%s%s %s' % (
+                name,
+                self._labels(query = query_type),
+                value,
+            )
+
+
+    def _histogram(self, name, help_text, histograms, label_names):
+
+        name = '%s_%s' % (PREFIX, name)
+
+        yield '# HELP %s %s' % (name, help_text)
+        yield '# TYPE %s histogram' % name
+
+        for key, hist in sorted(iteritems(histograms)):
+
+            key = key if isinstance(key, tuple) else (key,)
+            labels = dict(zip(label_names, key))
+
+            for bound, count in hist.cumulative():
+
+                yield '%s_bucket%s %u' % (
+                    name,
+                    self._labels(
+                        le = '+Inf' if bound == float('inf') else bound,
+                        **labels
+                    ),
+                    count,
+                )
+
+            yield '%s_sum%s %s' % (name, self._labels(**labels), hist.sum)
+            yield '%s_count%s %u' % (
+                name,
+                self._labels(**labels),
+                hist.count,
+            )
+
+
+    def prometheus(self):
+        """
+        Returns all metrics as a string in the Prometheus text format.
+        """
+
+        lines = []
+
+        for name, help_text, counter in (
+            ('requests_total', 'Number of requests.', self.requests),
+            (
+                'errors_total',
+                'Number of requests failed with an error.',
+                self.errors,
+            ),
+            (
+                'rows_scanned_total',
+                'Number of table rows processed by the filters.',
+                self.rows_scanned,
+            ),
+            (
+                'rows_returned_total',
+                'Number of table rows served.',
+                self.rows_returned,
+            ),
+            (
+                'bytes_written_total',
+                'Number of bytes written in responses.',
+                self.bytes_written,
+            ),
+        ):
+
+            lines.extend(self._counter(name, help_text, counter))
+
+        lines.extend(self._histogram(
+            'request_duration_seconds',
+            'Time to serve requests.',
+            self.durations,
+            ('query',),
+        ))
+        lines.extend(self._histogram(
+            'stage_duration_seconds',
+            'Time spent in the stages of serving requests.',
+            self.stage_durations,
+            ('query', 'stage'),
+        ))
+        lines.append(
+            '# HELP %s_start_time_seconds Start time of the server.' % PREFIX
+        )
+        lines.append('# TYPE %s_start_time_seconds gauge' % PREFIX)
+        lines.append('%s_start_time_seconds %s' % (PREFIX, self.started))
+
+        return '%s\n' % '\n'.join(lines)
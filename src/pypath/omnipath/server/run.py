@@ -28,6 +28,9 @@ import copy
 import collections
 import itertools
 import hashlib
+import functools
+import contextlib
+import time
 
 from pypath.share import session as session_mod
 
@@ -41,14 +44,28 @@ try:
 except:
     _log('No module `twisted` available. Necessary to run HTTP server.', -1)
 
+try:
+    import zstandard
+except:
+    zstandard = None
+    _log('Module `zstandard` not available, zstd encoding disabled.')
+
+try:
+    import brotli
+except:
+    brotli = None
+    _log('Module `brotli` not available, br encoding disabled.')
+
 import urllib
 import json
+import zlib
 
 import pandas as pd
 import numpy as np
 
 import pypath.resources as resources
 from pypath.omnipath.server import generate_about_page
+from pypath.omnipath.server import metrics as metrics_mod
 import pypath.omnipath.server._html as _html
 import pypath.resources.urls as urls
 import pypath.resources as resources_mod
@@ -70,6 +87,78 @@ def stop_server():
     reactor.removeAll()
 
 
+def _timed(stage, req_arg = 1):
+    """
+    Decorator measuring the time spent in a method as a stage of serving
+    a request. ``req_arg`` is the position of the request among the
+    positional arguments, including ``self`` or ``cls``.
+    """
+
+    def decorator(method):
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+
+            with BaseServer._stage(args[req_arg], stage):
+
+                return method(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class _BrotliEncoder(object):
+    """
+    Wraps the ``brotli`` compressor into the interface of ``zlib``
+    compression objects.
+    """
+
+    def __init__(self, level):
+
+        self._compressor = brotli.Compressor(quality = level)
+
+
+    def compress(self, data):
+
+        return self._compressor.process(data)
+
+
+    def flush(self):
+
+        return self._compressor.finish()
+
+
+# for each content encoding: maximum level and a
+# function creating a streaming encoder
+ENCODERS = collections.OrderedDict(
+    (encoding, (max_level, factory))
+    for encoding, max_level, factory, available in (
+        (
+            'zstd',
+            22,
+            lambda level: (
+                zstandard.ZstdCompressor(level = level).compressobj()
+            ),
+            zstandard is not None,
+        ),
+        (
+            'br',
+            11,
+            _BrotliEncoder,
+            brotli is not None,
+        ),
+        (
+            'gzip',
+            9,
+            lambda level: zlib.compressobj(level, zlib.DEFLATED, 31),
+            True,
+        ),
+    )
+    if available
+)
+
+
 class BaseServer(twisted.web.resource.Resource, session_mod.Logger):
 
 
@@ -90,6 +179,15 @@ class BaseServer(twisted.web.resource.Resource, session_mod.Logger):
         ) % __version__
 
         self.isLeaf = True
+        self._compression = settings.get('server_compression')
+        self._compression_level = settings.get('server_compression_level')
+        self._compression_min_size = settings.get(
+            'server_compression_min_size'
+        )
+        self._precompress = settings.get('server_precompress')
+        self._precompressed = {}
+        self._metrics = metrics_mod.Metrics()
+        self._open_access_log()
         self._read_license_secret()
         self._res_ctrl = resources_mod.get_controller()
 
@@ -102,6 +200,9 @@ class BaseServer(twisted.web.resource.Resource, session_mod.Logger):
         response = []
 
         request.postpath = [i.decode('utf-8') for i in request.postpath if i]
+        request._metrics = metrics_mod.RequestMetrics(
+            self._metrics_query_type(request)
+        )
 
         self._log(
             'Processing request: `%s` from `%s`; headers: [%s].' % (
@@ -116,7 +217,35 @@ class BaseServer(twisted.web.resource.Resource, session_mod.Logger):
             request.postpath[0] in self.htmls or
             request.postpath[0] == 'error_page.html'
         )
+        precompressable = self._precompressable(request)
         self._set_defaults(request, html = html)
+        encoding = self._content_encoding(request)
+
+        precompress_key = (
+            self._precompress_key(request, encoding)
+                if precompressable and encoding else
+            None
+        )
+
+        if precompress_key:
+
+            if precompress_key in self._precompressed:
+
+                self._log(
+                    'Serving precompressed response for `%s`.' %
+                    request.uri.decode('utf-8')
+                )
+                request.setHeader('Content-Encoding', encoding)
+                request.setHeader('Vary', 'Accept-Encoding')
+                self._count(request, 'bytes_written', len(
+                    self._precompressed[precompress_key]
+                ))
+                request._metrics.encoding = encoding
+                request.write(self._precompressed[precompress_key])
+                self._finish_metrics(request)
+                request.finish()
+
+                return twisted.web.server.NOT_DONE_YET
 
         if (
             request.postpath and
@@ -155,6 +284,8 @@ class BaseServer(twisted.web.resource.Resource, session_mod.Logger):
                         request.uri.decode('utf-8')
                     )
                     self._log_traceback()
+                    request._metrics.error = True
+                    self._finish_metrics(request)
                     raise
 
         elif not request.postpath:
@@ -190,10 +321,17 @@ class BaseServer(twisted.web.resource.Resource, session_mod.Logger):
                 ).encode('utf-8')
             ]
 
-        request.write(response[0])
+        with self._stage(request, 'write'):
+
+            self._write(request, response[0], encoding, precompress_key)
+
+        self._finish_metrics(request)
 
         self._log(
-            'Finished serving request: `%s`.' % request.uri.decode('utf-8')
+            'Finished serving request: `%s` in %.03f s.' % (
+                request.uri.decode('utf-8'),
+                request._metrics.duration,
+            )
         )
 
         request.finish()
@@ -226,6 +364,253 @@ class BaseServer(twisted.web.resource.Resource, session_mod.Logger):
         return self.render_GET(request)
 
 
+    def _content_encoding(self, request):
+        """
+        Selects the content encoding from the ``Accept-Encoding`` header
+        of the request. Among the encodings with the highest quality value
+        ``zstd`` is preferred over ``br`` and ``br`` over ``gzip``.
+        Returns None if the response should be sent uncompressed.
+        """
+
+        if not self._compression:
+
+            return None
+
+        accept = request.getHeader(b'accept-encoding') or b''
+        accept = (
+            accept.decode('ascii', errors = 'ignore')
+                if hasattr(accept, 'decode') else
+            accept
+        )
+        accepted = {}
+
+        for item in accept.lower().split(','):
+
+            item = item.strip().split(';')
+            encoding = item[0].strip()
+            q = 1.0
+
+            for param in item[1:]:
+
+                param = param.strip()
+
+                if param.startswith('q='):
+
+                    try:
+
+                        q = float(param[2:])
+
+                    except ValueError:
+
+                        q = 0.0
+
+            if encoding:
+
+                accepted[encoding] = q
+
+        candidates = [
+            (accepted.get(encoding, accepted.get('*', 0.0)), -i, encoding)
+            for i, encoding in enumerate(ENCODERS.keys())
+        ]
+        candidates = [c for c in candidates if c[0] > 0]
+
+        return max(candidates)[2] if candidates else None
+
+
+    def _precompressable(self, request):
+        """
+        Tells if the request is a download of an entire table, i.e. it has
+        no other argument than the format, header, genesymbols and license.
+        The compressed responses to these requests are kept in memory.
+        """
+
+        return (
+            self._precompress and
+            len(request.postpath) == 1 and
+            request.postpath[0] in getattr(self, 'data_query_types', ()) and
+            not set(request.args.keys()) - {
+                b'format',
+                b'header',
+                b'genesymbols',
+                b'license',
+            }
+        )
+
+
+    def _precompress_key(self, request, encoding):
+        """
+        A canonical key of a full table download, built from the
+        normalized values of the arguments, or ``None`` if any argument
+        is unknown or has a value not listed in ``args_reference``, i.e.
+        the request would be answered by an error. This way the number
+        of precompressed responses is limited by the number of valid
+        argument combinations, whatever the clients send.
+        """
+
+        query_type = self._query_type(request.postpath[0])
+        reference = getattr(self, 'args_reference', {}).get(query_type, {})
+
+        for arg, val in iteritems(request.args):
+
+            if not val:
+
+                continue
+
+            arg = arg.decode('utf-8')
+
+            if (
+                arg not in reference or
+                self._unknown_values(reference, arg, val)
+            ):
+
+                return None
+
+        license = (
+            request.args[b'license'][0].decode('utf-8')
+                if b'license' in request.args else
+            None
+        )
+
+        return (
+            encoding,
+            query_type,
+            request.args[b'format'][0] == b'json',
+            self._parse_arg(request.args[b'header']),
+            (
+                b'genesymbols' in request.args and
+                self._parse_arg(request.args[b'genesymbols'])
+            ),
+            license,
+        )
+
+
+    def _write(self, request, response, encoding, precompress_key = None):
+        """
+        Writes the response, compressing it in blocks with a streaming
+        encoder if an encoding is provided and the response is larger than
+        the minimum size for compression.
+        """
+
+        if not encoding or len(response) < self._compression_min_size:
+
+            self._count(request, 'bytes_written', len(response))
+            request.write(response)
+
+            return
+
+        max_level, factory = ENCODERS[encoding]
+        encoder = factory(min(self._compression_level, max_level))
+        request.setHeader('Content-Encoding', encoding)
+        request.setHeader('Vary', 'Accept-Encoding')
+        request._metrics.encoding = encoding
+        compressed = [] if precompress_key else None
+        block_size = 1 << 20
+
+        for start in range(0, len(response), block_size):
+
+            block = encoder.compress(response[start:start + block_size])
+
+            if block:
+
+                self._count(request, 'bytes_written', len(block))
+                request.write(block)
+
+                if compressed is not None:
+
+                    compressed.append(block)
+
+        block = encoder.flush()
+        self._count(request, 'bytes_written', len(block))
+        request.write(block)
+
+        if compressed is not None:
+
+            compressed.append(block)
+            self._precompressed[precompress_key] = b''.join(compressed)
+
+
+    @staticmethod
+    def _stage(req, name):
+        """
+        Context measuring the time of a stage of serving the request.
+        """
+
+        return (
+            req._metrics.stage(name)
+                if hasattr(req, '_metrics') else
+            contextlib.nullcontext()
+        )
+
+
+    @staticmethod
+    def _count(req, key, n):
+        """
+        Adds ``n`` to the counter ``key`` of the request metrics.
+        """
+
+        if hasattr(req, '_metrics'):
+
+            setattr(req._metrics, key, getattr(req._metrics, key) + n)
+
+
+    def _metrics_query_type(self, request):
+        """
+        The label of the request in the metrics: the query type for the
+        known query types, otherwise ``root`` or ``other``.
+        """
+
+        if not request.postpath:
+
+            return 'root'
+
+        query_type = request.postpath[0]
+
+        if hasattr(self, '_query_type'):
+
+            query_type = self._query_type(query_type)
+
+        return (
+            query_type
+                if query_type in getattr(self, 'query_types', ()) else
+            'other'
+        )
+
+
+    def _open_access_log(self):
+
+        path = settings.get('server_access_log')
+        self._access_log = open(path, 'a', buffering = 1) if path else None
+
+
+    def _finish_metrics(self, request):
+        """
+        Adds the metrics of the request to the aggregated metrics and
+        writes a record to the access log.
+        """
+
+        request._metrics.finish()
+        self._metrics.add(request._metrics)
+
+        if self._access_log:
+
+            record = request._metrics.record()
+            record['time'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+            record['uri'] = request.uri.decode('utf-8')
+            record['client'] = str(request.getClientAddress())
+            record['code'] = getattr(request, 'code', None)
+            self._access_log.write('%s\n' % json.dumps(record))
+
+
+    def metrics(self, req):
+        """
+        Serves the aggregated request metrics in Prometheus text format.
+        """
+
+        req.setHeader('Content-Type', 'text/plain; version=0.0.4')
+
+        return self._metrics.prometheus()
+
+
     def _set_defaults(self, request, html=False):
 
         for k, v in iteritems(request.args):
@@ -467,6 +852,7 @@ class TableServer(BaseServer):
         'queries',
         'annotations_summary',
         'intercell_summary',
+        'metrics',
     }
     data_query_types = {
         'annotations',
@@ -475,6 +861,9 @@ class TableServer(BaseServer):
         'enzsub',
         'complexes',
     }
+    # the smallest number of rows processed at once
+    # when serving queries with limit
+    query_block_size = 10000
     list_fields = {
         'sources',
         'references',
@@ -518,6 +907,7 @@ class TableServer(BaseServer):
             },
             'password': None,
             'limit': None,
+            'after': None,
             'datasets': {
                 'omnipath',
                 'tfregulons',
@@ -620,6 +1010,7 @@ class TableServer(BaseServer):
             },
             'password': None,
             'limit': None,
+            'after': None,
             'enzymes':     None,
             'substrates':  None,
             'partners':    None,
@@ -671,6 +1062,7 @@ class TableServer(BaseServer):
             },
             'password': None,
             'limit': None,
+            'after': None,
             'databases': None,
             'resources': None,
             'proteins': None,
@@ -718,6 +1110,7 @@ class TableServer(BaseServer):
             },
             'password': None,
             'limit': None,
+            'after': None,
             'scope': {
                 'specific',
                 'generic',
@@ -826,6 +1219,7 @@ class TableServer(BaseServer):
             },
             'password': None,
             'limit': None,
+            'after': None,
             'databases': None,
             'resources': None,
             'proteins': None,
@@ -1324,10 +1718,11 @@ class TableServer(BaseServer):
         self._log('Preprocessing intercell data.')
         tbl = self.data['intercell']
         tbl.drop('full_name', axis = 1, inplace = True, errors = 'ignore')
-        self.data['intercell_summary'] = tbl.groupby(
-            ['category', 'parent', 'database'],
-            as_index = False,
-        ).agg({})
+        self.data['intercell_summary'] = tbl.loc[
+            :, ['category', 'parent', 'database']
+        ].drop_duplicates().sort_values(
+            ['category', 'parent', 'database']
+        ).reset_index(drop = True)
 
 
     def _update_resources(self):
@@ -1430,6 +1825,7 @@ class TableServer(BaseServer):
         self._log('Finished updating resource information.')
 
 
+    @_timed('check_args')
     def _check_args(self, req):
 
         result = []
@@ -1446,17 +1842,7 @@ class TableServer(BaseServer):
 
             if arg in ref:
 
-                if not ref[arg] or not val:
-
-                    continue
-
-                val = (
-                    {val[0]}
-                    if type(val[0]) is int else
-                    set(val[0].decode('utf-8').split(','))
-                )
-
-                unknowns = val - set(ref[arg])
+                unknowns = self._unknown_values(ref, arg, val)
 
                 if unknowns:
 
@@ -1487,6 +1873,26 @@ class TableServer(BaseServer):
             )
 
 
+    @staticmethod
+    def _unknown_values(ref, arg, val):
+        """
+        The values of the argument ``arg`` not listed in the reference
+        ``ref``. Arguments without a list of values accept anything.
+        """
+
+        if not ref[arg] or not val:
+
+            return set()
+
+        val = (
+            {val[0]}
+            if type(val[0]) is int else
+            set(val[0].decode('utf-8').split(','))
+        )
+
+        return val - set(ref[arg])
+
+
     def _query_type(self, query_type):
 
         return (
@@ -1747,56 +2153,11 @@ class TableServer(BaseServer):
         else:
             genesymbols = False
 
-        # starting from the entire dataset
-        tbl = self.data['interactions']
-
-        # filter by type
-        if args['types']:
-
-            tbl = tbl[tbl.type.isin(args['types'])]
-
         # if partners provided those will overwrite
         # sources and targets
         args['sources'] = args['sources'] or args['partners']
         args['targets'] = args['targets'] or args['partners']
 
-        # then we filter by source and target
-        # which matched against both standard names
-        # and gene symbols
-        if args['sources'] and args['targets'] and source_target == 'OR':
-
-            tbl = tbl[
-                tbl.target.isin(args['targets']) |
-                tbl.target_genesymbol.isin(args['targets']) |
-                tbl.source.isin(args['sources']) |
-                tbl.source_genesymbol.isin(args['sources'])
-            ]
-
-        else:
-
-            if args['sources']:
-                tbl = tbl[
-                    tbl.source.isin(args['sources']) |
-                    tbl.source_genesymbol.isin(args['sources'])
-                ]
-
-            if args['targets']:
-                tbl = tbl[
-                    tbl.target.isin(args['targets']) |
-                    tbl.target_genesymbol.isin(args['targets'])
-                ]
-
-        # filter by datasets
-        if args['datasets']:
-
-            tbl = tbl.query(' or '.join(args['datasets']))
-
-        # filter by organism
-        tbl = tbl[
-            tbl.ncbi_tax_id_source.isin(args['organisms']) |
-            tbl.ncbi_tax_id_target.isin(args['organisms'])
-        ]
-
         dorothea_included = (
             'dorothea' in args['datasets'] or
             any(res.endswith('DoRothEA') for res in args['resources']) or
@@ -1806,64 +2167,19 @@ class TableServer(BaseServer):
             )
         )
 
-        # filter by DoRothEA confidence levels
-        if dorothea_included and args['dorothea_levels']:
+        entity_types = self._args_set(req, 'entity_types')
 
-            tbl = tbl[
-                self._dorothea_dataset_filter(tbl, args) |
-                [
-                    bool(levels & args['dorothea_levels'])
-                    for levels in tbl.set_dorothea_level
-                ]
-            ]
-
-        # filter by databases
-        if args['resources']:
-
-            tbl = tbl[
-                [
-                    bool(sources & args['resources'])
-                    for sources in tbl.set_sources
-                ]
-            ]
-
-         # filtering for entity types
-        if b'entity_types' in req.args:
-
-            entity_types = self._args_set(req, 'entity_types')
-
-            tbl = tbl[
-                tbl.entity_type_source.isin(entity_types) |
-                tbl.entity_type_target.isin(entity_types)
-            ]
-
-        # filtering by DoRothEA methods
-        if dorothea_included and args['dorothea_methods']:
-
-            q = ['dorothea_%s' % m for m in args['dorothea_methods']]
-
-            tbl = tbl[
-                self._dorothea_dataset_filter(tbl, args) |
-                tbl[q].any(1)
-            ]
-
-        # filter directed & signed
-        if (
+        directed = (
             b'directed' not in req.args or
             self._parse_arg(req.args[b'directed'])
-        ):
-
-            tbl = tbl[tbl.is_directed == 1]
-
-        if (
+        )
+        signed = (
             b'signed' in req.args and
             self._parse_arg(req.args[b'signed'])
-        ):
+        )
 
-            tbl = tbl[np.logical_or(
-                tbl.is_stimulation == 1,
-                tbl.is_inhibition == 1
-            )]
+        # starting from the entire dataset
+        tbl = self.data['interactions']
 
         if req.args[b'fields']:
 
@@ -1901,9 +2217,115 @@ class TableServer(BaseServer):
 
                     hdr.append(f)
 
-        license = self._get_license(req)
 
-        tbl = self._filter_by_license_interactions(tbl, license)
+        def query(tbl):
+
+            # filter by type
+            if args['types']:
+
+                tbl = tbl[tbl.type.isin(args['types'])]
+
+            # then we filter by source and target
+            # which matched against both standard names
+            # and gene symbols
+            if (
+                args['sources'] and
+                args['targets'] and
+                source_target == 'OR'
+            ):
+
+                tbl = tbl[
+                    tbl.target.isin(args['targets']) |
+                    tbl.target_genesymbol.isin(args['targets']) |
+                    tbl.source.isin(args['sources']) |
+                    tbl.source_genesymbol.isin(args['sources'])
+                ]
+
+            else:
+
+                if args['sources']:
+                    tbl = tbl[
+                        tbl.source.isin(args['sources']) |
+                        tbl.source_genesymbol.isin(args['sources'])
+                    ]
+
+                if args['targets']:
+                    tbl = tbl[
+                        tbl.target.isin(args['targets']) |
+                        tbl.target_genesymbol.isin(args['targets'])
+                    ]
+
+            # filter by datasets
+            if args['datasets']:
+
+                tbl = tbl.query(' or '.join(args['datasets']))
+
+            # filter by organism
+            tbl = tbl[
+                tbl.ncbi_tax_id_source.isin(args['organisms']) |
+                tbl.ncbi_tax_id_target.isin(args['organisms'])
+            ]
+
+            # filter by DoRothEA confidence levels
+            if dorothea_included and args['dorothea_levels']:
+
+                tbl = tbl[
+                    self._dorothea_dataset_filter(tbl, args) |
+                    np.array([
+                        bool(levels & args['dorothea_levels'])
+                        for levels in tbl.set_dorothea_level
+                    ], dtype = bool)
+                ]
+
+            # filter by databases
+            if args['resources']:
+
+                tbl = tbl[
+                    [
+                        bool(sources & args['resources'])
+                        for sources in tbl.set_sources
+                    ]
+                ]
+
+            # filtering for entity types
+            if entity_types:
+
+                tbl = tbl[
+                    tbl.entity_type_source.isin(entity_types) |
+                    tbl.entity_type_target.isin(entity_types)
+                ]
+
+            # filtering by DoRothEA methods
+            if dorothea_included and args['dorothea_methods']:
+
+                q = ['dorothea_%s' % m for m in args['dorothea_methods']]
+
+                tbl = tbl[
+                    self._dorothea_dataset_filter(tbl, args) |
+                    tbl[q].any(axis = 1)
+                ]
+
+            # filter directed & signed
+            if directed:
+
+                tbl = tbl[tbl.is_directed == 1]
+
+            if signed:
+
+                tbl = tbl[np.logical_or(
+                    tbl.is_stimulation == 1,
+                    tbl.is_inhibition == 1
+                )]
+
+            return tbl
+
+
+        tbl = self._execute_query(
+            tbl,
+            query,
+            req,
+            self._filter_by_license_interactions,
+        )
 
         tbl = tbl.loc[:,hdr]
 
@@ -2007,60 +2429,13 @@ class TableServer(BaseServer):
         else:
             genesymbols = False
 
-        # starting from the entire dataset
-        tbl = self.data['enzsub']
-
-        # filter by type
-        if args['types']:
-            tbl = tbl[tbl.modification.isin(args['types'])]
-
         # if partners provided those will overwrite
         # enzymes and substrates
         args['enzymes'] = args['enzymes'] or args['partners']
         args['substrates'] = args['substrates'] or args['partners']
 
-        # then we filter by enzyme and substrate
-        # which matched against both standard names
-        # and gene symbols
-        if (
-            args['enzymes'] and
-            args['substrates'] and
-            enzyme_substrate == 'OR'
-        ):
-
-            tbl = tbl[
-                tbl.substrate.isin(args['substrates']) |
-                tbl.substrate_genesymbol.isin(args['substrates']) |
-                tbl.enzyme.isin(args['enzymes']) |
-                tbl.enzyme_genesymbol.isin(args['enzymes'])
-            ]
-
-        else:
-
-            if args['enzymes']:
-                tbl = tbl[
-                    tbl.enzyme.isin(args['enzymes']) |
-                    tbl.enzyme_genesymbol.isin(args['enzymes'])
-                ]
-
-            if args['substrates']:
-                tbl = tbl[
-                    tbl.substrate.isin(args['substrates']) |
-                    tbl.substrate_genesymbol.isin(args['substrates'])
-                ]
-
-        # filter by organism
-        tbl = tbl[tbl.ncbi_tax_id.isin(args['organisms'])]
-
-        # filter by databases
-        if args['resources']:
-
-            tbl = tbl[
-                [
-                    bool(args['resources'] & sources)
-                    for sources in tbl.set_sources
-                ]
-            ]
+        # starting from the entire dataset
+        tbl = self.data['enzsub']
 
         if req.args[b'fields']:
 
@@ -2084,9 +2459,65 @@ class TableServer(BaseServer):
 
                     hdr.append(f)
 
-        license = self._get_license(req)
 
-        tbl = self._filter_by_license_interactions(tbl, license)
+        def query(tbl):
+
+            # filter by type
+            if args['types']:
+                tbl = tbl[tbl.modification.isin(args['types'])]
+
+            # then we filter by enzyme and substrate
+            # which matched against both standard names
+            # and gene symbols
+            if (
+                args['enzymes'] and
+                args['substrates'] and
+                enzyme_substrate == 'OR'
+            ):
+
+                tbl = tbl[
+                    tbl.substrate.isin(args['substrates']) |
+                    tbl.substrate_genesymbol.isin(args['substrates']) |
+                    tbl.enzyme.isin(args['enzymes']) |
+                    tbl.enzyme_genesymbol.isin(args['enzymes'])
+                ]
+
+            else:
+
+                if args['enzymes']:
+                    tbl = tbl[
+                        tbl.enzyme.isin(args['enzymes']) |
+                        tbl.enzyme_genesymbol.isin(args['enzymes'])
+                    ]
+
+                if args['substrates']:
+                    tbl = tbl[
+                        tbl.substrate.isin(args['substrates']) |
+                        tbl.substrate_genesymbol.isin(args['substrates'])
+                    ]
+
+            # filter by organism
+            tbl = tbl[tbl.ncbi_tax_id.isin(args['organisms'])]
+
+            # filter by databases
+            if args['resources']:
+
+                tbl = tbl[
+                    [
+                        bool(args['resources'] & sources)
+                        for sources in tbl.set_sources
+                    ]
+                ]
+
+            return tbl
+
+
+        tbl = self._execute_query(
+            tbl,
+            query,
+            req,
+            self._filter_by_license_interactions,
+        )
 
         tbl = tbl.loc[:,hdr]
 
@@ -2125,29 +2556,9 @@ class TableServer(BaseServer):
 
         hdr = tbl.columns
 
-        # filtering for resources
-        if b'resources' in req.args:
-
-            resources = self._args_set(req, 'resources')
-
-            tbl = tbl[tbl.source.isin(resources)]
-
-        # filtering for entity types
-        if b'entity_types' in req.args:
-
-            entity_types = self._args_set(req, 'entity_types')
-
-            tbl = tbl[tbl.entity_type.isin(entity_types)]
-
-        # filtering for proteins
-        if b'proteins' in req.args:
-
-            proteins = self._args_set(req, 'proteins')
-
-            tbl = tbl[
-                tbl.uniprot.isin(proteins) |
-                tbl.genesymbol.isin(proteins)
-            ]
+        resources = self._args_set(req, 'resources')
+        entity_types = self._args_set(req, 'entity_types')
+        proteins = self._args_set(req, 'proteins')
 
         # provide genesymbols: yes or no
         if (
@@ -2159,9 +2570,36 @@ class TableServer(BaseServer):
         else:
             genesymbols = False
 
-        license = self._get_license(req)
 
-        tbl = self._filter_by_license_annotations(tbl, license)
+        def query(tbl):
+
+            # filtering for resources
+            if resources:
+
+                tbl = tbl[tbl.source.isin(resources)]
+
+            # filtering for entity types
+            if entity_types:
+
+                tbl = tbl[tbl.entity_type.isin(entity_types)]
+
+            # filtering for proteins
+            if proteins:
+
+                tbl = tbl[
+                    tbl.uniprot.isin(proteins) |
+                    tbl.genesymbol.isin(proteins)
+                ]
+
+            return tbl
+
+
+        tbl = self._execute_query(
+            tbl,
+            query,
+            req,
+            self._filter_by_license_annotations,
+        )
 
         tbl = tbl.loc[:,hdr]
 
@@ -2241,6 +2679,8 @@ class TableServer(BaseServer):
         hdr = tbl.columns
 
         # filtering for category types
+        column_filters = []
+
         for var in (
             'aspect',
             'source',
@@ -2259,7 +2699,9 @@ class TableServer(BaseServer):
 
                     var = 'database'
 
-                tbl = tbl[getattr(tbl, var).isin(values)]
+                column_filters.append((var, values))
+
+        bool_filters = []
 
         for (_long, short) in (
             ('transmitter', 'trans'),
@@ -2283,14 +2725,45 @@ class TableServer(BaseServer):
 
             if this_arg is not None:
 
-                tbl = tbl[getattr(tbl, _long) == this_arg]
+                bool_filters.append((_long, this_arg))
+
+        causality = self._args_set(req, 'causality')
+        trans = causality & {'transmitter', 'trans', 'both'}
+        rec = causality & {'receiver', 'rec', 'both'}
+
+        topology = self._args_set(req, 'topology')
+        topology_query = ' or '.join(
+            colname
+            for enabled, colname in
+            (
+                (topology & {'secreted', 'sec'}, 'secreted'),
+                (
+                    topology & {'plasma_membrane_peripheral', 'pmp'},
+                    'plasma_membrane_peripheral'
+                ),
+                (
+                    topology & {'plasma_membrane_transmembrane', 'pmtm'},
+                    'plasma_membrane_transmembrane'
+                )
+            )
+            if enabled
+        )
+
+        categories = self._args_set(req, 'categories')
+        entity_types = self._args_set(req, 'entity_types')
+        proteins = self._args_set(req, 'proteins')
+
 
-        if b'causality' in req.args:
+        def query(tbl):
 
-            causality = self._args_set(req, 'causality')
+            for var, values in column_filters:
+
+                tbl = tbl[getattr(tbl, var).isin(values)]
+
+            for var, value in bool_filters:
+
+                tbl = tbl[getattr(tbl, var) == value]
 
-            trans = causality & {'transmitter', 'trans', 'both'}
-            rec = causality & {'receiver', 'rec', 'both'}
             tbl = (
                 tbl[tbl.transmitter | tbl.receiver]
                     if trans and rec else
@@ -2301,59 +2774,39 @@ class TableServer(BaseServer):
                 tbl
             )
 
-        if b'topology' in req.args:
+            if topology_query:
 
-            topology = self._args_set(req, 'topology')
-            query = ' or '.join(
-                colname
-                for enabled, colname in
-                (
-                    (topology & {'secreted', 'sec'}, 'secreted'),
-                    (
-                        topology & {'plasma_membrane_peripheral', 'pmp'},
-                        'plasma_membrane_peripheral'
-                    ),
-                    (
-                        topology & {'plasma_membrane_transmembrane', 'pmtm'},
-                        'plasma_membrane_transmembrane'
-                    )
-                )
-                if enabled
-            )
+                tbl = tbl.query(topology_query)
 
-            if query:
+            # filtering for categories
+            if categories:
 
-                tbl = tbl.query(query)
+                tbl = tbl[tbl.category.isin(categories)]
 
-        # filtering for categories
-        if b'categories' in req.args:
+            # filtering for entity types
+            if entity_types:
 
-            categories = self._args_set(req, 'categories')
-
-            tbl = tbl[tbl.category.isin(categories)]
+                tbl = tbl[tbl.entity_type.isin(entity_types)]
 
-        # filtering for entity types
-        if b'entity_types' in req.args:
+            # filtering for proteins
+            if proteins:
 
-            entity_types = self._args_set(req, 'entity_types')
-
-            tbl = tbl[tbl.entity_type.isin(entity_types)]
-
-        # filtering for proteins
-        if b'proteins' in req.args:
-
-            proteins = self._args_set(req, 'proteins')
+                tbl = tbl[
+                    np.logical_or(
+                        tbl.uniprot.isin(proteins),
+                        tbl.genesymbol.isin(proteins),
+                    )
+                ]
 
-            tbl = tbl[
-                np.logical_or(
-                    tbl.uniprot.isin(proteins),
-                    tbl.genesymbol.isin(proteins),
-                )
-            ]
+            return tbl
 
-        license = self._get_license(req)
 
-        tbl = self._filter_by_license_intercell(tbl, license)
+        tbl = self._execute_query(
+            tbl,
+            query,
+            req,
+            self._filter_by_license_intercell,
+        )
 
         tbl = tbl.loc[:,hdr]
 
@@ -2425,33 +2878,41 @@ class TableServer(BaseServer):
         hdr.remove('set_sources')
         hdr.remove('set_proteins')
 
-        # filtering for resources
-        if b'resources' in req.args:
+        resources = self._args_set(req, 'resources')
+        proteins = self._args_set(req, 'proteins')
 
-            resources = self._args_set(req, 'resources')
 
-            tbl = tbl[
-                [
-                    bool(sources & resources)
-                    for sources in tbl.set_sources
-                ]
-            ]
+        def query(tbl):
 
-        # filtering for proteins
-        if b'proteins' in req.args:
+            # filtering for resources
+            if resources:
 
-            proteins = self._args_set(req, 'proteins')
+                tbl = tbl[
+                    [
+                        bool(sources & resources)
+                        for sources in tbl.set_sources
+                    ]
+                ]
 
-            tbl = tbl[
-                [
-                    bool(this_proteins & proteins)
-                    for this_proteins in tbl.set_proteins
+            # filtering for proteins
+            if proteins:
+
+                tbl = tbl[
+                    [
+                        bool(this_proteins & proteins)
+                        for this_proteins in tbl.set_proteins
+                    ]
                 ]
-            ]
 
-        license = self._get_license(req)
+            return tbl
 
-        tbl = self._filter_by_license_complexes(tbl, license)
+
+        tbl = self._execute_query(
+            tbl,
+            query,
+            req,
+            self._filter_by_license_complexes,
+        )
 
         tbl = tbl.loc[:,hdr]
 
@@ -2637,7 +3098,110 @@ class TableServer(BaseServer):
         return tbl
 
 
+    def _execute_query(self, tbl, query, req, license_filter = None):
+        """
+        Applies a filter chain and the license filter to a data table,
+        taking into account the ``limit`` and ``after`` arguments of the
+        request.
+
+        Rows are identified by their index label in the table as loaded
+        from the file, these are the keys used for paging: ``after`` is
+        the key of the last row of the previous page. If a ``limit`` is
+        provided, the table is processed in consecutive blocks of rows
+        of increasing size, and the processing stops as soon as enough
+        rows passed the filters. If the result fills the page, the key
+        of its last row is sent in the ``X-Next-After`` header.
+
+        :param pandas.DataFrame tbl:
+            The full data table.
+        :param callable query:
+            A function taking a data frame and returning its filtered
+            subset.
+        :param twisted.web.server.Request req:
+            The request, from which the ``limit``, ``after`` and
+            ``license`` arguments are processed.
+        :param callable license_filter:
+            A function taking a data frame and a license level and
+            returning the records allowed under the license.
+        """
+
+        limit = self._int_arg(req, 'limit')
+        after = self._int_arg(req, 'after')
+        license = self._get_license(req)
+
+
+        def process(tbl):
+
+            self._count(req, 'rows_scanned', tbl.shape[0])
+
+            with self._stage(req, 'filter'):
+
+                tbl = query(tbl)
+
+            if license_filter:
+
+                with self._stage(req, 'license'):
+
+                    tbl = license_filter(tbl, license)
+
+            return tbl
+
+
+        if after is not None:
+
+            tbl = tbl.iloc[tbl.index.searchsorted(after, side = 'right'):]
+
+        if limit is None:
+
+            return process(tbl)
+
+        result = []
+        n_rows = 0
+        start = 0
+        block_size = max(limit * 10, self.query_block_size)
+
+        while start < tbl.shape[0] and n_rows < limit:
+
+            block = process(tbl.iloc[start:start + block_size])
+            result.append(block)
+            n_rows += block.shape[0]
+            start += block_size
+            block_size *= 2
+
+        result = (
+            pd.concat(result).head(limit)
+                if result else
+            process(tbl.iloc[:0])
+        )
+
+        if result.shape[0] == limit and limit:
+
+            req.setHeader('X-Next-After', str(result.index[-1]))
+
+        return result
+
+
+    @staticmethod
+    def _int_arg(req, arg):
+
+        arg = arg.encode('utf-8')
+
+        if arg in req.args and req.args[arg]:
+
+            value = req.args[arg][0]
+            value = (
+                value.decode('utf-8')
+                    if hasattr(value, 'decode') else
+                value
+            )
+
+            if isinstance(value, int) or value.isdigit():
+
+                return int(value)
+
+
     @classmethod
+    @_timed('serialize', req_arg = 2)
     def _serve_dataframe(cls, tbl, req):
 
         if b'limit' in req.args:
@@ -2649,6 +3213,8 @@ class TableServer(BaseServer):
                 limit = int(limit)
                 tbl = tbl.head(limit)
 
+        cls._count(req, 'rows_returned', tbl.shape[0])
+
         if b'format' in req.args and req.args[b'format'][0] == b'json':
 
             data_json = tbl.to_json(orient = 'records')
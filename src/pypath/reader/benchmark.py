@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+#  This file is part of the `pypath` python module
+#  Compares the interpreted and the compiled processing of record fields.
+#
+#  Copyright
+#  2014-2020
+#  EMBL, EMBL-EBI, Uniklinik RWTH Aachen, Heidelberg University
+#
+#  File author(s): Dénes Türei (turei.denes@gmail.com)
+#                  Nicolàs Palacio
+#                  Olga Ivanova
+#
+#  Distributed under the GPLv3 License.
+#  See accompanying file LICENSE.txt or copy at
+#      http://www.gnu.org/licenses/gpl-3.0.html
+#
+#  Website: http://pypath.omnipathdb.org/
+#
+
+from future.utils import iteritems
+
+import time
+import random
+import collections
+
+import pandas as pd
+
+from pypath.share import session as session_mod
+import pypath.reader.field as field
+
+_logger = session_mod.Logger(name = 'reader_benchmark')
+_log = _logger._log
+
+
+EFFECTS = {
+    'activation': 1,
+    'stimulation': 1,
+    'inhibition': -1,
+    'repression': -1,
+    'binding': 0,
+}
+
+RESOURCES = ('SIGNOR', 'SPIKE', 'Reactome', 'KEGG', 'ACSN', 'PhosphoSite')
+
+
+def synthetic_table(n_rows = 1000000, seed = 0):
+    """
+    Creates a table resembling the raw data of network resources: partner
+    identifiers, a multi-valued effect field, directedness flags,
+    references and numeric scores.
+
+    :returns:
+        A list of lists of strings.
+    """
+
+    rnd = random.Random(seed)
+    effects = list(EFFECTS.keys()) + ['unknown']
+    proteins = ['P%05u' % i for i in range(20000)]
+
+    return [
+        [
+            rnd.choice(proteins),
+            rnd.choice(proteins),
+            ';'.join(rnd.sample(effects, rnd.randint(1, 3))),
+            rnd.choice(('1', '0')),
+            '|'.join(
+                str(rnd.randint(1, 30000000))
+                for _ in range(rnd.randint(1, 4))
+            ),
+            rnd.choice(RESOURCES),
+            '%u' % rnd.randint(0, 1000),
+        ]
+        for _ in range(n_rows)
+    ]
+
+
+def default_fields():
+    """
+    Field definitions covering each way of processing in ``Field``: plain
+    values, compact definitions, separators, dict and set mappings,
+    value types and fixed values.
+    """
+
+    return collections.OrderedDict((
+        ('id_a', field.Field(0)),
+        ('id_b', field.Field(compact = 1)),
+        ('effect', field.Field(compact = (2, ';', EFFECTS))),
+        ('directed', field.Field(3, mapping = {'1'})),
+        ('references', field.Field(4, sep = '|', value_type = int)),
+        ('resource', field.Field(5)),
+        ('score', field.Field(6, value_type = int)),
+        ('is_network', field.Field(compact = True)),
+    ))
+
+
+def _timed(func, repeat):
+
+    times = []
+
+    for _ in range(repeat):
+
+        t0 = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - t0)
+
+    return min(times), result
+
+
+def benchmark(
+        n_rows = 1000000,
+        chunk_size = 100000,
+        repeat = 3,
+        fields = None,
+        table = None,
+    ):
+    """
+    Processes a large synthetic table by the interpreted ``Field.process``
+    method, by compiled per record functions, by compiled column
+    functions over chunks of records and over a data frame. Checks that
+    all give the same values.
+
+    :param int n_rows:
+        Number of rows in the synthetic table.
+    :param int chunk_size:
+        Number of records in one chunk for the column wise processing.
+    :param int repeat:
+        Run each method this many times and report the fastest.
+    :param dict fields:
+        Field definitions, by default ``default_fields()``.
+    :param list table:
+        A table to process instead of the synthetic one.
+
+    :returns:
+        A dict of the best run times in seconds.
+    """
+
+    fields = fields or default_fields()
+    table = table or synthetic_table(n_rows = n_rows)
+    df = pd.DataFrame(table)
+    extractor = field.RecordExtractor(fields)
+    flds = list(fields.values())
+
+    def interpreted():
+
+        return [
+            tuple(fld.process(record).value for fld in flds)
+            for record in table
+        ]
+
+    def compiled():
+
+        return [extractor(record) for record in table]
+
+    def chunked():
+
+        result = []
+
+        for chunk in extractor.iter_chunks(table, chunk_size = chunk_size):
+
+            result.extend(zip(*(chunk[name] for name in extractor.names)))
+
+        return result
+
+    def data_frame():
+
+        return list(
+            extractor.data_frame(df).itertuples(index = False, name = None)
+        )
+
+    times = {}
+    results = {}
+
+    for name, method in (
+        ('interpreted', interpreted),
+        ('compiled', compiled),
+        ('chunked', chunked),
+        ('data_frame', data_frame),
+    ):
+
+        times[name], results[name] = _timed(method, repeat)
+
+        _log(
+            'Field extraction benchmark, `%s`: %.03fs for %u rows.' % (
+                name,
+                times[name],
+                len(table),
+            )
+        )
+
+    for name, result in iteritems(results):
+
+        if result != results['interpreted']:
+
+            raise ValueError(
+                'The result of the `%s` method differs from the '
+                'interpreted processing.' % name
+            )
+
+    return times
@@ -45,6 +45,8 @@ urls = {
             '*&format=tab&force=true&columns=id&compress=yes',
         'speclist': 'ftp://ftp.uniprot.org/pub/databases/uniprot/'
             'knowledgebase/docs/speclist.txt',
+        'sprot_dat': 'ftp://ftp.uniprot.org/pub/databases/uniprot/'
+            'current_release/knowledgebase/complete/uniprot_sprot.dat.gz',
     },
     'corum': {
         'label':
@@ -38,6 +38,8 @@ import os
 import io
 import shutil
 import struct
+import time
+import json
 
 import pypath.share.session as session_mod
 _logger = session_mod.get_log()
@@ -125,6 +127,11 @@ CACHEPRINT = False
 DRYRUN = False
 PRESERVE = False
 DEBUG = False
+RECORD = False
+REPLAY = False
+# in DRYRUN mode the requests not served from the cache are collected
+# into this list, if it is a list (see pypath.omnipath.prefetch)
+DRYRUN_REQUESTS = None
 
 LASTCURL = None
 
@@ -488,6 +495,87 @@ class debug_off(_global_context_off):
         super(debug_off, self).__init__('DEBUG')
 
 
+class record_on(_global_context_on):
+    """
+    This is a context handler which results pypath.curl.Curl() to save
+    each request and its response into the fixture store (the
+    ``curl_fixtures_dir`` setting). Data loaded from the cache is
+    recorded as well, without response headers. The recorded responses
+    can be served later by ``replay_on``, without network access.
+
+    Behind the scenes it sets the value of the `pypath.curl.RECORD`
+    module level variable to `True` (by default it is `False`).
+
+    Example: ::
+
+        from pypath.share import curl
+        from pypath.inputs import signor
+
+        with curl.record_on():
+            signor.signor_interactions()
+    """
+
+    def __init__(self):
+        super(record_on, self).__init__('RECORD')
+
+
+class record_off(_global_context_off):
+    """
+    This is a context handler which avoids pypath.curl.Curl() to record
+    the requests and responses. This is the default behaviour, so
+    applying this context restores the default.
+
+    Behind the scenes it sets the value of the `pypath.curl.RECORD`
+    module level variable to `False`.
+    """
+
+    def __init__(self):
+        super(record_off, self).__init__('RECORD')
+
+
+class replay_on(_global_context_on):
+    """
+    This is a context handler which results pypath.curl.Curl() to serve
+    the responses from the fixture store instead of the network. The
+    latency and the bandwidth of the replayed downloads can be set by the
+    ``curl_replay_latency`` and ``curl_replay_bandwidth`` settings, hence
+    the download, cache and parsing performance can be measured offline
+    and deterministically. Requests missing from the store fail as if
+    the server responded with HTTP 404. The cache is used as usual,
+    to replay all downloads use it together with ``cache_off``.
+
+    Behind the scenes it sets the value of the `pypath.curl.REPLAY`
+    module level variable to `True` (by default it is `False`).
+
+    Example: ::
+
+        from pypath.share import curl, settings
+        from pypath.inputs import signor
+
+        settings.setup(curl_replay_bandwidth = 1e6)
+
+        with curl.replay_on(), curl.cache_off():
+            signor.signor_interactions()
+    """
+
+    def __init__(self):
+        super(replay_on, self).__init__('REPLAY')
+
+
+class replay_off(_global_context_off):
+    """
+    This is a context handler which results pypath.curl.Curl() to
+    download from the network. This is the default behaviour, so
+    applying this context restores the default.
+
+    Behind the scenes it sets the value of the `pypath.curl.REPLAY`
+    module level variable to `False`.
+    """
+
+    def __init__(self):
+        super(replay_off, self).__init__('REPLAY')
+
+
 class RemoteFile(object):
     def __init__(self,
                  filename,
@@ -830,6 +918,9 @@ class Curl(FileOpener):
             empty_attempt_again = True,
         ):
 
+        # the arguments to repeat the request later
+        request_args = dict(locals()) if DRYRUN else None
+
         if not hasattr(self, '_logger'):
 
             session_mod.Logger.__init__(self, name = 'curl')
@@ -915,7 +1006,11 @@ class Curl(FileOpener):
 
             self.delete_cache_file()
 
-        if not self.use_cache and not DRYRUN:
+        if not self.use_cache and not DRYRUN and REPLAY:
+
+            self.replay()
+
+        elif not self.use_cache and not DRYRUN:
 
             self.title = None
             self.set_title()
@@ -929,6 +1024,10 @@ class Curl(FileOpener):
                 if call:
                     self.curl_call()
 
+        elif not self.use_cache and DRYRUN:
+
+            self.register_request(request_args)
+
         elif not self.silent:
 
             if self.local_file:
@@ -942,6 +1041,9 @@ class Curl(FileOpener):
                     'previously downloaded from `%s`' % self.domain
                 )
 
+        if RECORD and not REPLAY and not self.download_failed and not DRYRUN:
+            self.record()
+
         if process and not self.download_failed and not DRYRUN:
             self.process_file()
 
@@ -1532,6 +1634,178 @@ class Curl(FileOpener):
 
             self.use_cache = True
 
+    def register_request(self, request_args):
+        """
+        In DRYRUN mode adds the arguments of this request to the
+        ``DRYRUN_REQUESTS`` list, so the download can be carried out later.
+        Requests which would not be saved into the cache are omitted.
+        """
+
+        if (
+            isinstance(DRYRUN_REQUESTS, list) and
+            self.cache and
+            self.write_cache and
+            self.sftp_host is None
+        ):
+
+            request_args = dict(
+                (key, val)
+                for key, val in iteritems(request_args)
+                if key != 'self'
+            )
+            DRYRUN_REQUESTS.append((self.cache_file_name, request_args))
+
+            self._log(
+                'DRYRUN: request registered, cache file: `%s`.' % (
+                    self.cache_file_name
+                )
+            )
+
+    # recording and replaying:
+
+    def fixture_key(self):
+        """
+        Identifies the request in the fixture store by the URL (including
+        the GET parameters), the POST parameters and the binary data.
+        """
+
+        post = (
+            '&'.join(sorted(
+                '%s=%s' % (k, v)
+                for k, v in iteritems(self.post)
+            ))
+                if isinstance(self.post, dict) else
+            ''
+        )
+
+        return hashlib.md5(
+            self.unicode2bytes('%s\t%s\t%s' % (
+                self.url,
+                post,
+                str(self.binary_data) if self.binary_data else '',
+            ))
+        ).hexdigest()
+
+
+    def fixture_paths(self):
+        """
+        Paths of the recorded response body and the file with the
+        request and the response headers.
+        """
+
+        fixtures_dir = settings.get('curl_fixtures_dir')
+        body = os.path.join(fixtures_dir, self.fixture_key())
+
+        return body, '%s.json' % body
+
+
+    def record(self):
+        """
+        Saves the request and the response into the fixture store.
+        """
+
+        if self.local_file or not os.path.exists(self.cache_file_name):
+
+            return
+
+        body, meta = self.fixture_paths()
+        os.makedirs(os.path.dirname(body), exist_ok = True)
+        shutil.copyfile(self.cache_file_name, body)
+        resp_headers = getattr(self, 'resp_headers', None) or []
+
+        with open(meta, 'w') as fp:
+
+            json.dump(
+                {
+                    'url': self.url,
+                    'post': self.post,
+                    'binary_data': (
+                        str(self.binary_data) if self.binary_data else None
+                    ),
+                    'req_headers': self.req_headers,
+                    'resp_headers': [
+                        self._bytes_to_unicode(h) for h in resp_headers
+                    ],
+                    'status': self.status or 200,
+                    'from_cache': self.use_cache,
+                },
+                fp,
+                indent = 2,
+            )
+
+        self._log(
+            'Recorded the response for `%s` into `%s`.' % (
+                self.url[:200],
+                body,
+            )
+        )
+
+
+    def replay(self):
+        """
+        Serves the response from the fixture store, simulating the
+        latency and bandwidth given by the ``curl_replay_latency`` and
+        ``curl_replay_bandwidth`` settings.
+        """
+
+        body, meta = self.fixture_paths()
+
+        if not os.path.exists(meta) or not os.path.exists(body):
+
+            self.status = 404
+            self.download_failed = True
+            self._log(
+                'No recorded response for `%s` in the fixture store.' % (
+                    self.url[:200]
+                )
+            )
+            return
+
+        with open(meta, 'r') as fp:
+
+            meta = json.load(fp)
+
+        latency = settings.get('curl_replay_latency') or 0
+        bandwidth = settings.get('curl_replay_bandwidth')
+        chunk_size = settings.get('curl_replay_chunk_size')
+
+        self._log(
+            'Replaying the response for `%s` from `%s` (latency: %.03fs, '
+            'bandwidth: %s).' % (
+                self.url[:200],
+                body,
+                latency,
+                '%u B/s' % bandwidth if bandwidth else 'unlimited',
+            )
+        )
+
+        time.sleep(latency)
+        start = time.perf_counter()
+        transferred = 0
+
+        with open(body, 'rb') as src, open(self.cache_file_name, 'wb') as dst:
+
+            for chunk in iter(lambda: src.read(chunk_size), b''):
+
+                dst.write(chunk)
+                transferred += len(chunk)
+
+                if bandwidth:
+
+                    # sleeping until the time this amount of data
+                    # takes to transfer at the given bandwidth
+                    wait = transferred / bandwidth - (
+                        time.perf_counter() - start
+                    )
+
+                    if wait > 0:
+
+                        time.sleep(wait)
+
+        self.resp_headers = [h.encode('utf-8') for h in meta['resp_headers']]
+        self.status = meta['status']
+
+
     def show_cache(self):
 
         self.print_debug_info('INFO', 'URL = %s' % self.url)
@@ -84,6 +84,16 @@ _defaults = {
     'secrets_dir': None,
     'license_secret': 'license_secret',
     'server_default_license': 'academic',
+    # compress the responses of the server if the client accepts it
+    'server_compression': True,
+    # compression level, for each encoding truncated to its maximum
+    'server_compression_level': 6,
+    # responses smaller than this (bytes) are sent uncompressed
+    'server_compression_min_size': 1024,
+    # keep the compressed responses to full table downloads in memory
+    'server_precompress': True,
+    # write JSON records of requests with their metrics into this file
+    'server_access_log': None,
     'pubmed_cache': 'pubmed.pickle',
     'mapping_use_cache': True,
     'use_intermediate_cache': True,
@@ -100,15 +110,28 @@ _defaults = {
         'lncrna': 'lncrna-genesymbol',
     },
     'uniprot_uploadlists_chunk_size': 10000,
+    # retrieve all UniProt fields used by the annotation resources
+    # by one query
+    'uniprot_annot_fields_together': True,
     'trip_preprocessed': 'trip_preprocessed.pickle',
     'deathdomain': 'deathdomain.tsv',
     'hpmr_preprocessed': 'hpmr_preprocessed.pickle',
+    # cache parsed OBO ontologies, keyed by the checksum of the source file
+    'obo_cache': True,
+    'obo_cache_dir': 'obo',
     'network_expand_complexes': False,
     'network_allow_loops': False,
     'network_keep_original_names': True,
     'network_pickle_cache': True,
+    # read simple delimited network files by pandas and process them
+    # column by column
+    'network_columnar_reader': True,
     'go_pickle_cache': True,
     'go_pickle_cache_fname': 'goa__%u.pickle',
+    # keep the GO annotations in a memory mapped file shared by all
+    # processes, instead of loading them into each process
+    'go_store': True,
+    'go_store_fname': 'goa__%u.gostore',
     'network_extra_directions': {
         'Wang',
         'KEGG',
@@ -194,6 +217,38 @@ _defaults = {
         'annotations': ('complex',),
     },
 
+    # number of processes for building the datasets in parallel
+    'build_workers': 1,
+    # memory budget for parallel builds (GB), None means no limit
+    'build_max_memory': None,
+    # number of processes for loading the enzyme-substrate resources
+    'enz_sub_workers': 1,
+    # store the enzyme-substrate records in integer coded arrays
+    'enz_sub_columnar': False,
+    # number of processes for loading the complex resources
+    'complex_workers': 1,
+    # number of processes for parsing multiple BioPAX files of an archive
+    'biopax_workers': 1,
+    # number of processes for parsing large MITAB files
+    'mitab_workers': 1,
+    # download the data of the datasets before building them
+    'build_prefetch': False,
+    # number of concurrent downloads when prefetching
+    'prefetch_workers': 8,
+    # approximate peak memory usage of building each dataset (GB)
+    'build_memory': {
+        'omnipath': 16,
+        'curated': 6,
+        'complex': 2,
+        'annotations': 14,
+        'intercell': 10,
+        'tf_target': 8,
+        'tf_mirna': 2,
+        'mirna_mrna': 3,
+        'lncrna_mrna': 1,
+        'enz_sub': 8,
+    },
+
     'omnipath_pickle': 'network_omnipath.pickle',
     'curated_pickle': 'network_curated.pickle',
     'complex_pickle': 'complexes.pickle',
@@ -227,8 +282,19 @@ _defaults = {
     # the first fails to respond
     'uniprot_datasheet_connect_timeout': 10,
     'uniprot_datasheet_timeout': 20,
+    # retrieve UniProt datasheets from the local store, if it has been
+    # built by `pypath.utils.uniprot_store.build`
+    'uniprot_datasheet_store': True,
+    'uniprot_datasheet_store_dir': 'uniprot_datasheets',
     'genecards_datasheet_connect_timeout': 10,
     'genecards_datasheet_timeout': 20,
+    # recorded requests and responses served by `curl.replay_on`
+    'curl_fixtures_dir': 'curl_fixtures',
+    # simulated latency (s) and bandwidth (bytes/s) of the replayed
+    # downloads, None for unlimited bandwidth
+    'curl_replay_latency': 0,
+    'curl_replay_bandwidth': None,
+    'curl_replay_chunk_size': 65536,
 
 }
 
@@ -258,6 +324,9 @@ in_cachedir = {
     'pubmed_cache',
     'trip_preprocessed',
     'hpmr_preprocessed',
+    'obo_cache_dir',
+    'uniprot_datasheet_store_dir',
+    'curl_fixtures_dir',
 }
 
 
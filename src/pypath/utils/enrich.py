@@ -0,0 +1,522 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+#  This file is part of the `pypath` python module
+#  Over-representation analysis of sets of proteins against Gene Ontology
+#  and other annotations.
+#
+#  Copyright
+#  2014-2020
+#  EMBL, EMBL-EBI, Uniklinik RWTH Aachen, Heidelberg University
+#
+#  File author(s): Dénes Türei (turei.denes@gmail.com)
+#                  Nicolàs Palacio
+#                  Olga Ivanova
+#
+#  Distributed under the GPLv3 License.
+#  See accompanying file LICENSE.txt or copy at
+#      http://www.gnu.org/licenses/gpl-3.0.html
+#
+#  Website: http://pypath.omnipathdb.org/
+#
+
+import collections
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+import scipy.special
+
+import pypath.share.common as common
+import pypath.share.session as session_mod
+
+_logger = session_mod.Logger(name = 'enrich')
+_log = _logger._log
+
+
+CORRECTIONS = {
+    'bonferroni',
+    'holm',
+    'fdr_bh',
+    'fdr_by',
+}
+
+COLUMNS = [
+    'query',
+    'term',
+    'name',
+    'set_count',
+    'set_size',
+    'pop_count',
+    'pop_size',
+    'fold_enrichment',
+    'pvalue',
+    'padj',
+]
+
+
+def correct(pvalues, method = 'fdr_bh', n_tests = None):
+    """
+    Adjusts p-values for multiple testing.
+
+    :arg numpy.ndarray pvalues:
+        Array of p-values.
+    :arg str method:
+        One of `bonferroni`, `holm`, `fdr_bh` (Benjamini-Hochberg) and
+        `fdr_by` (Benjamini-Yekutieli).
+    :arg int n_tests:
+        The total number of tests, if larger than the number of p-values
+        the rest of the tests are assumed to have p-value 1. This way the
+        tests which can not be significant don't need to be evaluated.
+    """
+
+    if method not in CORRECTIONS:
+
+        raise ValueError(
+            'Unknown multiple testing correction method: `%s`. '
+            'Available methods: %s.' % (method, ', '.join(sorted(CORRECTIONS)))
+        )
+
+    pvalues = np.asarray(pvalues, dtype = np.float64)
+    n_tests = max(n_tests or 0, len(pvalues))
+
+    if not len(pvalues):
+
+        return pvalues.copy()
+
+    if method == 'bonferroni':
+
+        return np.minimum(pvalues * n_tests, 1.)
+
+    order = np.argsort(pvalues, kind = 'stable')
+    ranked = pvalues[order]
+    rank = np.arange(1, len(ranked) + 1)
+
+    if method == 'holm':
+
+        adjusted = np.maximum.accumulate((n_tests - rank + 1) * ranked)
+
+    else:
+
+        adjusted = ranked * n_tests / rank
+
+        if method == 'fdr_by':
+
+            adjusted *= np.sum(1. / np.arange(1, n_tests + 1))
+
+        adjusted = np.minimum.accumulate(adjusted[::-1])[::-1]
+
+    result = np.empty_like(adjusted)
+    result[order] = np.minimum(adjusted, 1.)
+
+    return result
+
+
+def _log_binom(n, k):
+
+    return (
+        scipy.special.gammaln(n + 1) -
+        scipy.special.gammaln(k + 1) -
+        scipy.special.gammaln(n - k + 1)
+    )
+
+
+def hypergeom_sf(set_count, pop_size, pop_count, set_size):
+    """
+    Probability of drawing at least ``set_count`` annotated elements in a
+    sample of ``set_size`` from a population of ``pop_size`` with
+    ``pop_count`` annotated elements, i.e. the p-value of the one sided
+    hypergeometric test. Same as ``scipy.stats.hypergeom.sf`` at
+    ``set_count - 1`` but much faster on large arrays: the probability
+    mass function is evaluated once at ``set_count`` and the tail is
+    summed by the recurrence between consecutive terms, summing always
+    the tail on the side decreasing from ``set_count``.
+
+    All arguments are arrays of the same shape or scalars.
+    """
+
+    k, pop_size, pop_count, set_size = (
+        np.broadcast_arrays(
+            *(
+                np.asarray(a, dtype = np.float64)
+                for a in (set_count, pop_size, pop_count, set_size)
+            )
+        )
+    )
+    lo = np.maximum(0, set_size - (pop_size - pop_count))
+    hi = np.minimum(pop_count, set_size)
+    mode = np.floor((set_size + 1) * (pop_count + 1) / (pop_size + 2))
+    # sum the upper tail from `k` if `k` is above the mode,
+    # otherwise the lower tail from `k - 1` and take the complement
+    upper = k > mode
+    start = np.where(upper, k, k - 1)
+    inside = (start >= lo) & (start <= hi)
+
+    total = np.zeros(k.shape)
+    idx = np.flatnonzero(inside)
+    i = start[idx]
+    up = upper[idx]
+    K = pop_count[idx]
+    n = set_size[idx]
+    N = pop_size[idx]
+    end = np.where(up, hi[idx], lo[idx])
+    term = np.exp(
+        _log_binom(K, i) +
+        _log_binom(N - K, n - i) -
+        _log_binom(N, n)
+    )
+    _total = term.copy()
+
+    while len(idx):
+
+        # elements still summing their tails
+        going = (i != end) & (term > _total * 1e-16)
+        total[idx[~going]] = _total[~going]
+        idx, i, up, K, n, N, end, term, _total = (
+            a[going] for a in (idx, i, up, K, n, N, end, term, _total)
+        )
+
+        term *= np.where(
+            up,
+            (K - i) * (n - i) / np.maximum((i + 1) * (N - K - n + i + 1), 1),
+            i * (N - K - n + i) / np.maximum((K - i + 1) * (n - i + 1), 1),
+        )
+        i += np.where(up, 1, -1)
+        _total += term
+
+    return np.clip(np.where(upper, total, 1. - total), 0., 1.)
+
+
+class Enrichment(session_mod.Logger):
+
+
+    def __init__(
+            self,
+            matrix,
+            entities,
+            terms,
+            names = None,
+            label = None,
+        ):
+        """
+        Over-representation analysis against any annotation which can be
+        represented as a boolean entity by term matrix. Tests all terms at
+        once by one sided hypergeometric test (equivalent to the one sided
+        Fisher's exact test), and many query sets at once in batch mode.
+
+        :arg scipy.sparse.spmatrix,numpy.ndarray matrix:
+            Boolean matrix with entities (e.g. UniProt IDs) in rows and
+            annotation terms in columns.
+        :arg list entities:
+            The entities along the rows.
+        :arg list terms:
+            The terms along the columns.
+        :arg dict names:
+            Human readable names of the terms.
+        :arg str label:
+            A label for this annotation, used in the log.
+
+        See also the ``from_go`` and ``from_annotation_table`` methods to
+        create an instance from the annotation databases of pypath.
+        """
+
+        session_mod.Logger.__init__(self, name = 'enrich')
+
+        self.label = label or 'annotation'
+        self.matrix = scipy.sparse.csr_matrix(matrix, dtype = bool)
+        self.matrix.sort_indices()
+        self.entities = np.array(list(entities), dtype = object)
+        self.terms = np.array(list(terms), dtype = object)
+        self.names = names or {}
+        self._term_names = np.array(
+            [self.names.get(term, term) for term in self.terms],
+            dtype = object,
+        )
+        self._entity_id = dict(
+            (entity, i)
+            for i, entity in enumerate(self.entities)
+        )
+
+        self._log(
+            'Enrichment analysis against %s: %u entities, %u terms.' % (
+                self.label,
+                self.matrix.shape[0],
+                self.matrix.shape[1],
+            )
+        )
+
+
+    @classmethod
+    def from_go(cls, go_annot = None, aspects = None, propagate = True):
+        """
+        Creates an enrichment engine for Gene Ontology.
+
+        :arg pypath.utils.go.GOAnnotation go_annot:
+            A Gene Ontology annotation object, by default the one provided
+            by ``pypath.utils.go.get_db``.
+        :arg str,tuple aspects:
+            Use only these GO aspects (`C`, `F` and `P`), by default all.
+        :arg bool propagate:
+            Propagate the annotations over the GO hierarchy i.e. proteins
+            annotated with a term are considered annotated also with all of
+            its ancestors.
+        """
+
+        if go_annot is None:
+
+            import pypath.utils.go as go
+            go_annot = go.get_db()
+
+        aspects = common.to_set(aspects) or set(go_annot.aspects)
+        matrices = go_annot._full if propagate else go_annot._direct
+
+        return cls(
+            matrix = sum(
+                matrices[asp]
+                for asp in go_annot.aspects
+                if asp in aspects
+            ),
+            entities = go_annot._uniprots,
+            terms = go_annot._terms,
+            names = go_annot.ontology.name,
+            label = 'Gene Ontology (%s)' % ', '.join(sorted(aspects)),
+        )
+
+
+    @classmethod
+    def from_annotation_table(cls, table):
+        """
+        Creates an enrichment engine from the boolean array of an
+        annotation table, the annotation categories are the terms. The
+        terms are the resource names and field values joined by double
+        underscores, as in the columns of ``AnnotationTable.to_data_frame``.
+
+        :arg pypath.core.annot.AnnotationTable table:
+            An annotation table object.
+        """
+
+        table.ensure_array()
+
+        # if all names have the same length ``table.names`` is a 2D array
+        names = [
+            tuple(str(n) for n in name)
+            for name in table.names
+        ]
+        terms = ['__'.join(name) for name in names]
+
+        return cls(
+            matrix = table.data,
+            entities = table.reference_set,
+            terms = terms,
+            names = {
+                term: ': '.join(name)
+                for term, name in zip(terms, names)
+            },
+            label = 'annotation table',
+        )
+
+
+    def _entity_vector(self, entities):
+        """
+        Boolean vector along the entities of the matrix, true for the
+        elements of ``entities``.
+        """
+
+        vector = np.zeros(len(self.entities), dtype = bool)
+        vector[[
+            self._entity_id[entity]
+            for entity in entities
+            if entity in self._entity_id
+        ]] = True
+
+        return vector
+
+
+    def _query_matrix(self, queries, background):
+        """
+        Sparse boolean matrix with the query sets in rows and the entities
+        in columns, restricted to the background.
+        """
+
+        rows = []
+        cols = []
+
+        for i, query in enumerate(queries):
+
+            ids = [
+                self._entity_id[entity]
+                for entity in query
+                if entity in self._entity_id
+            ]
+            rows.extend([i] * len(ids))
+            cols.extend(ids)
+
+        rows = np.array(rows, dtype = np.int64)
+        cols = np.array(cols, dtype = np.int64)
+        keep = background[cols]
+
+        return scipy.sparse.csr_matrix(
+            (
+                np.ones(keep.sum(), dtype = bool),
+                (rows[keep], cols[keep]),
+            ),
+            shape = (len(queries), len(self.entities)),
+        )
+
+
+    def batch(
+            self,
+            queries,
+            background = None,
+            min_size = 1,
+            max_size = None,
+            correction = 'fdr_bh',
+            alpha = None,
+        ):
+        """
+        Tests the over-representation of all terms in many sets at once.
+        The statistics are evaluated only for the terms present in the
+        query sets, the rest are counted as tests with p-value 1 in the
+        multiple testing correction.
+
+        :arg dict queries:
+            Query sets of entities by their labels. Alternatively a list of
+            sets, in this case the labels will be their indices.
+        :arg set background:
+            The population to test against, by default all entities having
+            any annotation. Entities without annotation are always excluded
+            from both the population and the query sets.
+        :arg int min_size:
+            Test only the terms with at least this many entities in the
+            population.
+        :arg int max_size:
+            Test only the terms with at most this many entities in the
+            population.
+        :arg str correction:
+            Method of multiple testing correction, see ``correct``.
+        :arg float alpha:
+            Return only results with adjusted p-value below this threshold.
+
+        :returns:
+            A data frame with one row for each query and term with at least
+            one entity of the query annotated, sorted by query and p-value.
+        """
+
+        if not isinstance(queries, dict):
+
+            queries = collections.OrderedDict(enumerate(queries))
+
+        labels = list(queries.keys())
+
+        background = (
+            self._entity_vector(background)
+                if background is not None else
+            np.ones(len(self.entities), dtype = bool)
+        )
+        # only annotated entities count
+        background &= np.diff(self.matrix.indptr) > 0
+
+        pop_size = int(background.sum())
+        pop_count = np.asarray(
+            self.matrix[background].sum(axis = 0)
+        ).ravel()
+        tested = (pop_count >= max(min_size, 1)) & (
+            pop_count <= (max_size or pop_size)
+        )
+        n_tests = int(tested.sum())
+
+        query = self._query_matrix(list(queries.values()), background)
+        set_size = np.asarray(query.sum(axis = 1)).ravel()
+
+        # query by term counts: one sparse product for all queries
+        counts = (
+            query.astype(np.int32) @
+            self.matrix.astype(np.int32)[:, tested]
+        ).tocoo()
+        term_idx = np.flatnonzero(tested)[counts.col]
+        set_count = counts.data.astype(np.int64)
+        query_idx = counts.row
+
+        _pop_count = pop_count[term_idx]
+        _set_size = set_size[query_idx]
+
+        # many tests share the same counts and sizes:
+        # evaluate the statistics only once for each
+        # (all are at most `pop_size`, encoded into one integer)
+        base = np.int64(pop_size + 1)
+        key, inverse = np.unique(
+            (set_count * base + _pop_count) * base + _set_size,
+            return_inverse = True,
+        )
+        pvalue = hypergeom_sf(
+            key // base // base,
+            pop_size,
+            key // base % base,
+            key % base,
+        )[inverse]
+
+        padj = np.empty_like(pvalue)
+        order = np.argsort(query_idx, kind = 'stable')
+        bounds = np.searchsorted(
+            query_idx[order],
+            np.arange(len(labels) + 1),
+        )
+
+        for i in range(len(labels)):
+
+            idx = order[bounds[i]:bounds[i + 1]]
+            padj[idx] = correct(pvalue[idx], correction, n_tests)
+
+        result = pd.DataFrame(
+            collections.OrderedDict((
+                ('query', np.array(labels, dtype = object)[query_idx]),
+                ('term', self.terms[term_idx]),
+                ('name', self._term_names[term_idx]),
+                ('set_count', set_count),
+                ('set_size', _set_size),
+                ('pop_count', _pop_count),
+                ('pop_size', pop_size),
+                (
+                    'fold_enrichment',
+                    (set_count / np.maximum(_set_size, 1)) /
+                    (_pop_count / max(pop_size, 1)),
+                ),
+                ('pvalue', pvalue),
+                ('padj', padj),
+            )),
+            columns = COLUMNS,
+        )
+
+        result['_order'] = query_idx
+        result = result.sort_values(['_order', 'pvalue', 'term'])
+        result = result.drop(columns = '_order')
+
+        if alpha is not None:
+
+            result = result[result.padj <= alpha]
+
+        result = result.reset_index(drop = True)
+
+        return result
+
+
+    def test(self, foreground, background = None, **kwargs):
+        """
+        Tests the over-representation of all terms in one set. Accepts the
+        same arguments as ``batch``.
+
+        :arg set foreground:
+            The query set of entities.
+
+        :returns:
+            A data frame sorted by p-value.
+        """
+
+        return (
+            self.batch(
+                queries = {None: foreground},
+                background = background,
+                **kwargs
+            ).drop(columns = 'query')
+        )
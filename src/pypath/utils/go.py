@@ -27,8 +27,10 @@ import os
 import sys
 import importlib as imp
 import re
+import collections.abc
 from collections import Counter, OrderedDict
 import numpy as np
+import scipy.sparse
 import itertools
 
 try:
@@ -43,6 +45,7 @@ import pypath.share.common as common
 from pypath.share.common import *
 import pypath.share.session as session_mod
 import pypath.share.settings as settings
+import pypath.utils.go_store as go_store
 
 # this is for GO terms parsing:
 _reexprterm = re.compile(r'and|or|not|\(|\)|GO:[0-9]{7}')
@@ -75,13 +78,19 @@ class GeneOntology(session_mod.Logger):
             aspect = None,
             term = None,
             name = None,
+            store = None,
         ):
         """
         Loads data about Gene Ontology terms and their relations.
+        
+        :param pypath.utils.go_store.GOStore store:
+            Work on the read only lookup tables and closure matrices of a
+            memory mapped store, instead of loading the ontology.
         """
         
         session_mod.Logger.__init__(self, name = 'go')
         
+        self._store = store
         self._terms_provided = terms
         self._ancestors_provided = ancestors
         self._descendants_provided = descendants
@@ -104,6 +113,11 @@ class GeneOntology(session_mod.Logger):
     
     def _load(self):
         
+        if self._store is not None:
+            
+            self._load_store()
+            return
+        
         self._log('Populating Gene Ontology: ontology.')
         
         self._load_terms()
@@ -111,12 +125,37 @@ class GeneOntology(session_mod.Logger):
         self._set_aspect()
         self._set_name()
         self._set_term()
+        self._index_terms()
         
         # delattr(self, '_terms')
         
         self._log('Gene Ontology: ontology populated.')
     
     
+    def _load_store(self):
+        
+        self._log(
+            'Gene Ontology: ontology from store `%s`.' % self._store.path
+        )
+        
+        # the terms by aspects are available only if the ontology is loaded
+        self._terms = None
+        self.ancestors = self._store.graph('ancestors')
+        self.descendants = self._store.graph('descendants')
+        self.aspect = self._store.term_aspects
+        self.name = self._store.names
+        self.term = self._store.name_terms
+        self._term_list = self._store.terms
+        self._term_id = self._store.term_id
+        self._closure = dict(
+            (
+                (direction, self._store.closure_relations),
+                self._store.matrix('closure_%s' % direction),
+            )
+            for direction in ('ancestors', 'descendants')
+        )
+    
+    
     def _load_terms(self):
         
         self._terms = self._terms_provided or dataio.go_terms_quickgo()
@@ -177,6 +216,174 @@ class GeneOntology(session_mod.Logger):
         )
     
     
+    def _index_terms(self):
+        """
+        Assigns an integer id to each GO term, these are the row and column
+        indices of the transitive closure matrices.
+        """
+        
+        terms = set(self.name.keys())
+        
+        for graph in (self.ancestors, self.descendants):
+            
+            for term, related in iteritems(graph):
+                
+                terms.add(term)
+                terms.update(rel[0] for rel in related)
+        
+        # lookups into `defaultdict`s might have added `None`
+        terms.discard(None)
+        self._term_list = np.array(sorted(terms), dtype = object)
+        self._term_id = dict(
+            (term, i)
+            for i, term in enumerate(self._term_list)
+        )
+        self._closure = {}
+    
+    
+    def term_ids(self, terms):
+        """
+        Returns the integer ids of GO terms as an array, terms not in the
+        ontology are omitted.
+        """
+        
+        if isinstance(terms, common.basestring):
+            
+            terms = (terms,)
+        
+        return np.array(
+            [self._term_id[term] for term in terms if term in self._term_id],
+            dtype = np.int64,
+        )
+    
+    
+    def closure(self, direction = 'ancestors', relations = None):
+        """
+        Returns the transitive closure of the ontology graph as a sparse
+        boolean matrix with term ids as rows and columns. The row of a term
+        marks all its ancestors or descendants, not including the term
+        itself. Compiled at the first call for each direction and set of
+        relations, later calls return the same matrix.
+        
+        :param str direction:
+            Possible values: `ancestors` or `descendants`.
+        :param set relations:
+            The relations to follow, by default all relations.
+        """
+        
+        relations = frozenset(relations or self.all_relations)
+        key = (direction, relations)
+        
+        if key not in self._closure:
+            
+            self._log(
+                'Compiling the transitive closure of the ontology: '
+                '%s by relations %s.' % (
+                    direction,
+                    ', '.join(sorted(relations)),
+                )
+            )
+            
+            self._closure[key] = self._compile_closure(direction, relations)
+        
+        return self._closure[key]
+    
+    
+    def _compile_closure(self, direction, relations):
+        
+        n_terms = len(self._term_list)
+        graph = getattr(self, direction)
+        adjacent = [()] * n_terms
+        
+        for term, related in iteritems(graph):
+            
+            if term not in self._term_id:
+                
+                continue
+            
+            adjacent[self._term_id[term]] = tuple({
+                self._term_id[rel_term]
+                for rel_term, relation in related
+                if relation in relations
+            })
+        
+        # memoized depth first search without recursion;
+        # states: 0: not visited, 1: in progress, 2: done
+        reach = [None] * n_terms
+        state = np.zeros(n_terms, dtype = np.int8)
+        
+        for root in xrange(n_terms):
+            
+            if state[root]:
+                
+                continue
+            
+            stack = [root]
+            
+            while stack:
+                
+                node = stack[-1]
+                
+                if state[node] == 0:
+                    
+                    state[node] = 1
+                    stack.extend(
+                        adj for adj in adjacent[node] if state[adj] == 0
+                    )
+                
+                else:
+                    
+                    stack.pop()
+                    
+                    if state[node] == 1:
+                        
+                        nodes = set(adjacent[node])
+                        
+                        for adj in adjacent[node]:
+                            
+                            # `None` only if we are in a cycle
+                            if reach[adj]:
+                                
+                                nodes.update(reach[adj])
+                        
+                        reach[node] = nodes
+                        state[node] = 2
+        
+        indptr = np.zeros(n_terms + 1, dtype = np.int64)
+        indptr[1:] = np.cumsum([len(nodes) for nodes in reach])
+        indices = np.fromiter(
+            itertools.chain.from_iterable(sorted(nodes) for nodes in reach),
+            dtype = np.int32,
+            count = indptr[-1],
+        )
+        
+        return scipy.sparse.csr_matrix(
+            (np.ones(len(indices), dtype = bool), indices, indptr),
+            shape = (n_terms, n_terms),
+        )
+    
+    
+    @staticmethod
+    def _union_rows(matrix, rows):
+        """
+        Column indices of the nonzero elements in any of the rows of a
+        CSR matrix.
+        """
+        
+        if len(rows) == 1:
+            
+            row = rows[0]
+            
+            return matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+        
+        return np.unique(
+            np.concatenate([
+                matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+                for row in rows
+            ])
+        ) if len(rows) else np.array([], dtype = np.int32)
+    
+    
     def is_term(self, term):
         """
         Tells if ``term`` is a GO accession number.
@@ -301,6 +508,8 @@ class GeneOntology(session_mod.Logger):
         """
         Returns a set of all nodes either in the subgraph of ancestors 
         or descendants of a single term or a set of terms.
+        The nodes are looked up in the transitive closure of the ontology
+        (see ``closure``).
         
         :param str direction:
             Possible values: `ancestors` or `descendants`.
@@ -308,29 +517,16 @@ class GeneOntology(session_mod.Logger):
             Include ``terms`` in the subgraph or only the related nodes.
         """
         
-        relations = relations or self.all_relations
-        
         if isinstance(terms, common.basestring):
             
             terms = {terms}
         
-        graph = getattr(self, direction)
         subgraph = set(terms) if include_seed else set()
-        
-        for term in terms:
-            
-            for related, relation in graph[term]:
-                
-                if relation not in relations:
-                    
-                    continue
-                
-                if related not in subgraph:
-                    
-                    subgraph.update(
-                        self.subgraph_nodes(direction, related, relations)
-                    )
-                    subgraph.add(related)
+        related = self._union_rows(
+            self.closure(direction, relations),
+            self.term_ids(terms),
+        )
+        subgraph.update(self._term_list[related])
         
         return subgraph
     
@@ -515,6 +711,68 @@ class GeneOntology(session_mod.Logger):
         }
 
 
+class AnnotationRows(collections.abc.Mapping):
+    """
+    Read only, dict like access to a sparse boolean protein by term
+    annotation matrix. Keys are the UniProt IDs with at least one
+    annotation, values are sets of GO terms.
+    """
+    
+    def __init__(self, matrix, uniprots, uniprot_id, terms):
+        
+        self.matrix = matrix.tocsr()
+        self._uniprots = uniprots
+        self._uniprot_id = uniprot_id
+        self._terms = terms
+        self._present = np.diff(self.matrix.indptr) > 0
+    
+    
+    def _row(self, uniprot):
+        
+        if uniprot in self._uniprot_id:
+            
+            i = self._uniprot_id[uniprot]
+            
+            if self._present[i]:
+                
+                return i
+    
+    
+    def __getitem__(self, uniprot):
+        
+        i = self._row(uniprot)
+        
+        if i is None:
+            
+            raise KeyError(uniprot)
+        
+        return set(
+            self._terms[
+                self.matrix.indices[
+                    self.matrix.indptr[i]:self.matrix.indptr[i + 1]
+                ]
+            ]
+        )
+    
+    
+    def __contains__(self, uniprot):
+        
+        return self._row(uniprot) is not None
+    
+    
+    def __iter__(self):
+        
+        return (
+            self._uniprots[i]
+            for i in np.flatnonzero(self._present)
+        )
+    
+    
+    def __len__(self):
+        
+        return int(self._present.sum())
+
+
 class GOAnnotation(session_mod.Logger):
     
     aspects = ('C', 'F', 'P')
@@ -526,10 +784,21 @@ class GOAnnotation(session_mod.Logger):
             ontology = None,
             pickle_file = None,
             use_pickle_cache = True,
+            store_file = None,
+            use_store = None,
         ):
         """
         For one organism loads Gene Ontology annotations, in addition it
         accepts or creates a ``GeneOntology`` object.
+        
+        :param str store_file:
+            Path to a memory mappable store (see ``pypath.utils.go_store``),
+            by default the ``go_store_fname`` in the cache directory.
+        :param bool use_store:
+            Work on the store if it exists, otherwise load the annotations
+            and create the store. By default the ``go_store`` setting.
+            If ``use_pickle_cache`` is ``False``, the store is not used
+            but it is created again from the newly loaded annotations.
         """
         
         session_mod.Logger.__init__(self, name = 'go')
@@ -537,9 +806,21 @@ class GOAnnotation(session_mod.Logger):
         self.organism = organism
         self._pickle_file = pickle_file
         self._use_pickle_cache = use_pickle_cache
+        self._store_file = store_file
+        self._use_store = (
+            settings.get('go_store')
+                if use_store is None else
+            use_store
+        )
+        self._store = None
+        
+        if self._store_load_hook():
+            
+            return
         
         if self._pickle_cache_load_hook():
             
+            self._store_save_hook()
             return
         
         self.ontology = ontology or GeneOntology()
@@ -558,6 +839,7 @@ class GOAnnotation(session_mod.Logger):
         self._merge_annotations()
         
         self._pickle_cache_save_hook()
+        self._store_save_hook(overwrite = not self._use_pickle_cache)
     
     
     def reload(self):
@@ -574,53 +856,123 @@ class GOAnnotation(session_mod.Logger):
     
     def _ancestors_annotate(self):
         
-        self._log('Creating ancestors lookup dictionary.')
+        self._log('Creating ancestors lookup matrices.')
+        
+        self._index_annotations()
+        
+        closure = self.ontology.closure('ancestors').copy()
+        # terms not in the ontology have no ancestors
+        closure.resize((len(self._terms), len(self._terms)))
+        closure = closure + scipy.sparse.identity(
+            len(self._terms),
+            dtype = bool,
+            format = 'csr',
+        )
+        
+        self._full = {}
         
         for asp in self.aspects:
             
+            # the closure of each protein is the union
+            # of the closure rows of its terms
+            self._full[asp] = (
+                self._direct[asp].astype(np.int32) @
+                closure.astype(np.int32)
+            ).astype(bool).tocsr()
+            self._full[asp].sort_indices()
+            
             setattr(
                 self,
                 '%s_full' % asp.lower(),
-                dict(
-                    (
-                        uniprot,
-                        self.ontology.get_all_ancestors(annot)
-                    )
-                    for uniprot, annot in
-                    iteritems(getattr(self, asp.lower()))
-                )
+                self._annotation_rows(self._full[asp]),
             )
     
     
-    def _merge_annotations(self):
+    def _index_annotations(self):
+        """
+        Assigns integer ids to the annotated UniProt IDs and the GO terms,
+        and creates the protein by term matrices of the direct annotations.
+        Terms are indexed the same way as in the ontology, terms missing
+        from the ontology get ids after those.
+        """
         
-        self._log('Creating complete lookup dictionary.')
+        self._uniprots = np.array(sorted(self.all_uniprots()), dtype = object)
+        self._uniprot_id = dict(
+            (uniprot, i)
+            for i, uniprot in enumerate(self._uniprots)
+        )
         
-        uniprots = self.all_uniprots()
+        term_id = self.ontology._term_id.copy()
+        extra_terms = []
         
-        self.all = dict(
-            (
-                uniprot,
-                set.union(*(
-                    self.get_annot(uniprot, asp)
-                    for asp in self.aspects
-                ))
-            )
-            for uniprot in uniprots
-        )
+        for asp in self.aspects:
+            
+            for terms in getattr(self, asp.lower()).values():
+                
+                for term in terms:
+                    
+                    if term not in term_id:
+                        
+                        term_id[term] = len(term_id)
+                        extra_terms.append(term)
+        
+        self._term_id = term_id
+        self._terms = np.concatenate((
+            self.ontology._term_list,
+            np.array(extra_terms, dtype = object),
+        ))
         
-        self.all_full = dict(
-            (
-                uniprot,
-                set.union(*(
-                    self.get_annot_ancestors(uniprot, asp)
-                    for asp in self.aspects
-                ))
+        self._direct = {}
+        
+        for asp in self.aspects:
+            
+            annot = getattr(self, asp.lower())
+            rows = []
+            cols = []
+            
+            for uniprot, terms in iteritems(annot):
+                
+                rows.extend([self._uniprot_id[uniprot]] * len(terms))
+                cols.extend(self._term_id[term] for term in terms)
+            
+            self._direct[asp] = scipy.sparse.csr_matrix(
+                (
+                    np.ones(len(rows), dtype = bool),
+                    (
+                        np.array(rows, dtype = np.int64),
+                        np.array(cols, dtype = np.int64),
+                    ),
+                ),
+                shape = (len(self._uniprots), len(self._terms)),
             )
-            for uniprot in uniprots
+    
+    
+    def _annotation_rows(self, matrix):
+        
+        return AnnotationRows(
+            matrix,
+            uniprots = self._uniprots,
+            uniprot_id = self._uniprot_id,
+            terms = self._terms,
         )
     
     
+    def _merge_annotations(self):
+        
+        self._log('Creating complete lookup matrices.')
+        
+        self._all = sum(self._direct[asp] for asp in self.aspects).tocsr()
+        self._all_full = sum(self._full[asp] for asp in self.aspects).tocsr()
+        self._all.sort_indices()
+        self._all_full.sort_indices()
+        
+        self.all = self._annotation_rows(self._all)
+        self.all_full = self._annotation_rows(self._all_full)
+        # built at the first selection
+        self._all_full_csc = None
+        self._rows_cache = (None,)
+    
+    
     def get_name(self, term):
         """
         For a GO accession number returns the name of the term.
@@ -684,7 +1036,7 @@ class GOAnnotation(session_mod.Logger):
         Tells if an UniProt ID is annotated with a GO term.
         """
         
-        return uniprot in self.all_full and term in self.all_full[uniprot]
+        return self.has_any_term(uniprot, {term})
     
     
     def has_any_term(self, uniprot, terms):
@@ -692,7 +1044,17 @@ class GOAnnotation(session_mod.Logger):
         Tells if an UniProt ID is annotated with any of a set of GO terms.
         """
         
-        return uniprot in self.all_full and term & self.all_full[uniprot]
+        i = self.all_full._row(uniprot)
+        
+        if i is None:
+            
+            return False
+        
+        row = self._all_full.indices[
+            self._all_full.indptr[i]:self._all_full.indptr[i + 1]
+        ]
+        
+        return bool(np.isin(self._term_col(terms), row).any())
     
     
     def all_uniprots(self):
@@ -719,15 +1081,85 @@ class GOAnnotation(session_mod.Logger):
         
         uniprots = uniprots or sorted(self.all_uniprots())
         
-        method = self.has_any_term if isinstance(term, set) else self.has_term
+        return self._indices(self._select_vector(term, uniprots))
         
-        return set(
-            i
-            for i, uniprot in enumerate(uniprots)
-            if method(uniprot, term)
+    
+    def _term_col(self, terms):
+        """
+        Column indices of GO terms in the annotation matrices, terms not
+        annotated to any protein are omitted.
+        """
+        
+        if isinstance(terms, common.basestring):
+            
+            terms = (terms,)
+        
+        return np.array(
+            [self._term_id[term] for term in terms if term in self._term_id],
+            dtype = np.int64,
         )
     
     
+    def _term_vector(self, terms):
+        """
+        Boolean vector over all annotated proteins, true for the ones
+        annotated with any of the terms or their descendants.
+        """
+        
+        if getattr(self, '_all_full_csc', None) is None:
+            
+            # column slicing is fast in the compressed column format
+            self._all_full_csc = self._all_full.tocsc()
+        
+        csc = self._all_full_csc
+        vector = np.zeros(len(self._uniprots), dtype = bool)
+        
+        for col in self._term_col(terms):
+            
+            vector[csc.indices[csc.indptr[col]:csc.indptr[col + 1]]] = True
+        
+        return vector
+    
+    
+    def _uniprot_rows(self, uniprots):
+        """
+        Row indices of UniProt IDs in the annotation matrices, -1 for
+        UniProt IDs without annotation. The result for the most recent
+        list of UniProt IDs is cached.
+        """
+        
+        key = tuple(uniprots)
+        
+        if getattr(self, '_rows_cache', (None,))[0] != key:
+            
+            self._rows_cache = (
+                key,
+                np.array(
+                    [self._uniprot_id.get(uniprot, -1) for uniprot in key],
+                    dtype = np.int64,
+                ),
+            )
+        
+        return self._rows_cache[1]
+    
+    
+    def _select_vector(self, terms, uniprots):
+        """
+        Boolean vector along ``uniprots``, true for the ones annotated
+        with any of the terms.
+        """
+        
+        rows = self._uniprot_rows(uniprots)
+        
+        return self._term_vector(terms)[rows] & (rows >= 0)
+    
+    
+    @staticmethod
+    def _indices(vector):
+        
+        return set(np.flatnonzero(vector).tolist())
+    
+    
     def select_by_name(self, name, uniprots = None, return_uniprots = False):
         """
         Accepts a list of UniProt IDs and one or more gene ontology names
@@ -784,6 +1216,19 @@ class GOAnnotation(session_mod.Logger):
             operators.
         """
         
+        if not hasattr(self, '_expr_terms_cache'):
+            
+            self._expr_terms_cache = {}
+        
+        if expr not in self._expr_terms_cache:
+            
+            self._expr_terms_cache[expr] = self._expr_names_to_terms(expr)
+        
+        return list(self._expr_terms_cache[expr])
+    
+    
+    def _expr_names_to_terms(self, expr):
+        
         not_name = {'(', ')', 'AND', 'OR', 'NOT'}
         
         tokens_names = _reexprname.findall(expr)
@@ -877,11 +1322,6 @@ class GOAnnotation(session_mod.Logger):
             the selected UniProt IDs.
         """
         
-        ops = {
-            'and': 'intersection',
-            'or':  'union',
-        }
-        
         # if no UniProts provided does not make sense to return indices
         return_uniprots = return_uniprots or uniprots is None
         
@@ -890,29 +1330,46 @@ class GOAnnotation(session_mod.Logger):
         if isinstance(expr, common.basestring):
             
             # tokenizing expression if it is a string
-            # (method is recursive)
             expr = _reexprterm.findall(expr)
             
-            if any(e is None for e in expr):
+        result = self._eval_expr(self._compile_expr(expr), uniprots)
                 
-                self._log(
-                    'Could not process Gene Ontology expression: `%s`. '
-                    'Please check if the expression consists only of '
-                    'GO terms and/or ACs, the operators `AND`, `OR` and '
-                    '`NOT`, and braces. Whitespaces and newlines are OK. '
-                    'If you think the expression is correct please open '
-                    'an issue for `pypath`.' % expr,
-                    -9,
-                )
-                return set()
+        return self._uniprot_return(
+            self._indices(result),
+            uniprots,
+            return_uniprots,
+        )
+    
+    
+    def _compile_expr(self, expr):
+        """
+        Compiles a tokenized expression of GO terms into a sequence of
+        steps, each a tuple of an operator (`and`, `or` or ``None``) and
+        an operand. Operands are tuples of a kind and a value: terms
+        (`term`, (term, negate)), sub-expressions (`sub`, steps) or
+        missing terms (`empty`, None). Compiled expressions are cached.
+        Operators are applied from left to right without precedence.
+        """
+        
+        if not hasattr(self, '_expr_cache'):
+            
+            self._expr_cache = {}
+        
+        key = tuple(expr)
+        
+        if key in self._expr_cache:
+            
+            return self._expr_cache[key]
+        
+        ops = {'and', 'or'}
         
         # initial values
-        result   = set()
-        stack    = []
-        sub      = False
-        negate   = False
-        op       = None
-        this_set = None
+        steps   = []
+        stack   = []
+        sub     = False
+        negate  = False
+        op      = None
+        operand = None
         
         for it in expr:
             
@@ -924,11 +1381,8 @@ class GOAnnotation(session_mod.Logger):
                 if it == ')':
                     
                     # token is a closing parenthesis
-                    # execute sub-selection
-                    this_set = self.select_by_expr_terms(
-                        expr = stack,
-                        uniprots = uniprots,
-                    )
+                    # compile the sub-selection
+                    operand = ('sub', self._compile_expr(stack))
                     # empty stack
                     stack = []
                     sub = False
@@ -947,13 +1401,12 @@ class GOAnnotation(session_mod.Logger):
                     'will alter your results. Check for more specific '
                     'information earlier in the log.'
                 )
-                this_set = set()
+                operand = ('empty', None)
                 
-            # we do actual processing of the expression
             elif it.lower() == 'not':
                 
                 # token is negation
-                # turn on negation for the next set
+                # turn on negation for the next term
                 negate = True
                 continue
                 
@@ -968,39 +1421,64 @@ class GOAnnotation(session_mod.Logger):
             elif it[:3] == 'GO:':
                 
                 # token is a GO term
-                # get the vertex selection by the single term method
-                this_set = self.i_select_by_term(it, uniprots = uniprots)
-                
-                if negate:
-                    
-                    # take the inverse of the current set
-                    this_set = set(xrange(len(uniprots))) - this_set
-                    # set negation again to False
-                    negate = False
+                operand = ('term', (it, negate))
+                negate = False
                 
             elif it.lower() in ops:
                 
                 # token is an operator
                 # set it for use at the next operation
-                op = ops[it.lower()]
+                op = it.lower()
             
-            # we found a set
-            if this_set is not None:
+            # we found an operand
+            if operand is not None:
                 
-                # and an operator
-                if op is not None:
+                steps.append((op, operand))
+                operand = None
+                op      = None
                     
-                    result = getattr(result, op)(this_set)
+        steps = tuple(steps)
+        self._expr_cache[key] = steps
                 
-                # this normally happens only at the first set
-                else:
+        return steps
                     
-                    result = this_set
                 
-                this_set = None
-                op       = None
+    def _eval_expr(self, steps, uniprots):
+        """
+        Evaluates a compiled expression (see ``_compile_expr``), returns
+        a boolean vector along ``uniprots``.
+        """
         
-        return self._uniprot_return(result, uniprots, return_uniprots)
+        result = np.zeros(len(uniprots), dtype = bool)
+        
+        for op, (kind, value) in steps:
+            
+            if kind == 'term':
+                
+                term, negate = value
+                this = self._select_vector(term, uniprots)
+                
+                if negate:
+                    
+                    this = ~this
+            
+            elif kind == 'sub':
+                
+                this = self._eval_expr(value, uniprots)
+            
+            else:
+                
+                this = np.zeros(len(uniprots), dtype = bool)
+            
+            result = (
+                result & this
+                    if op == 'and' else
+                result | this
+                    if op == 'or' else
+                this
+            )
+        
+        return result
     
     
     def select(self, terms, uniprots = None, return_uniprots = False):
@@ -1066,7 +1544,7 @@ class GOAnnotation(session_mod.Logger):
         
         if return_uniprots:
             
-            return set(np.array(uniprots)[list(idx)])
+            return {uniprots[i] for i in idx}
         
         return idx
     
@@ -1102,6 +1580,14 @@ class GOAnnotation(session_mod.Logger):
     
     def save_to_pickle(self, pickle_file = None):
         
+        if self._store is not None:
+            
+            self._log(
+                'Annotations loaded from store `%s`, not saving '
+                'to pickle.' % self._store.path
+            )
+            return
+        
         pickle_file = pickle_file or self._pickle_file
         
         if not isinstance(pickle_file, common.basestring):
@@ -1117,14 +1603,13 @@ class GOAnnotation(session_mod.Logger):
             
             pickle.dump(
                 obj = (
-                    self.c_full,
-                    self.p_full,
-                    self.f_full,
-                    self.all_full,
                     self.c,
                     self.p,
                     self.f,
-                    self.all,
+                    self._uniprots,
+                    self._terms,
+                    self._direct,
+                    self._full,
                     self.ontology._terms,
                     self.ontology.ancestors,
                     self.ontology.descendants,
@@ -1150,21 +1635,28 @@ class GOAnnotation(session_mod.Logger):
         
         with open(pickle_file, 'rb') as fp:
             
-            (
-                self.c_full,
-                self.p_full,
-                self.f_full,
-                self.all_full,
-                self.c,
-                self.p,
-                self.f,
-                self.all,
-                ontology_terms,
-                ontology_ancestors,
-                ontology_descendants,
-                ontology_term,
-                ontology_name,
-            ) = pickle.load(fp)
+            data = pickle.load(fp)
+        
+        if len(data) == 13:
+            
+            # pickles by earlier versions had dicts of sets
+            # instead of the annotation matrices
+            data = data[4:7] + (None,) * 4 + data[8:]
+        
+        (
+            self.c,
+            self.p,
+            self.f,
+            self._uniprots,
+            self._terms,
+            self._direct,
+            self._full,
+            ontology_terms,
+            ontology_ancestors,
+            ontology_descendants,
+            ontology_term,
+            ontology_name,
+        ) = data
         
         self.ontology = GeneOntology(
             terms = ontology_terms,
@@ -1174,7 +1666,147 @@ class GOAnnotation(session_mod.Logger):
             name = ontology_name,
         )
         
+        if self._full is None:
+            
+            self._ancestors_annotate()
+            
+        else:
+            
+            self._uniprot_id = dict(
+                (uniprot, i)
+                for i, uniprot in enumerate(self._uniprots)
+            )
+            self._term_id = dict(
+                (term, i)
+                for i, term in enumerate(self._terms)
+            )
+            
+            for asp in self.aspects:
+                
+                setattr(
+                    self,
+                    '%s_full' % asp.lower(),
+                    self._annotation_rows(self._full[asp]),
+                )
+        
+        self._merge_annotations()
+        
         self._log('Loaded from pickle `%s`.' % pickle_file)
+    
+    
+    def _store_load_hook(self):
+        
+        # the store is a cache just like the pickle
+        if not self._use_store or not self._use_pickle_cache:
+            
+            return
+        
+        self._set_store_path()
+        self.load_from_store()
+        
+        return self._store is not None
+    
+    
+    def _store_save_hook(self, overwrite = False):
+        
+        if not self._use_store:
+            
+            return
+        
+        self._set_store_path()
+        
+        if overwrite or not os.path.exists(self._store_file):
+            
+            self.save_to_store()
+    
+    
+    def _set_store_path(self):
+        
+        self._store_file = (
+            self._store_file or
+            os.path.join(
+                cache.get_cachedir(),
+                settings.get('go_store_fname') % self.organism,
+            )
+        )
+    
+    
+    def save_to_store(self, store_file = None):
+        """
+        Exports the annotations and the ontology into a memory mappable
+        store, see ``pypath.utils.go_store``.
+        """
+        
+        store_file = store_file or self._store_file
+        
+        if self._store is not None and store_file == self._store.path:
+            
+            return
+        
+        self._log('Saving to store `%s`.' % store_file)
+        
+        go_store.export(self, store_file)
+        
+        self._log('Saved to store `%s`.' % store_file)
+    
+    
+    def load_from_store(self, store_file = None):
+        """
+        Attaches to a memory mapped store. The annotations and the ontology
+        are not copied into this process: the attributes of this object and
+        its ``ontology`` become read only views of the arrays of the store.
+        """
+        
+        store_file = store_file or self._store_file
+        
+        if not os.path.exists(store_file):
+            
+            self._log('Store file does not exist: `%s`.' % str(store_file))
+            return
+        
+        self._log('Loading from store `%s`.' % store_file)
+        
+        try:
+            
+            store = go_store.GOStore(store_file)
+        
+        except ValueError as e:
+            
+            self._log(str(e))
+            return
+        
+        self._store = store
+        self.ontology = GeneOntology(store = store)
+        self._uniprots = store.uniprots
+        self._uniprot_id = store.uniprot_id
+        self._terms = store.terms
+        self._term_id = store.term_id
+        self._direct = {}
+        self._full = {}
+        
+        for asp in self.aspects:
+            
+            self._direct[asp] = store.matrix('direct_%s' % asp)
+            self._full[asp] = store.matrix('full_%s' % asp)
+            setattr(
+                self,
+                asp.lower(),
+                self._annotation_rows(self._direct[asp]),
+            )
+            setattr(
+                self,
+                '%s_full' % asp.lower(),
+                self._annotation_rows(self._full[asp]),
+            )
+        
+        self._all = store.matrix('all')
+        self._all_full = store.matrix('all_full')
+        self._all_full_csc = store.matrix('all_full_csc')
+        self.all = self._annotation_rows(self._all)
+        self.all_full = self._annotation_rows(self._all_full)
+        self._rows_cache = (None,)
+        
+        self._log('Loaded from store `%s`.' % store_file)
 
 
 class GOCustomAnnotation(session_mod.Logger):
@@ -1332,10 +1964,17 @@ def annotate(graph, organism = 9606, aspects = ('C', 'F', 'P')):
 load_go = annotate
 
 
-def init_db(organism = 9606, pickle_file = None, use_pickle_cache = True):
+def init_db(
+        organism = 9606,
+        pickle_file = None,
+        use_pickle_cache = True,
+        store_file = None,
+        use_store = None,
+    ):
     """
     Initializes or reloads the GO annotation database.
     The database will be assigned to the ``db`` attribute of this module.
+    See ``GOAnnotation`` for the arguments.
     """
     
     if 'db' not in globals():
@@ -1346,10 +1985,18 @@ def init_db(organism = 9606, pickle_file = None, use_pickle_cache = True):
         organism,
         pickle_file = pickle_file,
         use_pickle_cache = use_pickle_cache,
+        store_file = store_file,
+        use_store = use_store,
     )
 
 
-def get_db(organism = 9606, pickle_file = None, use_pickle_cache = True):
+def get_db(
+        organism = 9606,
+        pickle_file = None,
+        use_pickle_cache = True,
+        store_file = None,
+        use_store = None,
+    ):
     """
     Retrieves the current database instance and initializes it if does
     not exist yet.
@@ -1365,6 +2012,8 @@ def get_db(organism = 9606, pickle_file = None, use_pickle_cache = True):
             organism,
             pickle_file = pickle_file,
             use_pickle_cache = use_pickle_cache,
+            store_file = store_file,
+            use_store = use_store,
         )
     
     return globals()['db'][organism]
@@ -0,0 +1,764 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+#  This file is part of the `pypath` python module
+#
+#  Copyright
+#  2014-2020
+#  EMBL, EMBL-EBI, Uniklinik RWTH Aachen, Heidelberg University
+#
+#  File author(s): Dénes Türei (turei.denes@gmail.com)
+#                  Nicolàs Palacio
+#                  Olga Ivanova
+#
+#  Distributed under the GPLv3 License.
+#  See accompanying file LICENSE.txt or copy at
+#      http://www.gnu.org/licenses/gpl-3.0.html
+#
+#  Website: http://pypath.omnipathdb.org/
+#
+
+"""
+Read only, memory mappable store of Gene Ontology annotations and the
+ontology. All data is kept in flat arrays in one file: the UniProt IDs
+and GO terms as fixed width strings with their sort order, the term
+names in one buffer, the ontology graph and its transitive closures,
+and the direct and propagated annotations as compressed sparse row
+arrays. The file is mapped into the memory, hence the processes using
+the same store share one physical copy of the data, and opening the
+store takes only milliseconds.
+"""
+
+from future.utils import iteritems
+
+import os
+import mmap
+import json
+import struct
+import collections.abc
+
+import numpy as np
+import scipy.sparse
+
+import pypath.share.session as session_mod
+
+_logger = session_mod.Logger(name = 'go_store')
+_log = _logger._log
+
+STORE_VERSION = 1
+
+_MAGIC = b'PYPATHGO'
+_ALIGN = 64
+
+
+def _encode(strings):
+    """
+    Fixed width UTF-8 byte strings array from a list of strings.
+    """
+
+    encoded = [s.encode('utf-8') for s in strings]
+    width = max([len(s) for s in encoded] or [1]) or 1
+
+    return np.array(encoded, dtype = 'S%u' % width)
+
+
+class StringArray(collections.abc.Sequence):
+    """
+    Read only sequence of strings stored as fixed width UTF-8 bytes.
+    Indexing by an array or slice returns a list of strings.
+    """
+
+    def __init__(self, data):
+
+        self.data = data
+
+
+    def __getitem__(self, i):
+
+        if isinstance(i, (int, np.integer)):
+
+            return self.data[i].decode('utf-8')
+
+        return [s.decode('utf-8') for s in self.data[i]]
+
+
+    def __len__(self):
+
+        return len(self.data)
+
+
+    def __iter__(self):
+
+        return (s.decode('utf-8') for s in self.data)
+
+
+class StringIndex(collections.abc.Mapping):
+    """
+    Read only mapping from strings to their positions in an array of
+    fixed width byte strings. Looks up by binary search, either in the
+    array if it is sorted, or along the ``order`` permutation.
+    """
+
+    def __init__(self, data, order = None):
+
+        self.data = data
+        self.order = order
+        self._width = data.dtype.itemsize
+
+
+    def get(self, key, default = None):
+
+        if not isinstance(key, str):
+
+            return default
+
+        key = key.encode('utf-8')
+
+        if len(key) > self._width or not key:
+
+            return default
+
+        i = int(np.searchsorted(self.data, key, sorter = self.order))
+
+        if i < len(self.data):
+
+            i = i if self.order is None else int(self.order[i])
+
+            if self.data[i] == key:
+
+                return i
+
+        return default
+
+
+    def __getitem__(self, key):
+
+        i = self.get(key)
+
+        if i is None:
+
+            raise KeyError(key)
+
+        return i
+
+
+    def __contains__(self, key):
+
+        return self.get(key) is not None
+
+
+    def __iter__(self):
+
+        return iter(StringArray(self.data))
+
+
+    def __len__(self):
+
+        return len(self.data)
+
+
+class TermNames(collections.abc.Mapping):
+    """
+    Read only mapping of GO terms to their names.
+    """
+
+    def __init__(self, term_id, terms, buffer, offsets):
+
+        self._term_id = term_id
+        self._terms = terms
+        self._buffer = buffer
+        self._offsets = offsets
+        self._len = None
+
+
+    def _name(self, i):
+
+        start, end = self._offsets[i], self._offsets[i + 1]
+
+        return (
+            self._buffer[start:end].tobytes().decode('utf-8')
+                if end > start else
+            None
+        )
+
+
+    def get(self, term, default = None):
+
+        i = self._term_id.get(term)
+        name = None if i is None else self._name(i)
+
+        return default if name is None else name
+
+
+    def __getitem__(self, term):
+
+        name = self.get(term)
+
+        if name is None:
+
+            raise KeyError(term)
+
+        return name
+
+
+    def __contains__(self, term):
+
+        return self.get(term) is not None
+
+
+    def __iter__(self):
+
+        return (
+            self._terms[i]
+            for i in np.flatnonzero(np.diff(self._offsets))
+        )
+
+
+    def __len__(self):
+
+        if self._len is None:
+
+            self._len = int(np.count_nonzero(np.diff(self._offsets)))
+
+        return self._len
+
+
+class NameTerms(collections.abc.Mapping):
+    """
+    Read only mapping of GO term names to the terms, by binary search
+    along the term ids ordered by their names.
+    """
+
+    def __init__(self, names, terms, order):
+
+        self._names = names
+        self._terms = terms
+        self._order = order
+
+
+    def get(self, name, default = None):
+
+        if not isinstance(name, str):
+
+            return default
+
+        lo, hi = 0, len(self._order)
+
+        while lo < hi:
+
+            mid = (lo + hi) // 2
+
+            if self._names._name(self._order[mid]) < name:
+
+                lo = mid + 1
+
+            else:
+
+                hi = mid
+
+        if lo < len(self._order):
+
+            i = self._order[lo]
+
+            if self._names._name(i) == name:
+
+                return self._terms[i]
+
+        return default
+
+
+    def __getitem__(self, name):
+
+        term = self.get(name)
+
+        if term is None:
+
+            raise KeyError(name)
+
+        return term
+
+
+    def __contains__(self, name):
+
+        return self.get(name) is not None
+
+
+    def __iter__(self):
+
+        return (self._names._name(i) for i in self._order)
+
+
+    def __len__(self):
+
+        return len(self._order)
+
+
+class TermAspects(collections.abc.Mapping):
+    """
+    Read only mapping of GO terms to their aspects.
+    """
+
+    def __init__(self, term_id, terms, codes, aspects):
+
+        self._term_id = term_id
+        self._terms = terms
+        self._codes = codes
+        self._aspects = aspects
+
+
+    def get(self, term, default = None):
+
+        i = self._term_id.get(term)
+
+        return (
+            default
+                if i is None or self._codes[i] < 0 else
+            self._aspects[self._codes[i]]
+        )
+
+
+    def __getitem__(self, term):
+
+        aspect = self.get(term)
+
+        if aspect is None:
+
+            raise KeyError(term)
+
+        return aspect
+
+
+    def __contains__(self, term):
+
+        return self.get(term) is not None
+
+
+    def __iter__(self):
+
+        return (self._terms[i] for i in np.flatnonzero(self._codes >= 0))
+
+
+    def __len__(self):
+
+        return int(np.count_nonzero(self._codes >= 0))
+
+
+class TermGraph(collections.abc.Mapping):
+    """
+    Read only mapping of GO terms to the sets of their parents or
+    children, as tuples of the related term and the relation. Just like
+    the ``defaultdict`` it replaces, returns an empty set for terms
+    without relatives.
+    """
+
+    def __init__(self, term_id, terms, indptr, indices, codes, relations):
+
+        self._term_id = term_id
+        self._terms = terms
+        self._indptr = indptr
+        self._indices = indices
+        self._codes = codes
+        self._relations = relations
+
+
+    def _related(self, i):
+
+        start, end = self._indptr[i], self._indptr[i + 1]
+
+        return {
+            (self._terms[j], self._relations[code])
+            for j, code in zip(
+                self._indices[start:end],
+                self._codes[start:end],
+            )
+        }
+
+
+    def __getitem__(self, term):
+
+        i = self._term_id.get(term)
+
+        return set() if i is None else self._related(i)
+
+
+    def get(self, term, default = None):
+
+        return self[term] if term in self else default
+
+
+    def __contains__(self, term):
+
+        i = self._term_id.get(term)
+
+        return i is not None and self._indptr[i + 1] > self._indptr[i]
+
+
+    def __iter__(self):
+
+        return (
+            self._terms[i]
+            for i in np.flatnonzero(np.diff(self._indptr))
+        )
+
+
+    def __len__(self):
+
+        return int(np.count_nonzero(np.diff(self._indptr)))
+
+
+class GOStore(session_mod.Logger):
+    """
+    Gene Ontology annotations and the ontology in a memory mapped file.
+    Provides the arrays, sparse matrices and read only lookup tables
+    which ``GOAnnotation`` and ``GeneOntology`` are able to work on.
+
+    :param str path:
+        Path to the store file, created by ``export``.
+    """
+
+    def __init__(self, path):
+
+        session_mod.Logger.__init__(self, name = 'go_store')
+
+        self.path = path
+        self.load()
+
+
+    def load(self):
+
+        with open(self.path, 'rb') as fp:
+
+            self._mm = mmap.mmap(fp.fileno(), 0, access = mmap.ACCESS_READ)
+
+        if self._mm[:len(_MAGIC)] != _MAGIC:
+
+            raise ValueError('Not a GO store file: `%s`.' % self.path)
+
+        header_len = struct.unpack_from('<Q', self._mm, len(_MAGIC))[0]
+        header_start = len(_MAGIC) + 8
+        self.header = json.loads(
+            self._mm[header_start:header_start + header_len].decode('utf-8')
+        )
+
+        if self.header['version'] != STORE_VERSION:
+
+            raise ValueError(
+                'GO store `%s` has been created by an incompatible '
+                'version, please export it again.' % self.path
+            )
+
+        self.arrays = dict(
+            (
+                name,
+                np.frombuffer(
+                    self._mm,
+                    dtype = np.dtype(dtype),
+                    count = int(np.prod(shape)),
+                    offset = offset,
+                ).reshape(shape)
+            )
+            for name, (dtype, shape, offset) in iteritems(
+                self.header['arrays']
+            )
+        )
+
+        self.organism = self.header['organism']
+        self.aspects = tuple(self.header['aspects'])
+        self.relations = tuple(self.header['relations'])
+        self.closure_relations = frozenset(self.header['closure_relations'])
+
+        self.uniprots = StringArray(self.arrays['uniprots'])
+        self.uniprot_id = StringIndex(
+            self.arrays['uniprots'],
+            order = self.arrays['uniprots_order'],
+        )
+        self.terms = StringArray(self.arrays['terms'])
+        self.term_id = StringIndex(
+            self.arrays['terms'],
+            order = self.arrays['terms_order'],
+        )
+        self.names = TermNames(
+            self.term_id,
+            self.terms,
+            self.arrays['names'],
+            self.arrays['names_offsets'],
+        )
+        self.name_terms = NameTerms(
+            self.names,
+            self.terms,
+            self.arrays['names_order'],
+        )
+        self.term_aspects = TermAspects(
+            self.term_id,
+            self.terms,
+            self.arrays['aspects'],
+            self.aspects,
+        )
+
+        self._log(
+            'GO store `%s` opened: %u proteins, %u terms.' % (
+                self.path,
+                len(self.uniprots),
+                len(self.terms),
+            )
+        )
+
+
+    def graph(self, direction):
+        """
+        The parents (``direction = 'ancestors'``) or the children
+        (``'descendants'``) of the terms as a ``TermGraph``.
+        """
+
+        return TermGraph(
+            self.term_id,
+            self.terms,
+            self.arrays['%s.indptr' % direction],
+            self.arrays['%s.indices' % direction],
+            self.arrays['%s.relations' % direction],
+            self.relations,
+        )
+
+
+    def matrix(self, name):
+        """
+        A boolean sparse matrix on top of the mapped arrays.
+        """
+
+        fmt, shape = self.header['matrices'][name]
+        indptr = self.arrays['%s.indptr' % name]
+        indices = self.arrays['%s.indices' % name]
+        cls = (
+            scipy.sparse.csr_matrix
+                if fmt == 'csr' else
+            scipy.sparse.csc_matrix
+        )
+        matrix = cls(
+            (self.arrays['ones'][:len(indices)], indices, indptr),
+            shape = tuple(shape),
+            copy = False,
+        )
+        matrix.has_sorted_indices = True
+
+        return matrix
+
+
+def _matrix_arrays(name, matrix, fmt = 'csr'):
+
+    matrix = matrix.tocsr() if fmt == 'csr' else matrix.tocsc()
+    matrix.sum_duplicates()
+    matrix.sort_indices()
+    # indices and indptr of the same type, to avoid
+    # conversion when creating the sparse matrix
+    dtype = (
+        np.int32
+            if max(matrix.nnz, max(matrix.shape)) < 2 ** 31 else
+        np.int64
+    )
+
+    return (
+        {
+            '%s.indptr' % name: matrix.indptr.astype(dtype),
+            '%s.indices' % name: matrix.indices.astype(dtype),
+        },
+        (fmt, matrix.shape),
+    )
+
+
+def _graph_arrays(direction, graph, term_id, relations):
+
+    n_terms = len(term_id)
+    related = [()] * n_terms
+
+    for term, _related in iteritems(graph):
+
+        if term in term_id:
+
+            related[term_id[term]] = sorted(
+                (term_id[rel_term], relations.index(relation))
+                for rel_term, relation in _related
+                if rel_term in term_id
+            )
+
+    indptr = np.zeros(n_terms + 1, dtype = np.int64)
+    indptr[1:] = np.cumsum([len(rel) for rel in related])
+
+    return {
+        '%s.indptr' % direction: indptr,
+        '%s.indices' % direction: np.array(
+            [rel[0] for _related in related for rel in _related],
+            dtype = np.int32,
+        ),
+        '%s.relations' % direction: np.array(
+            [rel[1] for _related in related for rel in _related],
+            dtype = np.int8,
+        ),
+    }
+
+
+def export(go_annot, path):
+    """
+    Writes the annotations and the ontology of a ``GOAnnotation`` object
+    into a store file.
+
+    :param pypath.utils.go.GOAnnotation go_annot:
+        An annotation object, with its annotation matrices compiled.
+    :param str path:
+        Path to the store file. The file is written under a temporary name
+        and then renamed, so the processes never open a partially written
+        store.
+    """
+
+    _log('Exporting GO annotations and ontology to `%s`.' % path)
+
+    ontology = go_annot.ontology
+    terms = list(go_annot._terms)
+    term_id = dict((term, i) for i, term in enumerate(terms))
+    n_terms = len(terms)
+    aspects = tuple(go_annot.aspects)
+    relations = sorted(
+        set(ontology.all_relations) |
+        {
+            relation
+            for graph in (ontology.ancestors, ontology.descendants)
+            for _related in graph.values()
+            for _, relation in _related
+        }
+    )
+
+    arrays = {
+        'uniprots': _encode(go_annot._uniprots),
+        'terms': _encode(terms),
+    }
+
+    for name in ('uniprots', 'terms'):
+
+        arrays['%s_order' % name] = np.argsort(
+            arrays[name],
+            kind = 'stable',
+        ).astype(np.int32)
+
+    names = [ontology.name.get(term) for term in terms]
+    encoded = [(name or '').encode('utf-8') for name in names]
+    offsets = np.zeros(n_terms + 1, dtype = np.int64)
+    offsets[1:] = np.cumsum([len(name) for name in encoded])
+    arrays['names'] = np.frombuffer(b''.join(encoded), dtype = np.uint8)
+    arrays['names_offsets'] = offsets
+    arrays['names_order'] = np.array(
+        sorted(
+            (i for i, name in enumerate(names) if name),
+            key = lambda i: names[i],
+        ),
+        dtype = np.int32,
+    )
+    arrays['aspects'] = np.array(
+        [
+            aspects.index(ontology.aspect[term])
+                if ontology.aspect.get(term) in aspects else
+            -1
+            for term in terms
+        ],
+        dtype = np.int8,
+    )
+
+    for direction in ('ancestors', 'descendants'):
+
+        arrays.update(
+            _graph_arrays(
+                direction,
+                getattr(ontology, direction),
+                term_id,
+                relations,
+            )
+        )
+
+    matrices = {}
+
+    def add_matrix(name, matrix, fmt = 'csr'):
+
+        _arrays, matrices[name] = _matrix_arrays(name, matrix, fmt)
+        arrays.update(_arrays)
+
+    closure_relations = frozenset(ontology.all_relations)
+
+    for direction in ('ancestors', 'descendants'):
+
+        # terms which are not in the ontology have no relatives
+        closure = ontology.closure(direction, closure_relations).copy()
+        closure.resize((n_terms, n_terms))
+        add_matrix('closure_%s' % direction, closure)
+
+    for asp in aspects:
+
+        add_matrix('direct_%s' % asp, go_annot._direct[asp])
+        add_matrix('full_%s' % asp, go_annot._full[asp])
+
+    add_matrix('all', go_annot._all)
+    add_matrix('all_full', go_annot._all_full)
+    add_matrix('all_full_csc', go_annot._all_full, fmt = 'csc')
+
+    arrays['ones'] = np.ones(
+        max([len(a) for name, a in iteritems(arrays) if '.indices' in name]),
+        dtype = bool,
+    )
+
+    _write(
+        path,
+        arrays,
+        {
+            'version': STORE_VERSION,
+            'organism': go_annot.organism,
+            'aspects': aspects,
+            'relations': relations,
+            'closure_relations': sorted(closure_relations),
+            'matrices': matrices,
+        },
+    )
+
+    _log('GO store `%s` ready.' % path)
+
+
+def _write(path, arrays, header):
+
+    offset = 0
+    layout = {}
+
+    for name, array in iteritems(arrays):
+
+        layout[name] = (array.dtype.str, array.shape, offset)
+        offset += -(-array.nbytes // _ALIGN) * _ALIGN
+
+    # the header must be serialized to know where the data starts,
+    # the offsets are relative to the beginning of the data
+    def header_bytes(data_start):
+
+        header['arrays'] = dict(
+            (name, (dtype, shape, data_start + _offset))
+            for name, (dtype, shape, _offset) in iteritems(layout)
+        )
+
+        return json.dumps(header).encode('utf-8')
+
+    # the length of the header depends on the offsets, hence we
+    # reserve space for the longest possible offsets
+    _header = header_bytes(10 ** 15)
+    data_start = -(-(len(_MAGIC) + 8 + len(_header)) // _ALIGN) * _ALIGN
+    _header = header_bytes(data_start)
+
+    tmp_path = '%s.%u.tmp' % (path, os.getpid())
+
+    with open(tmp_path, 'wb') as fp:
+
+        fp.write(_MAGIC)
+        fp.write(struct.pack('<Q', len(_header)))
+        fp.write(_header)
+
+        for name, array in iteritems(arrays):
+
+            fp.seek(layout[name][2] + data_start)
+            fp.write(np.ascontiguousarray(array).tobytes())
+
+        fp.truncate(data_start + offset)
+
+    os.replace(tmp_path, path)
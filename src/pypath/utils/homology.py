@@ -32,8 +32,10 @@ import time
 import datetime
 import json
 import pickle
+import collections
 
 import timeloop
+import numpy as np
 
 import pypath.utils.mapping as mapping
 import pypath.share.common as common
@@ -386,7 +388,10 @@ class Proteomes(object):
 
             for protein in self._proteomes[key]:
 
-                self._taxonomy[protein] = key
+                # don't mark SwissProts loaded earlier as TrEMBL
+                if self._taxonomy.get(protein) != (taxon, True):
+
+                    self._taxonomy[protein] = key
 
             if not swissprot_only:
 
@@ -436,7 +441,10 @@ class ProteinHomology(Proteomes):
         :mapper pypath.mapping.Mapper mapper: A Mapper object.
         """
 
-        self.homo = {}
+        # the tables might be provided by the creator of the object
+        if not hasattr(self, 'homo'):
+            self.homo = {}
+
         self.only_swissprot = only_swissprot
         self.target = target
         self.source = source
@@ -577,8 +585,11 @@ class PtmHomology(ProteinHomology, SequenceContainer):
         self.reptm = re.compile(r'([A-Z\d]{6,10})_([A-Z])(\d*)')
 
         self.strict = strict
+        self._site_cache = {}
+        self._seq_arrays = {}
 
-        self.ptm_orthology()
+        if not hasattr(self, 'ptmhomo'):
+            self.ptm_orthology()
 
 
     def translate_site(
@@ -594,13 +605,119 @@ class PtmHomology(ProteinHomology, SequenceContainer):
         Translates one PTM site.
         """
 
-        result = set()
-
         self.set_default_source(source_taxon)
 
         source = self.get_source(source_taxon)
 
         sourceptm = (protein, isoform, res, offset, source, typ)
+        key = self._site_key(sourceptm)
+
+        if key not in self._site_cache:
+
+            result = self._translate_site_known(sourceptm)
+
+            if not result and not self.strict:
+
+                result = self._translate_site_by_seq(sourceptm)
+
+            self._site_cache[key] = result
+
+        return self._site_cache[key]
+
+
+    def translate_sites(self, sites, source_taxon = None):
+        """
+        Translates many PTM sites at once. The result is the same as
+        calling ``translate_site`` for each site, but the sequence based
+        lookup (non strict mode) is carried out for all sites of each
+        orthologous protein at once. The results are memoized, later
+        calls of ``translate_site`` with the same sites return them
+        without further processing.
+
+        :param list sites:
+            Tuples with the positional arguments of ``translate_site``:
+            protein, residue letter, offset and optionally isoform and
+            modification type.
+        :param int source_taxon:
+            NCBI Taxonomy ID of the source organism.
+
+        :returns:
+            List of the translated sites for each site, in the same order
+            as the sites.
+        """
+
+        self.set_default_source(source_taxon)
+
+        source = self.get_source(source_taxon)
+
+        defaults = (1, 'phosphorylation')
+        result = []
+        # sites to be looked up in the sequences, with their
+        # positions in the result
+        pending = collections.OrderedDict()
+
+        for site in sites:
+
+            site = tuple(site)
+            protein, res, offset, isoform, typ = (
+                site + defaults[len(site) - 3:]
+            )
+            sourceptm = (protein, isoform, res, offset, source, typ)
+            key = self._site_key(sourceptm)
+            this_result = self._site_cache.get(key, None)
+
+            if this_result is None:
+
+                if key in pending:
+
+                    pending[key][1].append(len(result))
+
+                else:
+
+                    this_result = self._translate_site_known(sourceptm)
+
+                    if not this_result and not self.strict:
+
+                        pending[key] = (sourceptm, [len(result)])
+                        this_result = None
+
+                    else:
+
+                        self._site_cache[key] = this_result
+
+            result.append(this_result)
+
+        if pending:
+
+            for (key, (sourceptm, positions)), this_result in zip(
+                iteritems(pending),
+                self._translate_sites_by_seq(
+                    [sourceptm for sourceptm, _ in pending.values()]
+                ),
+            ):
+
+                self._site_cache[key] = this_result
+
+                for i in positions:
+
+                    result[i] = this_result
+
+        return result
+
+
+    def _site_key(self, sourceptm):
+
+        return sourceptm + (self.target, self.strict)
+
+
+    def _translate_site_known(self, sourceptm):
+        """
+        Translates a PTM site if it is already in the target organism or
+        in the PTM orthology data.
+        """
+
+        result = set()
+        protein = sourceptm[0]
 
         if self.get_taxon(protein.identifier) == self.target:
             result.add(sourceptm)
@@ -612,44 +729,198 @@ class PtmHomology(ProteinHomology, SequenceContainer):
 
                 result = self.ptmhomo[sourceptm]
 
-        if not result and not self.strict:
+        return result
 
-            tsubs = ProteinHomology.translate(
-                self,
-                protein.identifier,
-                source = source,
-            )
 
-            for tsub in tsubs:
+    def _translate_site_by_seq(self, sourceptm):
+        """
+        Looks up the residue at the same or slightly shifted offset in
+        the sequences of the orthologous proteins.
+        """
+
+        result = set()
+        protein, isoform, res, offset, source, typ = sourceptm
+
+        tsubs = ProteinHomology.translate(
+            self,
+            protein.identifier,
+            source = source,
+        )
+
+        for tsub in tsubs:
+
+            se = self.get_seq(tsub)
+
+            if se is None:
+                continue
+
+            for toffset in xrange(offset, offset + 3):
+
+                for i in se.isoforms():
+
+                    tres = se.get(toffset, isoform = i)
+
+                    if tres == res:
+
+                        result.add((
+                            tsub,
+                            i,
+                            tres,
+                            toffset,
+                            self.target,
+                            typ
+                        ))
+
+                if result:
+                    break
+
+        return result
+
+
+    def _translate_sites_by_seq(self, sourceptms):
+        """
+        Does the same as ``_translate_site_by_seq`` for a list of sites.
+        The sites are grouped by the orthologous proteins, and for each
+        of these the residues at all the candidate offsets are compared
+        at once over the sequences of all isoforms.
+        """
+
+        shifts = np.arange(3)
+        tsubs = {}
+        by_tsub = collections.defaultdict(list)
+
+        for j, (protein, isoform, res, offset, source, typ) in (
+            enumerate(sourceptms)
+        ):
+
+            if (protein.identifier, source) not in tsubs:
+
+                tsubs[(protein.identifier, source)] = (
+                    ProteinHomology.translate(
+                        self,
+                        protein.identifier,
+                        source = source,
+                    )
+                )
 
-                se = self.get_seq(tsub)
+            for k, tsub in enumerate(tsubs[(protein.identifier, source)]):
+
+                by_tsub[tsub].append((j, k))
+
+        # for each site the orthologues with any matching residue:
+        # the rank of the orthologue, its ID, the first matching shift,
+        # the isoforms matching at the first shift and at zero shift
+        matches = collections.defaultdict(list)
+
+        for tsub, jk in iteritems(by_tsub):
+
+            seqs = self._seq_array(tsub)
+
+            if seqs is None:
+
+                continue
+
+            js = [j for j, k in jk]
+            offsets = np.array([sourceptms[j][3] for j in js])
+            residues = np.array([
+                ord(sourceptms[j][2])
+                    if (
+                        isinstance(sourceptms[j][2], common.basestring) and
+                        len(sourceptms[j][2]) == 1
+                    ) else
+                -1
+                for j in js
+            ])
+            positions = offsets[:,None] + shifts
+            isoforms = [i for i, seq in seqs]
+            # isoforms x sites x shifts
+            match = np.zeros((len(seqs),) + positions.shape, dtype = bool)
+
+            for n, (i, seq) in enumerate(seqs):
+
+                if not len(seq):
 
-                if se is None:
                     continue
 
-                for toffset in xrange(offset, offset + 3):
+                in_seq = (positions >= 1) & (positions <= len(seq))
+                # out of range positions are masked by `in_seq`,
+                # the clip only keeps the indices valid
+                match[n] = in_seq & (
+                    seq[np.clip(positions - 1, 0, len(seq) - 1)] ==
+                    residues[:,None]
+                )
+
+            any_isoform = match.any(axis = 0)
+            first = any_isoform.argmax(axis = 1)
+            hits = np.flatnonzero(any_isoform.any(axis = 1))
+            # sites x shifts x isoforms
+            match = match.transpose(1, 2, 0)[hits].tolist()
+
+            for m, shift, match_m in zip(hits, first[hits].tolist(), match):
+
+                j, k = jk[m]
+                matches[j].append((
+                    k,
+                    tsub,
+                    shift,
+                    [i for i, hit in zip(isoforms, match_m[shift]) if hit],
+                    [i for i, hit in zip(isoforms, match_m[0]) if hit],
+                ))
+
+        result = []
+
+        for j, (protein, isoform, res, offset, source, typ) in (
+            enumerate(sourceptms)
+        ):
 
-                    for i in se.isoforms():
+            this_result = set()
 
-                        tres = se.get(toffset, isoform = i)
+            # once we have a result, from the following orthologues
+            # only the residues at zero shift are considered
+            for k, tsub, shift, isof_first, isof_zero in sorted(matches[j]):
 
-                        if tres == res:
+                shift, isof = (
+                    (0, isof_zero) if this_result else (shift, isof_first)
+                )
 
-                            result.add((
-                                tsub,
-                                i,
-                                tres,
-                                toffset,
-                                self.target,
-                                typ
-                            ))
+                this_result.update(
+                    (tsub, i, res, offset + shift, self.target, typ)
+                    for i in isof
+                )
 
-                    if result:
-                        break
+            result.append(this_result)
 
         return result
 
 
+    def _seq_array(self, protein):
+        """
+        Returns the sequences of all isoforms of a protein as arrays
+        of character codes.
+        """
+
+        if protein not in self._seq_arrays:
+
+            se = self.get_seq(protein)
+
+            self._seq_arrays[protein] = (
+                None
+                    if se is None else
+                [
+                    (
+                        i,
+                        np.frombuffer(
+                            se.isof[i].encode('ascii'),
+                            dtype = np.uint8,
+                        ),
+                    )
+                    for i in se.isoforms()
+                ]
+            )
+
+        return self._seq_arrays[protein]
+
+
     def translate_domain(self, domain):
 
         return (
@@ -34,6 +34,9 @@ import struct
 import itertools
 import bs4
 import time
+import multiprocessing
+import concurrent.futures
+import traceback
 from lxml import etree
 try:
     import cPickle as pickle
@@ -52,6 +55,7 @@ import pypath.resources.urls as urls
 import pypath.utils.seq as seq
 import pypath.share.session as session_mod
 import pypath.share.cache as cache
+import pypath.share.settings as settings
 
 
 class BioPaxReader(session_mod.Logger):
@@ -82,6 +86,36 @@ class BioPaxReader(session_mod.Logger):
     difications.
     """
 
+    # the dicts holding the results of parsing
+    _result_attrs = (
+        'proteins',
+        'pfamilies',
+        'complexes',
+        'cvariations',
+        'prefs',
+        'ids',
+        'reactions',
+        'cassemblies',
+        'interactions',
+        'transports',
+        'transwreas',
+        'stoichiometries',
+        'catalyses',
+        'controls',
+        'pwsteps',
+        'pubrefs',
+        'fragfeas',
+        'seqints',
+        'seqsites',
+        'modfeas',
+        'seqmodvocs',
+        'pathways',
+        'interactions_not2',
+    )
+    # number of XML events between readings of the file position
+    # for the progress bar
+    progress_sample = 5000
+
     def __init__(
             self,
             biopax,
@@ -89,6 +123,7 @@ class BioPaxReader(session_mod.Logger):
             cleanup_period=800,
             file_from_archive=None,
             silent=False,
+            workers=None,
         ):
         """
         :param str,FileOpener biopax: either a filename, or a FileOpener
@@ -106,12 +141,17 @@ class BioPaxReader(session_mod.Logger):
         :param str file_from_archive: in case of processing an archive
         which may contain multiple files (tar.gz or zip), the path of
         the file to be processed needs to be supplied.
-        E.g. *BioPax/Homo_sapiens.owl*.
+        E.g. *BioPax/Homo_sapiens.owl*. A list of paths can be supplied
+        too, in this case each of the files is processed by a separate
+        parser and the results are merged into this object.
 
         :param bool silent: whether print status messages and progress
         bars during processing. If you process large number of small
         files, better to set False, in case of one large file, True.
         The default is *False*.
+
+        :param int workers: number of processes for parsing multiple files
+        from an archive. By default the `biopax_workers` setting is used.
         """
 
         session_mod.Logger.__init__(self, name = 'biopax')
@@ -120,7 +160,7 @@ class BioPaxReader(session_mod.Logger):
         self.source = source
         self.file_from_archive = file_from_archive
         self.cleanup_period = cleanup_period
-        self.biopax_tmp_file = None
+        self.workers = workers
         self.cachedir = cache.get_cachedir()
         self.parser_id = common.gen_session_id()
         self.silent = silent
@@ -245,6 +285,12 @@ class BioPaxReader(session_mod.Logger):
         :param bool silent: whether to print status messages and progress bars.
         """
         self.silent = silent
+
+        if isinstance(self.file_from_archive, (list, tuple, set)):
+
+            self.process_members()
+            return
+
         self.open_biopax()
         self.biopax_size()
         self.extract()
@@ -284,6 +330,7 @@ class BioPaxReader(session_mod.Logger):
             if self.file_from_archive is None else
             {
                 'files_needed': [self.file_from_archive],
+                'default_mode': 'rb',
             }
         )
         if type(self.biopax) is curl.FileOpener:
@@ -303,58 +350,58 @@ class BioPaxReader(session_mod.Logger):
 
     def biopax_size(self):
         """
-        Gets the uncompressed size of the BioPax XML. This is needed in
-        order to have a progress bar. This method should not be called
-        directly, ``BioPaxReader.process()`` calls it.
+        Gets the compressed size of the BioPax XML, i.e. the number of
+        bytes to be read from the disk. This is needed in order to have
+        a progress bar. This method should not be called directly,
+        ``BioPaxReader.process()`` calls it.
         """
-        self.bp_filesize = self.opener.sizes[self.file_from_archive] \
-            if hasattr(self.opener, 'sizes') else self.opener.size
+        self._rawfile = self.opener.fileobj
+
+        if self.opener.type == 'zip':
+
+            self.bp_filesize = self.opener.zipfile.getinfo(
+                self.file_from_archive
+            ).compress_size
+
+        else:
+
+            self.bp_filesize = os.path.getsize(self.opener.fname)
 
     def extract(self):
         """
-        Extracts the BioPax file from compressed archive. Creates a
-        temporary file. This is needed to trace the progress of
-        processing, which is useful in case of large files.
+        Selects the binary stream of the BioPax XML. Compressed files and
+        archive members are decompressed on the fly while parsing, without
+        writing them to the disk.
         This method should not be called directly,
         ``BioPaxReader.process()`` calls it.
         """
 
-        if self.opener.type != 'plain':
+        if hasattr(self._biopax, 'buffer'):
 
-            self.biopax_tmp_file = os.path.join(
-                self.cachedir,
-                'biopax.processing.tmp.owl',
-            )
+            # text mode wrapper around a binary stream
+            self._biopax = self._biopax.buffer
 
-            self._log(
-                'Extracting %s from %s compressed file.' % (
-                    self.file_from_archive,
-                    self.opener.type
-                )
+        self._log(
+            'Reading %s%s directly from %s file.' % (
+                self.file_from_archive or 'BioPAX XML',
+                '' if self.opener.type == 'plain' else ' decompressed',
+                self.opener.type,
             )
+        )
 
-            if not self.silent:
-                prg = progress.Progress(
-                    self.bp_filesize, 'Extracting %s from %s compressed file' %
-                    (self.file_from_archive, self.opener.type), 1000000)
-
-            with open(self.biopax_tmp_file, 'wb') as tmpf:
+    def _compressed_pos(self):
+        """
+        Position in the file on the disk, i.e. the number of compressed
+        bytes read so far.
+        """
 
-                while True:
+        try:
 
-                    chunk = self._biopax.read(100000)
-                    if not self.silent:
-                        prg.step(len(chunk))
-                    if not len(chunk):
-                        break
-                    if hasattr(chunk, 'encode'):
-                        chunk = chunk.encode('utf8')
-                    tmpf.write(chunk)
+            return self._rawfile.tell()
 
-            self._biopax = open(self.biopax_tmp_file, 'rb')
+        except (AttributeError, ValueError, OSError):
 
-            if not self.silent:
-                prg.terminate()
+            return self.fpos
 
     def init_etree(self):
         """
@@ -391,14 +438,17 @@ class BioPaxReader(session_mod.Logger):
         This method should not be called directly,
         ``BioPaxReader.process()`` calls it.
         """
-        self.fpos = self._biopax.tell()
+        self.fpos = 0
+        self.fpos = self._compressed_pos()
+        progress_sample = self.progress_sample
         try:
-            for ev, elem in self.bp:
-                # step the progressbar:
-                new_fpos = self._biopax.tell()
-                if not self.silent:
+            for i, (ev, elem) in enumerate(self.bp):
+                # step the progressbar by the compressed bytes
+                # read since the last sample:
+                if not self.silent and not i % progress_sample:
+                    new_fpos = self._compressed_pos()
                     self.prg.step(new_fpos - self.fpos)
-                self.fpos = new_fpos
+                    self.fpos = new_fpos
                 self.next_elem = elem
                 self.next_event = ev
                 self.next_id = '%s@%s' % \
@@ -421,6 +471,121 @@ class BioPaxReader(session_mod.Logger):
         if not self.silent:
             self.prg.terminate()
 
+    def process_members(self):
+        """
+        Processes multiple files from an archive, each by a separate
+        parser, optionally in parallel processes, and merges the results
+        into the dicts of this object. The keys remain prefixed by the IDs
+        of the parsers of the individual files, these IDs are generated
+        here, hence they are unique across the processes.
+        This method should not be called directly,
+        ``BioPaxReader.process()`` calls it.
+        """
+        members = list(self.file_from_archive)
+        workers = min(
+            self.workers or settings.get('biopax_workers') or 1,
+            len(members),
+        )
+        path = (
+            self.biopax.fname
+                if isinstance(self.biopax, curl.FileOpener) else
+            self.biopax
+        )
+        parser_ids = []
+
+        while len(parser_ids) < len(members):
+
+            parser_id = common.gen_session_id()
+
+            if parser_id not in parser_ids and parser_id != self.parser_id:
+
+                parser_ids.append(parser_id)
+
+        jobs = [
+            (path, self.source, member, parser_id, self.cleanup_period)
+            for member, parser_id in zip(members, parser_ids)
+        ]
+
+        self._log(
+            'Processing %u files from `%s` in %u process%s.' % (
+                len(jobs),
+                path,
+                workers,
+                'es' if workers > 1 else '',
+            )
+        )
+
+        if not self.silent:
+            prg = progress.Progress(
+                len(jobs),
+                'Processing multiple BioPAX files',
+                1,
+                percent=False,
+            )
+
+        for result in self._process_members(jobs, workers):
+
+            for attr in self._result_attrs:
+                getattr(self, attr).update(result[attr])
+
+            if not self.silent:
+                prg.step()
+
+        if not self.silent:
+            prg.terminate()
+
+    def _process_members(self, jobs, workers):
+        """
+        Yields the results of processing files from an archive, in the
+        order of the files.
+        """
+
+        if workers > 1:
+
+            context = (
+                multiprocessing.get_context('fork')
+                    if 'fork' in multiprocessing.get_all_start_methods() else
+                None
+            )
+
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+            ) as executor:
+
+                futures = [
+                    executor.submit(_process_member, *job)
+                    for job in jobs
+                ]
+
+                for i, job in enumerate(jobs):
+
+                    # dropping the future releases its result
+                    # as soon as it has been merged
+                    future, futures[i] = futures[i], None
+
+                    try:
+
+                        yield future.result()
+
+                    except Exception:
+
+                        self._log(
+                            'Failed to process `%s` in a worker process, '
+                            'processing it in the main process: %s' % (
+                                job[2],
+                                traceback.format_exception(*sys.exc_info()),
+                            )
+                        )
+
+                        yield _process_member(*job)
+
+        else:
+
+            for job in jobs:
+
+                yield _process_member(*job)
+
     def cleanup_hook(self):
         """
         Removes the used elements to free up memory.
@@ -634,6 +799,28 @@ class BioPaxReader(session_mod.Logger):
             )
 
 
+def _process_member(path, source, member, parser_id, cleanup_period):
+    """
+    Processes one file from an archive, possibly in a worker process.
+    Returns the dicts holding the results.
+    """
+
+    parser = BioPaxReader(
+        path,
+        source,
+        cleanup_period=cleanup_period,
+        file_from_archive=member,
+        silent=True,
+    )
+    parser.parser_id = parser_id
+    parser.process(silent=True)
+
+    return dict(
+        (attr, getattr(parser, attr))
+        for attr in BioPaxReader._result_attrs
+    )
+
+
 class AttributeHandler(object):
     def __init__(self):
         pass
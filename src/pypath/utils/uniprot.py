@@ -34,6 +34,7 @@ import itertools
 
 import pypath.inputs.uniprot as uniprot_input
 import pypath.inputs.genecards as genecards_input
+import pypath.utils.uniprot_store as uniprot_store
 import pypath.share.common as common
 import pypath.share.settings as settings
 import pypath.core.entity as entity
@@ -67,8 +68,15 @@ class UniprotProtein(object):
 
 
     def load(self):
+        """
+        Retrieves the datasheet from the local store, or downloads it if
+        the store is not available or the ID is missing from it.
+        """
 
-        self.raw = uniprot_input.protein_datasheet(self.uniprot_id)
+        self.raw = (
+            uniprot_store.datasheet(self.uniprot_id) or
+            uniprot_input.protein_datasheet(self.uniprot_id)
+        )
 
 
     @property
@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+#  This file is part of the `pypath` python module
+#
+#  Copyright
+#  2014-2020
+#  EMBL, EMBL-EBI, Uniklinik RWTH Aachen, Heidelberg University
+#
+#  File author(s): Dénes Türei (turei.denes@gmail.com)
+#                  Nicolàs Palacio
+#                  Olga Ivanova
+#
+#  Distributed under the GPLv3 License.
+#  See accompanying file LICENSE.txt or copy at
+#      http://www.gnu.org/licenses/gpl-3.0.html
+#
+#  Website: http://pypath.omnipathdb.org/
+#
+
+"""
+Local store of UniProt datasheets. The UniProt flat file (e.g. the
+complete ``uniprot_sprot.dat.gz`` or a batch export of the REST API in
+text format) is ingested once into a file of compressed entries and an
+index of accessions with byte offsets. Datasheets are then retrieved
+from this store instead of downloading them one by one.
+"""
+
+from future.utils import iteritems
+
+import os
+import gzip
+import zlib
+import mmap
+import marshal
+
+import pypath.resources.urls as urls
+import pypath.share.curl as curl
+import pypath.share.session as session_mod
+import pypath.share.settings as settings
+import pypath.inputs.uniprot as uniprot_input
+
+_logger = session_mod.Logger(name = 'uniprot_store')
+_log = _logger._log
+
+STORE_VERSION = 1
+
+_stores = {}
+
+
+class UniprotDatasheetStore(session_mod.Logger):
+    """
+    Datasheets of UniProt entries in a local, indexed file.
+
+    The entries are compressed one by one and written consecutively into
+    the ``<name>.entries`` file, while the ``<name>.idx`` file maps each
+    primary and secondary accession to the offset and length of the
+    entry. Secondary accessions point to the entry which replaced them,
+    just like the datasheets served by UniProt for these accessions.
+
+    :param str name:
+        Name of the store, the files are named after this.
+    :param str path:
+        Directory of the store files. By default the
+        ``uniprot_datasheet_store_dir`` in the cache directory.
+    """
+
+    def __init__(self, name = 'uniprot_sprot', path = None):
+
+        session_mod.Logger.__init__(self, name = 'uniprot_store')
+
+        self.name = name
+        self.path = path or settings.get('uniprot_datasheet_store_dir')
+        self.entries_file = os.path.join(self.path, '%s.entries' % name)
+        self.index_file = os.path.join(self.path, '%s.idx' % name)
+        self._index = None
+        self._fp = None
+        self._mm = None
+
+
+    @property
+    def exists(self):
+
+        return (
+            os.path.exists(self.entries_file) and
+            os.path.exists(self.index_file)
+        )
+
+
+    def build(self, *sources):
+        """
+        Ingests one or more UniProt flat files into the store, replacing
+        its former contents.
+
+        :param str sources:
+            Paths or URLs of UniProt flat files, plain or gzip compressed.
+            By default the complete SwissProt.
+        """
+
+        sources = sources or (urls.urls['uniprot_basic']['sprot_dat'],)
+        os.makedirs(self.path, exist_ok = True)
+        self.close()
+
+        primary = {}
+        secondary = {}
+        tmp_entries = '%s.%u.tmp' % (self.entries_file, os.getpid())
+        tmp_index = '%s.%u.tmp' % (self.index_file, os.getpid())
+
+        with open(tmp_entries, 'wb') as out:
+
+            for source in sources:
+
+                self._log('Adding UniProt datasheets from `%s`.' % source)
+
+                for acs, entry in self._iter_entries(source):
+
+                    data = zlib.compress(entry)
+                    location = (out.tell(), len(data))
+                    out.write(data)
+                    primary[acs[0]] = location
+
+                    for ac in acs[1:]:
+
+                        secondary.setdefault(ac, location)
+
+        for ac, location in iteritems(secondary):
+
+            primary.setdefault(ac, location)
+
+        with open(tmp_index, 'wb') as fp:
+
+            fp.write(marshal.dumps((STORE_VERSION, primary)))
+
+        os.replace(tmp_entries, self.entries_file)
+        os.replace(tmp_index, self.index_file)
+
+        self._log(
+            'UniProt datasheet store `%s` built: %u accessions.' % (
+                self.name,
+                len(primary),
+            )
+        )
+
+
+    @staticmethod
+    def _open_source(source):
+
+        if not os.path.exists(source):
+
+            c = curl.Curl(
+                source,
+                large = True,
+                silent = False,
+                process = False,
+            )
+            source = c.cache_file_name
+
+        with open(source, 'rb') as fp:
+
+            gzipped = fp.read(2) == b'\x1f\x8b'
+
+        return gzip.open(source, 'rb') if gzipped else open(source, 'rb')
+
+
+    def _iter_entries(self, source):
+        """
+        Iterates the entries of a UniProt flat file.
+
+        :return:
+            Tuples of the accessions of the entry (the primary one first)
+            and the raw entry.
+        """
+
+        with self._open_source(source) as fp:
+
+            lines = []
+            acs = []
+
+            for line in fp:
+
+                if line.startswith(b'//'):
+
+                    if acs:
+
+                        yield acs, b''.join(lines)
+
+                    lines = []
+                    acs = []
+
+                    continue
+
+                lines.append(line)
+
+                if line.startswith(b'AC   '):
+
+                    acs.extend(
+                        ac.strip().decode('ascii')
+                        for ac in line[5:].split(b';')
+                        if ac.strip()
+                    )
+
+
+    def load(self):
+        """
+        Opens the store files, if they exist.
+        """
+
+        if self._index is not None or not self.exists:
+
+            return
+
+        with open(self.index_file, 'rb') as fp:
+
+            version, index = marshal.loads(fp.read())
+
+        if version != STORE_VERSION:
+
+            self._log(
+                'UniProt datasheet store `%s` has been built by an '
+                'incompatible version, please build it again.' % self.name
+            )
+            return
+
+        self._fp = open(self.entries_file, 'rb')
+        self._mm = (
+            mmap.mmap(self._fp.fileno(), 0, access = mmap.ACCESS_READ)
+                if os.path.getsize(self.entries_file) else
+            b''
+        )
+        self._index = index
+
+        self._log(
+            'UniProt datasheet store `%s` loaded: %u accessions.' % (
+                self.name,
+                len(index),
+            )
+        )
+
+
+    def close(self):
+
+        if self._mm:
+
+            self._mm.close()
+
+        if self._fp:
+
+            self._fp.close()
+
+        self._index = self._fp = self._mm = None
+
+
+    @property
+    def index(self):
+
+        self.load()
+
+        return self._index or {}
+
+
+    def entry(self, uniprot_id):
+        """
+        The raw text of the entry of one UniProt ID, None if it's not
+        in the store.
+        """
+
+        location = self.index.get(uniprot_id.strip())
+
+        if location is not None:
+
+            offset, length = location
+
+            return zlib.decompress(
+                self._mm[offset:offset + length]
+            ).decode('utf-8')
+
+
+    def datasheet(self, uniprot_id):
+        """
+        The datasheet of one UniProt ID in the same format as
+        ``pypath.inputs.uniprot.protein_datasheet`` returns it: a list of
+        tuples of tags and lines. None if the ID is not in the store.
+        """
+
+        entry = self.entry(uniprot_id)
+
+        if entry is not None:
+
+            return uniprot_input._redatasheet.findall(entry)
+
+
+    def __contains__(self, uniprot_id):
+
+        return uniprot_id in self.index
+
+
+    def __len__(self):
+
+        return len(self.index)
+
+
+    def __repr__(self):
+
+        return '<UniProt datasheet store `%s`: %s>' % (
+            self.name,
+            '%u accessions' % len(self) if self.exists else 'not built',
+        )
+
+
+def get_store(name = 'uniprot_sprot'):
+    """
+    Returns the datasheet store of this name, or None if the store does
+    not exist or it is disabled by the ``uniprot_datasheet_store``
+    setting.
+    """
+
+    if not settings.get('uniprot_datasheet_store'):
+
+        return None
+
+    key = (name, settings.get('uniprot_datasheet_store_dir'))
+
+    if key not in _stores:
+
+        _stores[key] = UniprotDatasheetStore(name = name)
+
+    store = _stores[key]
+
+    return store if store.exists else None
+
+
+def build(*sources, name = 'uniprot_sprot'):
+    """
+    Builds a datasheet store from UniProt flat files, by default from the
+    complete SwissProt.
+    """
+
+    store = UniprotDatasheetStore(name = name)
+    store.build(*sources)
+    _stores.pop((name, store.path), None)
+
+    return store
+
+
+def datasheet(uniprot_id, name = 'uniprot_sprot'):
+    """
+    The datasheet of one UniProt ID from the local store, or None if the
+    store does not exist or the ID is missing from it.
+    """
+
+    store = get_store(name = name)
+
+    if store is not None:
+
+        return store.datasheet(uniprot_id)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+#  This file is part of the `pypath` python module
+#  Load testing and latency benchmark for the web service.
+#
+#  Copyright
+#  2014-2020
+#  EMBL, EMBL-EBI, Uniklinik RWTH Aachen, Heidelberg University
+#
+#  File author(s): Dénes Türei (turei.denes@gmail.com)
+#                  Nicolàs Palacio
+#                  Olga Ivanova
+#
+#  Distributed under the GPLv3 License.
+#  See accompanying file LICENSE.txt or copy at
+#      http://www.gnu.org/licenses/gpl-3.0.html
+#
+#  Website: http://pypath.omnipathdb.org/
+#
+
+import sys
+import time
+
+from pypath.omnipath.server import benchmark
+
+# Usage: server-benchmark.py [concurrency] [n_requests] [size factor]
+#
+# The size factor scales the default table sizes
+# (`benchmark.DEFAULT_SIZES`), the results are written to a JSON file.
+
+if __name__ == '__main__':
+
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    factor = float(sys.argv[3]) if len(sys.argv) > 3 else 1.
+
+    bm = benchmark.ServerBenchmark(
+        sizes = {
+            table: int(size * factor)
+            for table, size in benchmark.DEFAULT_SIZES.items()
+        },
+        concurrency = concurrency,
+        n_requests = n_requests,
+        outfile = 'omnipath-server-benchmark-%s.json' % (
+            time.strftime('%Y%m%d-%H%M%S')
+        ),
+    )
+    bm.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+
+import pypath.share.common as common
+import pypath.core.annot as annot
+import pypath.core.common as core_common
+
+
+def _network_df():
+
+    return pd.DataFrame({
+        'id_a': ['P1', 'P2', 'P3', 'P4'],
+        'id_b': ['P2', 'P3', 'P1', 'P1'],
+        'type_a': 'protein',
+        'type_b': 'protein',
+        'directed': [True, False, True, False],
+        'effect': [1, 0, -1, 0],
+        'type': 'post_translational',
+        'sources': ['SIGNOR', 'SIGNOR', 'SPIKE', 'SPIKE'],
+    })
+
+
+def _annot_df():
+
+    return pd.DataFrame({
+        'category': ['ligand', 'receptor', 'receptor', 'ligand'],
+        'parent': ['ligand', 'receptor', 'receptor', 'ligand'],
+        'database': 'OmniPath',
+        'scope': 'generic',
+        'aspect': 'functional',
+        'source': 'composite',
+        'uniprot': ['P1', 'P2', 'P3', 'P4'],
+        'genesymbol': ['G1', 'G2', 'G3', 'G4'],
+        'entity_type': 'protein',
+        'consensus_score': 1,
+    })
+
+
+ANNOT_ARGS = {
+    'annot_args': {},
+    'annot_args_source': {},
+    'annot_args_target': {},
+}
+
+
+class TestNetworkDf(object):
+
+    def test_index_reused(self, monkeypatch):
+
+        built = []
+        NetworkDfIndex = core_common.NetworkDfIndex
+
+        class CountingIndex(NetworkDfIndex):
+
+            def __init__(self, df):
+
+                built.append(df)
+                NetworkDfIndex.__init__(self, df)
+
+        monkeypatch.setattr(core_common, 'NetworkDfIndex', CountingIndex)
+        # only logged; not compatible with recent pandas versions
+        monkeypatch.setattr(common, 'df_memory_usage', lambda df: '')
+
+        ca = annot.CustomAnnotation(build = False)
+        ca.df = _annot_df()
+        ca.register_network(_network_df())
+
+        first = ca.network_df(**ANNOT_ARGS)
+        second = ca.network_df(**ANNOT_ARGS, only_directed = True)
+
+        assert len(built) == 1
+        assert built[0] is ca.network
+        assert len(first) == 6
+        assert set(zip(second.id_a, second.id_b)) == {
+            ('P1', 'P2'),
+            ('P3', 'P1'),
+        }
+
+        ca.interclass_network = first
+        ca.network_df(**ANNOT_ARGS)
+        ca.network_df(**ANNOT_ARGS, only_directed = True)
+
+        assert len(built) == 2
+        assert built[1] is first
+
+        ca.register_network(_network_df())
+        ca.network_df(**ANNOT_ARGS)
+
+        assert len(built) == 3
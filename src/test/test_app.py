@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+
+from pypath.omnipath import app
+
+
+def _build_dataset(self, dataset, ncbi_tax_id = 9606, add_network_df = True):
+
+    with open(self.pickle_path(dataset, ncbi_tax_id), 'wb') as fp:
+
+        pickle.dump(dataset, fp)
+
+
+class TestDatabaseManager(object):
+
+    def test_build_parallel(self, tmp_path, monkeypatch):
+
+        # the worker processes are forked, they inherit the patched methods
+        monkeypatch.setattr(
+            app.DatabaseManager,
+            'build_dataset',
+            _build_dataset,
+        )
+        monkeypatch.setattr(
+            app.DatabaseManager,
+            'load_dataset',
+            lambda self, dataset, **kwargs: None,
+        )
+        manager = app.DatabaseManager(
+            rebuild = True,
+            datasets = ['curated', 'enz_sub'],
+            dependencies = {'enz_sub': ('curated',)},
+            pickle_dir = str(tmp_path),
+            timestamp_dirs = False,
+        )
+        manager.build_parallel(workers = 2)
+
+        assert manager.build_timeline.keys() == {'curated', 'enz_sub'}
+
+        rebuilt = []
+        loaded = []
+        monkeypatch.setattr(
+            manager,
+            'build_dataset',
+            lambda dataset, **kwargs: rebuilt.append(dataset),
+        )
+        monkeypatch.setattr(
+            manager,
+            'load_dataset',
+            lambda dataset, **kwargs: loaded.append(dataset),
+        )
+        manager.ensure_dataset('enz_sub')
+
+        assert not rebuilt
+        assert loaded == ['curated', 'enz_sub']
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import functools
+import threading
+import http.server
+
+import pytest
+
+import pypath.share.curl as curl
+import pypath.share.settings as settings
+
+
+@pytest.fixture
+def fixtures_dir(tmp_path, monkeypatch):
+
+    path = tmp_path / 'fixtures'
+    monkeypatch.setattr(settings.settings, 'curl_fixtures_dir', str(path))
+
+    return path
+
+
+class TestCurlReplay(object):
+
+    def test_replay(self, tmp_path, fixtures_dir):
+
+        url = 'https://omnipathdb.org/replay_test'
+        get = {'genesymbols': 'yes'}
+
+        with curl.replay_on(), curl.cache_off():
+
+            c = curl.Curl(url, get = get, cache_dir = str(tmp_path))
+
+            assert c.download_failed
+            assert c.status == 404
+
+            body, meta = c.fixture_paths()
+            fixtures_dir.mkdir()
+
+            with open(body, 'w') as fp:
+
+                fp.write('a\tb\n1\t2\n')
+
+            with open(meta, 'w') as fp:
+
+                json.dump({'resp_headers': [], 'status': 200}, fp)
+
+            c = curl.Curl(url, get = get, cache_dir = str(tmp_path))
+
+        assert c.status == 200
+        assert c.result == 'a\tb\n1\t2\n'
+
+
+    def test_record_replay(self, tmp_path, fixtures_dir):
+
+        (tmp_path / 'www').mkdir()
+        (tmp_path / 'www' / 'table.tsv').write_text('c\td\n3\t4\n')
+        server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0),
+            functools.partial(
+                http.server.SimpleHTTPRequestHandler,
+                directory = str(tmp_path / 'www'),
+            ),
+        )
+        threading.Thread(target = server.serve_forever, daemon = True).start()
+        url = 'http://127.0.0.1:%u/table.tsv' % server.server_address[1]
+
+        try:
+
+            with curl.record_on(), curl.cache_off():
+
+                recorded = curl.Curl(url, cache_dir = str(tmp_path / 'c1'))
+
+        finally:
+
+            server.shutdown()
+            server.server_close()
+
+        # the server is not available any more
+        with curl.replay_on(), curl.cache_off():
+
+            replayed = curl.Curl(url, cache_dir = str(tmp_path / 'c2'))
+
+        assert recorded.result == 'c\td\n3\t4\n'
+        assert not replayed.download_failed
+        assert replayed.status == 200
+        assert replayed.result == recorded.result
+        assert replayed.fixture_paths() == recorded.fixture_paths()
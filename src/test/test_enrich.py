@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import types
+
+import numpy as np
+import pytest
+
+scipy_stats = pytest.importorskip('scipy.stats')
+
+import pypath.utils.enrich as enrich
+
+
+@pytest.fixture(scope = 'module')
+def engine():
+
+    rng = np.random.default_rng(7)
+    matrix = rng.random((300, 40)) < .15
+    matrix[:20, 0] = True
+
+    return enrich.Enrichment(
+        matrix = matrix,
+        entities = ['P%03u' % i for i in range(300)],
+        terms = ['T%02u' % i for i in range(40)],
+    )
+
+
+class TestEnrichment(object):
+
+    def test_fisher(self, engine):
+
+        foreground = {'P%03u' % i for i in range(0, 60)}
+        result = engine.test(foreground, correction = 'bonferroni')
+        annotated = np.asarray(engine.matrix.sum(axis = 1)).ravel() > 0
+        pop_size = int(annotated.sum())
+        fg_size = sum(
+            annotated[int(e[1:])] for e in foreground
+        )
+
+        assert result.iloc[0].term == 'T00'
+        assert (result.pop_size == pop_size).all()
+        assert (result.set_size == fg_size).all()
+
+        for rec in result.itertuples():
+
+            _, pvalue = scipy_stats.fisher_exact(
+                (
+                    (rec.set_count, rec.set_size - rec.set_count),
+                    (
+                        rec.pop_count - rec.set_count,
+                        pop_size - rec.pop_count -
+                        rec.set_size + rec.set_count,
+                    ),
+                ),
+                alternative = 'greater',
+            )
+
+            assert np.isclose(rec.pvalue, pvalue)
+            assert np.isclose(rec.padj, min(pvalue * 40, 1.))
+
+
+    def test_batch(self, engine):
+
+        rng = np.random.default_rng(3)
+        queries = dict(
+            (
+                'q%u' % i,
+                set(rng.choice(engine.entities, 50, replace = False)),
+            )
+            for i in range(25)
+        )
+        background = set(engine.entities[:250])
+
+        batch = engine.batch(queries, background = background)
+
+        for label, query in queries.items():
+
+            single = engine.test(query, background = background)
+            this = batch[batch['query'] == label].drop(columns = 'query')
+
+            assert np.allclose(
+                this.pvalue.values,
+                single.pvalue.values,
+            )
+            assert list(this.term) == list(single.term)
+
+
+    def test_correct(self):
+
+        pvalues = np.array([.01, .04, .03, .2])
+        # reference values by statsmodels `multipletests`
+        bh = np.array([.04, .05333333, .05333333, .2])
+        holm = np.array([.04, .09, .09, .2])
+
+        assert np.allclose(enrich.correct(pvalues, 'fdr_bh'), bh)
+        assert np.allclose(enrich.correct(pvalues, 'holm'), holm)
+        assert np.allclose(
+            enrich.correct(pvalues[:2], 'fdr_bh', n_tests = 4),
+            np.array([.04, .08]),
+        )
+
+
+    def test_annotation_table(self):
+
+        # names of the same length make a 2D array
+        table = types.SimpleNamespace(
+            ensure_array = lambda: None,
+            names = np.array([
+                ('CellPhoneDB', 'receptor'),
+                ('CellPhoneDB', 'ligand'),
+                ('Ramilowski', 'ligand'),
+            ]),
+            data = np.array([
+                [True, False, False],
+                [True, False, True],
+                [False, True, True],
+                [False, False, False],
+            ]),
+            reference_set = np.array(['P1', 'P2', 'P3', 'P4']),
+        )
+        engine = enrich.Enrichment.from_annotation_table(table)
+        result = engine.test({'P1', 'P2'}).set_index('term')
+
+        assert list(engine.terms) == [
+            'CellPhoneDB__receptor',
+            'CellPhoneDB__ligand',
+            'Ramilowski__ligand',
+        ]
+        assert result.loc['CellPhoneDB__receptor', 'name'] == (
+            'CellPhoneDB: receptor'
+        )
+        assert result.loc['CellPhoneDB__receptor', 'set_count'] == 2
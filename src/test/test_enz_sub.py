@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import collections
+
+import pytest
+
+import pypath.core.entity as entity
+import pypath.core.evidence as evidence
+import pypath.core.enz_sub as enz_sub
+import pypath.internals.intera as intera
+import pypath.internals.resource as resource
+
+
+@pytest.fixture
+def records(monkeypatch):
+
+    # avoid loading the ID translation tables for the labels
+    monkeypatch.setattr(
+        entity.Entity,
+        'set_label',
+        lambda self: setattr(self, 'label', self.identifier),
+    )
+
+    res = resource.EnzymeSubstrateResource(
+        name = 'PhosphoSite',
+        input_method = None,
+    )
+    records = collections.defaultdict(list)
+
+    for enzyme, substrate, offset, isoform, mutated in (
+        ('P06493', 'P04637', 315, 1, False),
+        ('P06493', 'P04637', 315, 2, True),
+        ('P45983', 'P05412', 63, 1, False),
+    ):
+
+        evidences = evidence.Evidences((
+            evidence.Evidence(res, references = ['12345', '23456']),
+        ))
+        residue = intera.Residue(
+            offset,
+            'S',
+            substrate,
+            isoform = isoform,
+            mutated = mutated,
+        )
+        motif = intera.Motif(
+            substrate,
+            offset - 7,
+            offset + 7,
+            instance = 'AAAAAAASPAAAAAA',
+            isoform = isoform,
+        )
+        ptm = intera.Ptm(
+            substrate,
+            motif = motif,
+            residue = residue,
+            typ = 'phosphorylation',
+            evidences = evidences,
+            isoform = isoform,
+        )
+        ptm.add_isoform(3)
+        domain = intera.Domain(
+            enzyme,
+            domain = 'PF00069',
+            start = 4,
+            end = 287,
+            isoform = isoform,
+        )
+        domain.pdbs = {'1HCK': {'A'}}
+        dommot = intera.DomainMotif(
+            domain = domain,
+            ptm = ptm,
+            evidences = evidences,
+            pdbs = {'1HCK'} if isoform == 1 else None,
+        )
+        dommot.pnetw_score = .8 if mutated else None
+        dommot.kinase_family = 'CMGC'
+        records[(domain.protein, ptm.protein)].append(dommot)
+
+    return records
+
+
+def _attrs(dommot):
+
+    ptm = dommot.ptm
+    domain = dommot.domain
+
+    return (
+        domain.protein.identifier,
+        domain.domain,
+        domain.domain_id_type,
+        domain.start,
+        domain.end,
+        domain.isoform,
+        domain.pdbs,
+        ptm.protein.identifier,
+        ptm.typ,
+        ptm.isoform,
+        ptm.isoforms,
+        ptm.residue.name,
+        ptm.residue.number,
+        ptm.residue.isoform,
+        ptm.residue.mutated,
+        ptm.motif.start,
+        ptm.motif.end,
+        ptm.motif.instance,
+        ptm.motif.isoform,
+        dommot.pdbs,
+        dommot.pnetw_score,
+        dommot.kinase_family,
+        sorted(
+            (ev.resource.name, sorted(r.pmid for r in ev.references))
+            for ev in dommot.evidences
+        ),
+    )
+
+
+class TestEnzymeSubstrateTable(object):
+
+    def test_records(self, records):
+
+        table = enz_sub.EnzymeSubstrateTable.from_records(
+            dommot
+            for dommots in records.values()
+            for dommot in dommots
+        )
+        pairs = enz_sub.EnzymeSubstratePairs(table)
+
+        assert len(pairs) == len(records)
+
+        for key, dommots in records.items():
+
+            assert (
+                [_attrs(dommot) for dommot in pairs[key]] ==
+                [_attrs(dommot) for dommot in dommots]
+            )
+
+        subset = table.by_substrate('P04637')
+
+        assert (
+            [_attrs(dommot) for dommot in subset] ==
+            [_attrs(dommot) for dommot in records[list(records)[0]]]
+        )
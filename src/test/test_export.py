@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+import pypath.share.common as common
+import pypath.utils.mapping as mapping
+import pypath.core.evidence as evidence
+import pypath.core.interaction as interaction
+import pypath.internals.resource as resource
+import pypath.resources.network as netres
+import pypath.omnipath.export as export
+
+
+def _interactions_df_by_edge(exp):
+    """
+    Creates the same data frame as ``Export.webservice_interactions_df``
+    processing each edge and direction one by one by the methods of
+    ``Interaction``.
+    """
+
+    sets = exp._webservice_resource_sets()
+    sources_omnipath = sets['omnipath']
+    sources_extra_directions = sets['extra_directions']
+    sources_kinase_extra = sets['kinase_extra']
+    sources_ligrec_extra = sets['ligrec_extra']
+    sources_pathway_extra = sets['pathway_extra']
+    sources_mirna = sets['mirna']
+    sources_tf_target = sets['tf_target']
+    sources_dorothea = {'DoRothEA'}
+
+    exp.make_df(
+        unique_pairs = False,
+        extra_node_attrs = {
+            'ncbi_tax_id': 'taxon',
+            'entity_type': 'entity_type',
+        },
+        extra_edge_attrs = {
+            'omnipath': lambda e, d: (
+                (
+                    bool(
+                        e.get_resources(direction = d) &
+                        sources_omnipath
+                    ) or
+                    (
+                        bool(
+                            e.get_resources(direction = 'undirected') &
+                            sources_omnipath
+                        ) and
+                        bool(
+                            e.get_resources(direction = d) &
+                            sources_extra_directions
+                        )
+                    )
+                ) and (
+                    'post_translational' in
+                    e.get_interaction_types(direction = d)
+                )
+            ),
+            'kinaseextra': lambda e, d: (
+                bool(
+                    e.get_resources(direction = d) &
+                    sources_kinase_extra
+                ) and (
+                    'post_translational' in
+                    e.get_interaction_types(direction = d)
+                )
+            ),
+            'ligrecextra': lambda e, d: (
+                bool(
+                    e.get_resources(direction = d) &
+                    sources_ligrec_extra
+                ) and (
+                    'post_translational' in
+                    e.get_interaction_types(direction = d)
+                )
+            ),
+            'pathwayextra': lambda e, d: (
+                bool(
+                    e.get_resources(direction = d) &
+                    sources_pathway_extra
+                ) and (
+                    'post_translational' in
+                    e.get_interaction_types(direction = d)
+                )
+            ),
+            'mirnatarget': lambda e, d: (
+                bool(
+                    e.get_resources(direction = d) &
+                    sources_mirna
+                ) and (
+                    'post_transcriptional' in
+                    e.get_interaction_types(direction = d)
+                )
+            ),
+            'dorothea': lambda e, d: (
+                bool(
+                    e.get_resource_names(
+                        direction = d,
+                        interaction_type = 'transcriptional'
+                    ) &
+                    sources_dorothea
+                )
+            ),
+            'tf_target': lambda e, d: (
+                bool(
+                    e.get_resources(
+                        direction = d,
+                        interaction_type = 'transcriptional'
+                    ) &
+                    sources_tf_target
+                )
+            ),
+            'lncrna_mrna': lambda e, d: (
+                'lncrna_post_transcriptional' in
+                e.get_interaction_types(direction = d)
+            ),
+            'tf_mirna': lambda e, d: (
+                'mirna_transcriptional' in
+                e.get_interaction_types(direction = d)
+            ),
+            'dorothea_curated': 'dorothea_curated',
+            'dorothea_chipseq': 'dorothea_chipseq',
+            'dorothea_tfbs':    'dorothea_tfbs',
+            'dorothea_coexp':   'dorothea_coexp',
+            'dorothea_level':   'dorothea_level',
+            'type': lambda e, d: (
+                list(e.get_interaction_types(direction = d))[0]
+            ),
+            'curation_effort': lambda e, d: (
+                e.count_curation_effort(direction = d) + (
+                    e.count_curation_effort(direction = 'undirected')
+                        if isinstance(d, tuple) else
+                    0
+                )
+            ),
+        }
+    )
+
+
+@pytest.fixture
+def network(monkeypatch):
+
+    # avoid loading the ID translation tables for the labels
+    monkeypatch.setattr(mapping, 'label', lambda name, *args, **kwargs: name)
+    # only for the log messages, it does not work with recent pandas
+    monkeypatch.setattr(common, 'df_memory_usage', lambda df: '')
+
+    rng = random.Random(0)
+    pool = []
+
+    for resource_set in (
+        'omnipath',
+        'extra_directions',
+        'ptm_misc',
+        'ligand_receptor',
+        'pathway_noref',
+        'mirna_target',
+        'transcription_onebyone',
+    ):
+
+        pool.extend(list(getattr(netres, resource_set).values())[:6])
+
+    for name in ('DoRothEA', 'Resource1', 'Resource2'):
+
+        for interaction_type in (
+            'post_translational',
+            'transcriptional',
+            'post_transcriptional',
+        ):
+
+            pool.append(
+                resource.NetworkResource(
+                    name,
+                    interaction_type = interaction_type,
+                    data_model = 'activity_flow',
+                )
+            )
+
+    for res in pool[:10]:
+
+        pool.append(
+            resource.NetworkResource(
+                res.name,
+                interaction_type = res.interaction_type,
+                data_model = res.data_model,
+                via = rng.choice(['SIGNOR', 'Other']),
+            )
+        )
+
+    def add_evidence(ia, res, references, direction, effect = 0):
+
+        ia.add_evidence(
+            evidence.Evidences([evidence.Evidence(res, references)]),
+            direction = direction,
+            effect = effect,
+        )
+
+    proteins = ['P%03u' % i for i in range(40)]
+    interactions = {}
+
+    for _ in range(300):
+
+        a, b = rng.choice(proteins), rng.choice(proteins)
+        key = tuple(sorted((a, b)))
+
+        if key not in interactions:
+
+            interactions[key] = interaction.Interaction(a, b)
+            add_evidence(
+                interactions[key],
+                rng.choice(pool[:40]),
+                ['1'],
+                'undirected',
+            )
+
+        ia = interactions[key]
+
+        for _ in range(rng.randint(1, 3)):
+
+            res = rng.choice(pool)
+            direction = rng.choice([(a, b), (b, a), 'undirected'])
+
+            if res.via:
+
+                add_evidence(ia, rng.choice(pool[:40]), ['2'], direction)
+
+            add_evidence(
+                ia,
+                res,
+                [str(rng.randint(1, 60)) for _ in range(rng.randint(0, 3))],
+                direction,
+                effect = (
+                    0
+                        if direction == 'undirected' else
+                    rng.choice([0, 1, -1])
+                ),
+            )
+
+        if rng.random() < .1:
+
+            ia.attrs['dorothea_level'] = {rng.choice('ABCDE')}
+            ia.attrs['dorothea_curated'] = rng.choice([True, False])
+
+    return list(interactions.values())
+
+
+class TestExport(object):
+
+    def test_webservice_interactions_df(self, network):
+
+        by_edge = export.Export(network = network)
+        _interactions_df_by_edge(by_edge)
+        grouped = export.Export(network = network)
+        grouped.webservice_interactions_df()
+
+        assert len(grouped.df) > 300
+        assert list(grouped.df.columns) == list(by_edge.df.columns)
+        assert (grouped.df.dtypes == by_edge.df.dtypes).all()
+        assert (
+            grouped.df.to_csv(sep = '\t', index = False) ==
+            by_edge.df.to_csv(sep = '\t', index = False)
+        )
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import collections
+
+import numpy as np
+
+import pypath.inputs.main as dataio
+import pypath.utils.go as go
+
+
+TERMS = {
+    'C': {'GO:0000001': 'cell part', 'GO:0000002': 'membrane'},
+    'F': {'GO:0000003': 'binding', 'GO:0000004': 'kinase activity'},
+    'P': {'GO:0000005': 'signaling', 'GO:0000006': 'régulation'},
+}
+RELATIONS = (
+    ('GO:0000002', 'GO:0000001', 'is_a'),
+    ('GO:0000004', 'GO:0000003', 'is_a'),
+    ('GO:0000006', 'GO:0000005', 'regulates'),
+)
+ANNOTATIONS = {
+    'C': {'P00533': {'GO:0000002'}},
+    'F': {'P00533': {'GO:0000004'}, 'Q15796': {'GO:0000003'}},
+    'P': {'Q15796': {'GO:0000006', 'GO:0009999'}},
+}
+
+
+class TestGOStore(object):
+
+    def test_store(self, tmp_path, monkeypatch):
+
+        ancestors = collections.defaultdict(set)
+        descendants = collections.defaultdict(set)
+
+        for child, parent, relation in RELATIONS:
+
+            ancestors[child].add((parent, relation))
+            descendants[parent].add((child, relation))
+
+        annotations = ANNOTATIONS
+        monkeypatch.setattr(
+            dataio,
+            'go_annotations_goa',
+            lambda organism: dict(
+                (asp, collections.defaultdict(set, annot))
+                for asp, annot in annotations.items()
+            ),
+        )
+        store_file = str(tmp_path / 'goa.gostore')
+
+        def build():
+
+            return go.GOAnnotation(
+                ontology = go.GeneOntology(
+                    terms = TERMS,
+                    ancestors = ancestors,
+                    descendants = descendants,
+                ),
+                use_pickle_cache = False,
+                store_file = store_file,
+                use_store = True,
+            )
+
+        built = build()
+        stored = go.GOAnnotation(store_file = store_file, use_store = True)
+
+        assert built._store is None
+        assert stored._store is not None
+        assert stored.get_annots_ancestors('P00533') == {
+            'GO:0000001',
+            'GO:0000002',
+            'GO:0000003',
+            'GO:0000004',
+        }
+        assert stored.get_annot('Q15796', 'P') == {'GO:0000006', 'GO:0009999'}
+        assert stored.get_annot('Q99999', 'P') == set()
+        assert stored.select('GO:0000003') == {'P00533', 'Q15796'}
+        assert (
+            stored.select('cell part OR signaling') ==
+            built.select('cell part OR signaling') ==
+            {'P00533', 'Q15796'}
+        )
+        assert stored.ontology.get_name('GO:0000006') == 'régulation'
+        assert stored.ontology.get_term('kinase activity') == 'GO:0000004'
+        assert stored.ontology.get_aspect('GO:0000002') == 'C'
+        assert stored.ontology.ancestors['GO:0000006'] == {
+            ('GO:0000005', 'regulates'),
+        }
+        assert stored.ontology.get_all_descendants('GO:0000001') == {
+            'GO:0000001',
+            'GO:0000002',
+        }
+        assert dict(stored.ontology.name) == dict(built.ontology.name)
+        # the matrices are views of the memory mapped arrays
+        assert np.shares_memory(
+            stored._all_full.indices,
+            stored._store.arrays['all_full.indices'],
+        )
+
+        # without the cache the annotations are loaded again
+        # and the store is updated
+        annotations = dict(ANNOTATIONS, C = {'Q99999': {'GO:0000001'}})
+        rebuilt = build()
+        updated = go.GOAnnotation(store_file = store_file, use_store = True)
+
+        assert rebuilt._store is None
+        assert rebuilt.get_annot('Q99999', 'C') == {'GO:0000001'}
+        assert updated._store is not None
+        assert updated.get_annot('Q99999', 'C') == {'GO:0000001'}
+        assert updated.get_annot('P00533', 'C') == set()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pypath.formats.mitab as mitab
+
+
+LINES = [
+    '#ID(s) interactor A\tID(s) interactor B\n',
+    '\t'.join((
+        'uniprotkb:P04637',
+        'uniprotkb:Q00987-2',
+        '-',
+        '-',
+        '-',
+        '-',
+        'psi-mi:"MI:0018"(two hybrid)',
+        'Smith et al. (2005)',
+        'pubmed:10542231|imex:IM-1',
+        'taxid:9606(human)|taxid:9606(Homo sapiens)',
+        'taxid:9606(human)',
+        'psi-mi:"MI:0915"(physical association)',
+        'psi-mi:"MI:0469"(IntAct)',
+        'intact:EBI-1',
+        'intact-miscore:0.56',
+    )) + '\n',
+    '\t'.join((
+        'uniprotkb:P00533',
+        'chebi:"CHEBI:15422"',
+        '-',
+        '-',
+        '-',
+        '-',
+        'psi-mi:"MI:0096"(pull down)',
+        '-',
+        'pubmed:1',
+        'taxid:10090(mouse)',
+        'taxid:10090(mouse)',
+    )) + '\n',
+]
+
+
+class TestMitab(object):
+
+    def test_parse_field(self):
+
+        assert mitab.parse_field('-') == ()
+        assert mitab.parse_field('psi-mi:"MI:0018"(two hybrid)|pubmed:1') == (
+            mitab.MitabToken('psi-mi', 'MI:0018', 'two hybrid'),
+            mitab.MitabToken('pubmed', '1', None),
+        )
+        assert mitab.parse_field('psi-mi:"a|b"(x)')[0].value == 'a|b'
+
+    def test_reader(self):
+
+        records = list(mitab.MitabReader(LINES))
+
+        assert len(records) == 2
+        assert records[0].id_b[0].value == 'Q00987-2'
+        assert records[1].id_b[0].value == 'CHEBI:15422'
+        assert records[1].confidence == ()
+
+        records = list(
+            mitab.MitabReader(
+                LINES,
+                columns = ('id_a', 'expansion'),
+                organism = 9606,
+                methods = {'two hybrid'},
+            )
+        )
+
+        assert len(records) == 1
+        assert records[0].id_a[0].value == 'P04637'
+        assert records[0].expansion == ()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import gc
+import weakref
+
+import pandas as pd
+import pytest
+
+import pypath.core.common as core_common
+
+
+def _network_df():
+
+    return pd.DataFrame({
+        'id_a': ['P1', 'P2', 'P3', 'P4'],
+        'id_b': ['P2', 'P3', 'P1', 'P1'],
+        'type_a': 'protein',
+        'type_b': 'protein',
+        'directed': [True, False, True, False],
+        'effect': [1, 0, -1, 0],
+        'type': 'post_translational',
+        'sources': ['SIGNOR', 'SIGNOR', 'SPIKE', 'SPIKE'],
+    })
+
+
+class TestFilterNetworkDf(object):
+
+    def test_filter(self):
+
+        df = _network_df()
+        result = core_common.filter_network_df(df, source_entities = 'P1')
+
+        # the undirected P4-P1 interaction is included in both orientations
+        assert list(zip(result.id_a, result.id_b)) == [
+            ('P1', 'P2'),
+            ('P1', 'P4'),
+        ]
+        assert list(
+            core_common.filter_network_df(df, resource = 'SPIKE').id_a
+        ) == ['P3', 'P4', 'P1']
+
+
+    def test_release(self):
+
+        df = _network_df()
+        ref = weakref.ref(df)
+        core_common.filter_network_df(df, resource = 'SIGNOR')
+        del df
+        gc.collect()
+
+        assert ref() is None
+
+
+    def test_modified(self):
+
+        df = _network_df()
+        df_index = core_common.NetworkDfIndex(df)
+        core_common.filter_network_df(df, resource = 'SIGNOR')
+        core_common.filter_network_df(
+            df,
+            resource = 'SIGNOR',
+            df_index = df_index,
+        )
+        df.loc[0, 'sources'] = 'SPIKE'
+
+        assert list(
+            core_common.filter_network_df(df, resource = 'SIGNOR').id_a
+        ) == ['P2', 'P3']
+
+        with pytest.raises(ValueError):
+
+            core_common.filter_network_df(
+                _network_df(),
+                resource = 'SIGNOR',
+                df_index = df_index,
+            )
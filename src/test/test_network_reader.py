@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+import pypath.share.settings as settings
+import pypath.utils.mapping as mapping
+import pypath.core.network as network
+import pypath.internals.input_formats as input_formats
+
+
+INPUTS = (
+    {'references': (3, ';'), 'header': True},
+    {
+        'references': (3, ';'),
+        'sign': (2, 'activation', 'inhibition', ';'),
+        'ncbi_tax_id': {'col': 4, 'include': {9606}},
+        'resource': (5, '|'),
+        'positive_filters': [(6, 'direct')],
+    },
+    {
+        'references': 3,
+        'is_directed': (6, ['direct', 'x']),
+        'ncbi_tax_id': {
+            'A': {'col': 4, 'dict': {'9606': 9606, '10090': 10090}},
+            'B': {'col': 4, 'dict': {'9606': 9606}, 'exclude': {10090}},
+        },
+        'negative_filters': [(2, ['binding', 'inhibition'], ';')],
+        'resource': 5,
+        'extra_edge_attrs': {'kind': 6, 'effect': (2, ';')},
+        'mark_source': 'source',
+    },
+)
+
+
+@pytest.fixture
+def network_file(tmp_path):
+
+    rng = random.Random(0)
+    lines = ['id_a\tid_b\teffect\trefs\ttaxon\tresource\tkind\n']
+
+    for _ in range(300):
+
+        lines.append('\t'.join((
+            ' P%u ' % rng.randint(0, 50),
+            'Q%u' % rng.randint(0, 50),
+            rng.choice(['activation', 'inhibition', 'binding', '']),
+            ';'.join(
+                str(rng.randint(1, 3000))
+                for _ in range(rng.randint(0, 3))
+            ),
+            rng.choice(['9606', '10090', '7227']),
+            rng.choice(['A', 'B', 'A|C', 'NAME']),
+            rng.choice(['direct', 'indirect', 'x']),
+        )) + '\n')
+
+        if rng.random() < .05:
+
+            lines.append('\n')
+
+    # the row by row reader skips the last line if it is one character
+    lines.append('y')
+    path = tmp_path / 'network.tsv'
+    path.write_text(''.join(lines))
+
+    return str(path)
+
+
+def _edges(edge_list):
+
+    return [
+        sorted(
+            (
+                key,
+                sorted(
+                    (
+                        ev.resource.name,
+                        ev.resource.via,
+                        sorted(ref.pmid for ref in ev.references),
+                    )
+                    for ev in value
+                )
+                    if key == 'evidences' else
+                sorted(str(v) for v in value)
+                    if key in ('source', 'references') else
+                value,
+            )
+            for key, value in edge.items()
+        )
+        for edge in edge_list
+    ]
+
+
+class TestNetworkReader(object):
+
+    @pytest.mark.parametrize('param', INPUTS)
+    def test_columnar(self, network_file, tmp_path, monkeypatch, param):
+
+        monkeypatch.setattr(
+            mapping,
+            'map_name',
+            lambda name, *args, **kwargs: {name},
+        )
+        networkinput = input_formats.NetworkInput(
+            name = 'NAME',
+            input = network_file,
+            separator = '\t',
+            **param
+        )
+        edges = {}
+
+        for columnar in (False, True):
+
+            monkeypatch.setattr(
+                settings.settings,
+                'network_columnar_reader',
+                columnar,
+            )
+            net = network.Network()
+            net.cache_dir = str(tmp_path)
+            net._read_resource(networkinput, reread = True)
+            assert (net._read_table(networkinput) is not None) == columnar
+            edges[columnar] = _edges(net.edge_list_mapped)
+
+        assert edges[False]
+        assert edges[True] == edges[False]
+
+
+    def test_remote_fallback(self, network_file, tmp_path, monkeypatch):
+
+        opened = []
+
+        class Curl(object):
+
+            def __init__(self, url, *args, **kwargs):
+
+                opened.append(url)
+                self.type = curl_type
+                self.fileobj = open(network_file, 'rb')
+
+        monkeypatch.setattr(network.curl, 'Curl', Curl)
+        monkeypatch.setattr(
+            mapping,
+            'map_name',
+            lambda name, *args, **kwargs: {name},
+        )
+        networkinput = input_formats.NetworkInput(
+            name = 'NAME',
+            input = 'http://localhost/network.tsv',
+            separator = '\t',
+            **INPUTS[0]
+        )
+        edges = {}
+
+        # the plain file is read by the columnar reader, the other one
+        # falls back to the row by row reader without downloading again
+        for curl_type in ('plain', 'gz'):
+
+            opened = []
+            net = network.Network()
+            net.cache_dir = str(tmp_path)
+            net._read_resource(networkinput, reread = True, redownload = True)
+            edges[curl_type] = _edges(net.edge_list_mapped)
+
+            assert len(opened) == 1
+
+        assert edges['plain']
+        assert edges['gz'] == edges['plain']
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import pypath.share.settings as settings
+import pypath.formats.obo as obo
+
+
+OBO = (
+    'format-version: 1.2\n'
+    '\n'
+    '[Term]\n'
+    'id: GO:0000001\n'
+    'name: mitochondrion_inheritance\n'
+    'namespace: biological_process\n'
+    'def: "The distribution of mitochondria." [GOC:mcc]\n'
+    'is_a: GO:0048308 ! organelle inheritance\n'
+    'is_a: GO:0048311 ! mitochondrion distribution\n'
+    'synonym: "mitochondrial inheritance" EXACT []\n'
+    '\n'
+    '[Typedef]\n'
+    'id: part_of\n'
+    'name: part_of\n'
+    'is_transitive: true\n'
+    '\n'
+    '[Term]\n'
+    'id: GO:0000002\n'
+    'name: last\n'
+    'is_a: GO:0000001 ! mitochondrion inheritance'
+)
+
+
+@pytest.fixture
+def obo_file(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(
+        settings.settings,
+        'obo_cache_dir',
+        str(tmp_path / 'cache'),
+    )
+    path = tmp_path / 'test.obo'
+    path.write_text(OBO)
+
+    return str(path)
+
+
+def _read(obo_file, **kwargs):
+
+    reader = obo.Obo(obo_file, cache = True, **kwargs)
+
+    return list(reader), reader._cache_file
+
+
+class TestObo(object):
+
+    def test_parse(self, obo_file):
+
+        records = _read(obo_file)[0]
+        V = obo.OboValue
+
+        assert [(r.stanza, r.id.value, r.name.value) for r in records] == [
+            ('Term', 'GO:0000001', 'mitochondrion_inheritance'),
+            ('Typedef', 'part_of', 'part_of'),
+            ('Term', 'GO:0000002', 'last'),
+        ]
+        assert records[0].namespace == V('biological_process')
+        assert records[0].definition == V(
+            'The distribution of mitochondria.',
+            '[GOC:mcc]',
+        )
+        assert records[0].attrs == {
+            'is_a': {
+                V('GO:0048308', comment = 'organelle inheritance'),
+                V('GO:0048311', comment = 'mitochondrion distribution'),
+            },
+            'synonym': {V('mitochondrial inheritance', 'EXACT []')},
+        }
+        assert records[1].attrs == {'is_transitive': {V('true')}}
+        assert records[1].definition is None
+        # the last line of the file has no line break
+        assert records[2].attrs == {
+            'is_a': {V('GO:0000001', comment = 'mitochondrion inheritance')},
+        }
+
+
+    def test_tags(self, obo_file):
+
+        records = _read(obo_file, tags = {'is_a'})[0]
+
+        assert [set(r.attrs) for r in records] == [{'is_a'}, set(), {'is_a'}]
+        assert records[0].definition.value == (
+            'The distribution of mitochondria.'
+        )
+        assert records[0].namespace.value == 'biological_process'
+
+
+    def test_cache(self, obo_file, monkeypatch):
+
+        records, cache_file = _read(obo_file)
+        records_tags, cache_file_tags = _read(obo_file, tags = {'is_a'})
+
+        def no_parse(self):
+
+            raise AssertionError('Parsing instead of loading the cache.')
+
+        with monkeypatch.context() as m:
+
+            m.setattr(obo.Obo, '_parse', no_parse)
+
+            assert _read(obo_file) == (records, cache_file)
+            assert _read(obo_file, tags = ['is_a']) == (
+                records_tags,
+                cache_file_tags,
+            )
+
+        assert cache_file_tags != cache_file
+
+        with open(obo_file, 'a') as fp:
+
+            fp.write('\n\n[Term]\nid: GO:0000003\nname: new\n')
+
+        records_new, cache_file_new = _read(obo_file)
+
+        assert cache_file_new not in (cache_file, cache_file_tags)
+        assert records_new[:-1] == records
+        assert records_new[-1].id.value == 'GO:0000003'
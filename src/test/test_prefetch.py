@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import types
+import functools
+import threading
+import http.server
+
+import pypath.share.curl as curl
+import pypath.share.settings as settings
+import pypath.omnipath.prefetch as prefetch
+
+
+def _input(url):
+
+    return curl.Curl(url).result.split('\n')
+
+
+class TestPrefetch(object):
+
+    def test_prefetch(self, tmp_path):
+
+        (tmp_path / 'a.tsv').write_text('a\tb\n')
+        (tmp_path / 'b.tsv').write_text('c\td\n')
+        server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0),
+            functools.partial(
+                http.server.SimpleHTTPRequestHandler,
+                directory = str(tmp_path),
+            ),
+        )
+        threading.Thread(target = server.serve_forever, daemon = True).start()
+        base = 'http://127.0.0.1:%u/' % server.server_address[1]
+        cachedir = settings.get('cachedir')
+        settings.setup(cachedir = str(tmp_path / 'cache'))
+
+        def url_input(fname):
+
+            return _input(base + fname)
+
+        resources = [
+            types.SimpleNamespace(
+                name = fname,
+                input = url_input,
+                input_args = {'fname': fname},
+            )
+            for fname in ('a.tsv', 'b.tsv', 'a.tsv')
+        ]
+
+        try:
+
+            planner = prefetch.prefetch(network = resources, workers = 2)
+            repeated = prefetch.prefetch(network = resources)
+
+        finally:
+
+            settings.setup(cachedir = cachedir)
+            server.shutdown()
+
+        assert len(planner.requests) == 2
+        assert len(planner.downloaded) == 2
+        assert not planner.failed
+        assert not repeated.requests
+
+        for cache_file in planner.requests:
+
+            assert os.path.exists(cache_file)
+
+
+    def test_no_fork(self, monkeypatch):
+
+        called = []
+        resources = [
+            types.SimpleNamespace(
+                name = 'resource',
+                input = lambda: called.append(True),
+                input_args = {},
+            )
+        ]
+        monkeypatch.setattr(
+            prefetch.multiprocessing,
+            'get_all_start_methods',
+            lambda: ['spawn'],
+        )
+        planner = prefetch.prefetch(network = resources)
+
+        # the input methods are not called in this process
+        assert not called
+        assert not planner.requests
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+
+import pypath.reader.field as field
+import pypath.reader.benchmark as benchmark
+
+
+class TestRecordExtractor(object):
+
+    def test_compiled_equals_interpreted(self):
+
+        fields = benchmark.default_fields()
+        fields['nested'] = field.Field(7, mapping = {'a': 1})
+        fields['kept'] = field.Field(7)
+        table = [
+            row + [['a', 'b'] if i % 3 else 'a']
+            for i, row in enumerate(benchmark.synthetic_table(500, seed = 3))
+        ]
+        extractor = field.RecordExtractor(fields)
+
+        expected = [
+            tuple(fld.process(record).value for fld in fields.values())
+            for record in table
+        ]
+
+        assert [extractor(record) for record in table] == expected
+        assert extractor.records(table) == expected
+        assert list(
+            extractor.data_frame(pd.DataFrame(table)).itertuples(
+                index = False,
+                name = None,
+            )
+        ) == expected
+
+    def test_chunks(self):
+
+        table = benchmark.synthetic_table(250, seed = 4)
+        extractor = field.RecordExtractor(benchmark.default_fields())
+        chunks = list(extractor.iter_chunks(table, chunk_size = 100))
+
+        assert [len(chunk['id_a']) for chunk in chunks] == [100, 100, 50]
+        assert all(chunk['is_network'] == [True] * len(chunk['id_a'])
+                   for chunk in chunks)
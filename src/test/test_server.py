@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+#  This file is part of the `pypath` python module
+#
+#  Copyright
+#  2014-2020
+#  EMBL, EMBL-EBI, Uniklinik RWTH Aachen, Heidelberg University
+#
+#  File author(s): Dénes Türei (turei.denes@gmail.com)
+#                  Nicolàs Palacio
+#                  Olga Ivanova
+#
+#  Distributed under the GPLv3 License.
+#  See accompanying file LICENSE.txt or copy at
+#      http://www.gnu.org/licenses/gpl-3.0.html
+#
+#  Website: http://pypath.omnipathdb.org/
+#
+
+import os
+import gzip
+
+import pytest
+
+pytest.importorskip('twisted')
+
+from twisted.web.test.requesthelper import DummyRequest
+
+from pypath.omnipath.server import run
+from pypath.omnipath.server import benchmark
+
+
+SIZES = {
+    'interactions': 3000,
+    'enzsub': 1000,
+    'complexes': 300,
+    'annotations': 5000,
+    'intercell': 1000,
+}
+
+
+@pytest.fixture(scope = 'module')
+def tables(tmpdir_factory):
+
+    synthetic = benchmark.SyntheticTables(
+        outdir = str(tmpdir_factory.mktemp('tables')),
+        sizes = SIZES,
+        n_proteins = 500,
+    )
+
+    return synthetic.main()
+
+
+@pytest.fixture(scope = 'module')
+def server(tables):
+
+    return run.TableServer(input_files = tables)
+
+
+def get(server, path, args = None, accept_encoding = None):
+
+    req = DummyRequest([p.encode('ascii') for p in path])
+    req.uri = ('/%s' % '/'.join(path)).encode('ascii')
+    req.args = dict(
+        (k.encode('ascii'), [v.encode('ascii')])
+        for k, v in (args or {}).items()
+    )
+
+    if accept_encoding:
+
+        req.requestHeaders.setRawHeaders(
+            b'accept-encoding',
+            [accept_encoding],
+        )
+
+    server.render_GET(req)
+
+    return b''.join(req.written), req
+
+
+class TestTableServer(object):
+
+    @pytest.mark.parametrize('query_type', sorted(SIZES.keys()))
+    def test_query(self, server, query_type):
+
+        content, req = get(server, [query_type])
+
+        assert not content.startswith(b'Something is not')
+        assert len(content.split(b'\n')) > 2
+
+
+    @pytest.mark.parametrize(
+        'query_type, args',
+        [
+            ('interactions', {'datasets': 'omnipath,dorothea'}),
+            ('annotations', {}),
+            ('intercell', {'scope': 'generic'}),
+            ('complexes', {}),
+            ('enzsub', {'fields': 'sources,references'}),
+        ],
+    )
+    def test_paging(self, server, query_type, args):
+
+        full = get(server, [query_type], args)[0].split(b'\n')[1:]
+        pages = []
+        after = None
+
+        while True:
+
+            page_args = dict(args, limit = '97')
+
+            if after:
+
+                page_args['after'] = after
+
+            content, req = get(server, [query_type], page_args)
+            pages.extend(content.split(b'\n')[1:-1])
+            after = req.responseHeaders.getRawHeaders(b'x-next-after')
+
+            if not after:
+
+                break
+
+            after = after[0].decode('ascii')
+
+        assert pages == full[:-1]
+
+
+    def test_compression(self, server):
+
+        plain = get(server, ['annotations'])[0]
+        compressed, req = get(server, ['annotations'], None, 'gzip')
+
+        assert req.responseHeaders.getRawHeaders(b'content-encoding') == [
+            b'gzip'
+        ]
+        assert gzip.decompress(compressed) == plain
+        # the second time it is served from the precompressed payloads
+        assert get(server, ['annotations'], None, 'gzip')[0] == compressed
+
+
+    def test_precompressed_keys(self, server):
+
+        get(server, ['complexes'], None, 'gzip')
+        n_keys = len(server._precompressed)
+
+        for i in range(5):
+
+            get(server, ['complexes'], {'header': 'x%u' % i}, 'gzip')
+            get(server, ['complexes'], {'license': 'x%u' % i}, 'gzip')
+
+        for header in ('0', 'no', '00'):
+
+            get(server, ['complexes'], {'header': header}, 'gzip')
+
+        # values equivalent to the defaults share the cached payload
+        # and unknown values are not cached at all
+        assert len(server._precompressed) == n_keys + 1
+
+        get(server, ['interactions'], None, 'gzip')
+        cold = get(server, ['interactions'], {'genesymbols': ''})[0]
+
+        for args in ({'genesymbols': ''}, {'genesymbols': 'maybe'}):
+
+            content, req = get(server, ['interactions'], args, 'gzip')
+
+            if req.responseHeaders.getRawHeaders(b'content-encoding'):
+
+                content = gzip.decompress(content)
+
+            # the warm cache does not hide the error of invalid arguments
+            assert content.startswith(b'Something is not')
+
+        assert cold.startswith(b'Something is not')
+
+
+def test_synthetic_outdir(tmp_path):
+
+    outdir = str(tmp_path / 'new' / 'tables')
+    synthetic = benchmark.SyntheticTables(
+        outdir = outdir,
+        sizes = {'complexes': 10},
+        n_proteins = 50,
+    )
+
+    assert synthetic.main() == {
+        'complexes': os.path.join(outdir, 'synthetic_webservice_complexes.tsv')
+    }
+    assert os.path.exists(synthetic.input_files['complexes'])
+
+
+def test_benchmark(tables):
+
+    bm = benchmark.ServerBenchmark(
+        input_files = tables,
+        n_requests = 30,
+        concurrency = 2,
+    )
+    result = bm.main()
+
+    assert result['errors'] == 0
+    assert result['latency']['all']['n'] == 30
+    assert result['sizes'] == SIZES
+    assert bm.tables is None
+
+
+def test_metrics(server):
+
+    get(server, ['interactions'], {'limit': '10'})
+    content, req = get(server, ['metrics'])
+    content = content.decode('utf-8')
+
+    assert 'pypath_server_requests_total{query="interactions"}' in content
+    assert (
+        'pypath_server_stage_duration_seconds_count'
+        '{query="interactions",stage="license"}'
+    ) in content
+    assert 'pypath_server_rows_returned_total{query="interactions"}' in content
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import gzip
+
+import pypath.inputs.uniprot as uniprot_input
+import pypath.utils.uniprot_store as uniprot_store
+
+
+ENTRIES = (
+    'ID   P53_HUMAN               Reviewed;         393 AA.\n'
+    'AC   P04637; Q15086; Q15087;\n'
+    'AC   Q9UQ61;\n'
+    'DE   RecName: Full=Cellular tumor antigen p53;\n'
+    'GN   Name=TP53; Synonyms=P53;\n'
+    'OX   NCBI_TaxID=9606;\n'
+    'SQ   SEQUENCE   393 AA;  43653 MW;  AD5C149FD8106131 CRC64;\n'
+    '     MEEPQSDPSV EPPLSQETFS DLWKLLPENN\n'
+    '//\n'
+    'ID   EGFR_HUMAN              Reviewed;        1210 AA.\n'
+    'AC   P00533; O00688; Q15087;\n'
+    'DE   RecName: Full=Epidermal growth factor receptor;\n'
+    'OX   NCBI_TaxID=9606;\n'
+    '//\n'
+)
+
+
+class TestUniprotDatasheetStore(object):
+
+    def test_build_and_lookup(self, tmp_path):
+
+        source = tmp_path / 'sprot.dat.gz'
+
+        with gzip.open(str(source), 'wt') as fp:
+
+            fp.write(ENTRIES)
+
+        store = uniprot_store.UniprotDatasheetStore(
+            name = 'test',
+            path = str(tmp_path),
+        )
+        store.build(str(source))
+
+        expected = uniprot_input._redatasheet.findall(
+            ENTRIES.split('//\n')[0] + '//\n'
+        )
+
+        assert store.datasheet('P04637') == expected
+        assert store.datasheet('Q9UQ61') == expected
+        assert store.datasheet('P00533')[1] == (
+            'AC',
+            'P00533; O00688; Q15087;',
+        )
+        # secondary accessions of more entries point to the first one
+        assert store.datasheet('Q15087') == expected
+        assert store.datasheet('O00688')[0][1].startswith('EGFR_HUMAN')
+        assert store.datasheet('P12345') is None
+        assert len(store) == 6